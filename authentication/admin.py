@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from unfold.admin import ModelAdmin
-from .models import User, Follow
+from django.utils import timezone
+from .models import User, Follow, ScoreEvent, EmailOutbox, RevokedToken
 
 @admin.register(User)
 class CustomUserAdmin(UserAdmin, ModelAdmin):
@@ -16,13 +17,75 @@ class CustomUserAdmin(UserAdmin, ModelAdmin):
         ('Permissions', {
             'fields': ('is_active', 'is_staff', 'is_superuser', 'groups', 'user_permissions'),
         }),
-        ('Important dates', {'fields': ('last_login', 'date_joined')}),
+        ('Important dates', {'fields': ('last_login', 'date_joined', 'tokens_valid_after')}),
     )
     ordering = ['-date_joined']
+    actions = ['resend_verification', 'revoke_sessions']
+
+    @admin.action(description='Resend verification email to inactive users')
+    def resend_verification(self, request, queryset):
+        users = list(queryset.filter(is_active=False).exclude(email__isnull=True).exclude(email=''))
+        EmailOutbox.objects.enqueue_many(EmailOutbox.VERIFICATION, users)
+        self.message_user(request, f'{len(users)} verification emails queued')
+
+    @admin.action(description='Sign selected users out everywhere')
+    def revoke_sessions(self, request, queryset):
+        for user in queryset:
+            user.revoke_sessions()
+            user.save(update_fields=['tokens_valid_after'])
+        self.message_user(request, f'{queryset.count()} users signed out')
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if 'score' in form.changed_data:
+            # Keep the ledger in step with manual edits so recompute_scores preserves them
+            delta = obj.score - (form.initial.get('score') or 0)
+            reason = f'admin adjustment by {request.user}'
+            if change:
+                # A full save leaves score alone; apply the edit as a delta like any other award
+                obj.add_points(delta, reason=reason)
+            else:
+                ScoreEvent.objects.create(user=obj, points=delta, reason=reason)
+
+@admin.register(ScoreEvent)
+class ScoreEventAdmin(ModelAdmin):
+    list_display = ['user', 'points', 'reason', 'created_at']
+    list_select_related = ['user']
+    search_fields = ['user__username', 'reason']
+    date_hierarchy = 'created_at'
+    readonly_fields = ['user', 'points', 'reason', 'created_at']
 
 @admin.register(Follow)
 class FollowAdmin(ModelAdmin):
     list_display = ['follower', 'following', 'created_at']
     list_filter = ['created_at']
     search_fields = ['follower__username', 'following__username']
-    date_hierarchy = 'created_at'
\ No newline at end of file
+    date_hierarchy = 'created_at'
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(ModelAdmin):
+    list_display = ['to_email', 'kind', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at']
+    list_filter = ['status', 'kind', 'created_at']
+    search_fields = ['to_email', 'subject']
+    date_hierarchy = 'created_at'
+    readonly_fields = [
+        'kind', 'user', 'to_email', 'subject', 'text_body', 'html_body', 'status', 'attempts',
+        'next_attempt_at', 'last_error', 'created_at', 'claimed_at', 'sent_at'
+    ]
+    actions = ['retry_now']
+
+    @admin.action(description='Retry selected emails now')
+    def retry_now(self, request, queryset):
+        # Sent and dead messages have had their bodies cleared; there is nothing left to resend
+        count = queryset.exclude(status__in=[EmailOutbox.SENT, EmailOutbox.DEAD]).update(
+            status=EmailOutbox.PENDING, attempts=0, next_attempt_at=timezone.now()
+        )
+        self.message_user(request, f'{count} emails queued for retry')
+
+@admin.register(RevokedToken)
+class RevokedTokenAdmin(ModelAdmin):
+    list_display = ['jti', 'user', 'revoked_at', 'expires_at']
+    list_select_related = ['user']
+    search_fields = ['jti', 'user__username']
+    date_hierarchy = 'revoked_at'
+    readonly_fields = ['jti', 'user', 'revoked_at', 'expires_at']
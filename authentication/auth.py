@@ -0,0 +1,137 @@
+"""JWT authentication that resolves the token's user from a cache.
+
+simplejwt and dj_rest_auth load the ``User`` row on every authenticated
+request. The classes here keep the user's fields (everything but the
+password hash, which is loaded on demand) in the Django cache, so hot read
+endpoints skip the auth query. The entry is dropped whenever the user is
+saved or deleted and when points move through ``add_points``.
+
+Every worker must see those drops, or a deactivated user or a token from
+before a password change keeps working in the others. So users are only
+cached when the cache is shared between processes (``REDIS_URL``); with a
+per-process backend such as the default LocMem every request reads the row.
+Revoked tokens are rejected through ``authentication.revocation`` without a
+query.
+"""
+from dj_rest_auth.jwt_auth import JWTCookieAuthentication
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import router, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from . import revocation
+
+# Backends that keep entries inside one process: an invalidation never reaches the others
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+class UserCache:
+    """TTL cache of users keyed by the token's user id claim, used only on a shared cache"""
+
+    def __init__(self, ttl=None, alias='default'):
+        self.ttl = ttl or getattr(settings, 'AUTH_USER_CACHE_TTL', 300)
+        self.alias = alias
+        self.hits = self.misses = 0
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    @property
+    def enabled(self):
+        return not isinstance(self.shared, PROCESS_LOCAL_CACHES)
+
+    @staticmethod
+    def fields():
+        return [field.attname for field in get_user_model()._meta.concrete_fields if field.attname != 'password']
+
+    @staticmethod
+    def key(user_id):
+        return f'auth:user:{user_id}'
+
+    def get(self, user_id):
+        """A user instance built from the cached fields, or None"""
+        if not self.enabled:
+            return None
+        values = self.shared.get(self.key(user_id))
+        fields = self.fields()
+        if values is None or any(name not in values for name in fields):
+            # Missing, or cached before a schema change
+            self.misses += 1
+            return None
+        self.hits += 1
+        model = get_user_model()
+        # A fresh instance per request; the password field stays deferred
+        return model.from_db(router.db_for_read(model), fields, [values[name] for name in fields])
+
+    def set(self, user):
+        if not self.enabled:
+            return
+        values = {name: getattr(user, name) for name in self.fields()}
+        self.shared.set(self.key(getattr(user, api_settings.USER_ID_FIELD)), values, timeout=self.ttl)
+
+    def invalidate(self, *user_ids):
+        if self.enabled:
+            self.shared.delete_many([self.key(user_id) for user_id in user_ids])
+
+    def invalidate_on_commit(self, *user_ids):
+        """Drop the entries now and again once the transaction commits.
+
+        The second pass removes what a concurrent request may have cached
+        from the row as it was before the commit.
+        """
+        self.invalidate(*user_ids)
+        transaction.on_commit(lambda: self.invalidate(*user_ids))
+
+
+user_cache = UserCache()
+
+
+def cached_user(user_id):
+    """The user whose token id claim is user_id, from user_cache or the database; None if unknown"""
+    user = user_cache.get(user_id)
+    if user is None:
+        model = get_user_model()
+        user = model.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+        if user is not None:
+            user_cache.set(user)
+    return user
+
+
+class CachedUserMixin:
+    """get_user() for simplejwt authentication classes, answered from user_cache"""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        revocation.check(validated_token, user)
+        return user
+
+
+class CachedJWTAuthentication(CachedUserMixin, JWTAuthentication):
+    pass
+
+
+class CachedJWTCookieAuthentication(CachedUserMixin, JWTCookieAuthentication):
+    pass
@@ -0,0 +1,88 @@
+"""Email bodies rendered from templates compiled once per process.
+
+Each ``EmailTemplate`` keeps the compiled HTML template and a plain-text
+template derived from the same source when it is first used: links become
+``label (url)``, block tags become line breaks, the remaining markup is
+stripped and autoescaping is off. Sending an email is then two renders of
+already-parsed templates, with no per-email ``strip_tags`` pass over the HTML.
+"""
+import html
+import re
+import threading
+from functools import cached_property
+
+from django.template import Context, Engine, engines
+from django.utils.html import strip_tags
+
+EXTENDS = re.compile(r'{%\s*extends\s+["\']([^"\']+)["\']\s*%}')
+HEAD = re.compile(r'<(head|style|script)\b.*?</\1\s*>', re.S | re.I)
+LINK = re.compile(r'<a\b[^>]*?href="([^"]*)"[^>]*>(.*?)</a\s*>', re.S | re.I)
+LINE_BREAK = re.compile(r'<br\s*/?>|</(p|h[1-6]|div|li|tr)\s*>', re.I)
+
+
+def _sources(name):
+    """Source of name and of every template it extends, keyed by template name"""
+    engine = engines['django'].engine
+    sources = {}
+    while name and name not in sources:
+        template, _ = engine.find_template(name)
+        sources[name] = template.source
+        match = EXTENDS.search(template.source)
+        name = match.group(1) if match else None
+    return sources
+
+
+def text_source(source):
+    """Plain-text version of an HTML template source; template tags are kept as they are"""
+    source = HEAD.sub('', source)
+    source = LINK.sub(lambda match: f'{match.group(2).strip()} ({match.group(1)})', source)
+    source = LINE_BREAK.sub('\n', source)
+    source = html.unescape(strip_tags(source))
+    return '\n'.join(' '.join(line.split()) for line in source.splitlines())
+
+
+def tidy(text):
+    """Drop the blank lines left around template blocks, keeping paragraph breaks"""
+    lines, blank = [], False
+    for line in text.splitlines():
+        line = line.strip()
+        if line:
+            if blank and lines:
+                lines.append('')
+            lines.append(line)
+        blank = not line
+    return '\n'.join(lines)
+
+
+class EmailTemplate:
+    def __init__(self, name, subject):
+        self.name = name
+        self.subject = subject
+        self.lock = threading.Lock()
+
+    @cached_property
+    def html(self):
+        return engines['django'].get_template(self.name)
+
+    @cached_property
+    def text(self):
+        with self.lock:
+            sources = {name: text_source(source) for name, source in _sources(self.name).items()}
+            engine = Engine(loaders=[('django.template.loaders.locmem.Loader', sources)])
+            return engine.get_template(self.name)
+
+    def render(self, context):
+        """(text, html) bodies for one context dict"""
+        return tidy(self.text.render(Context(context, autoescape=False))), self.html.render(context)
+
+    def render_many(self, contexts):
+        """(text, html) bodies for many contexts, reusing the compiled templates"""
+        html_template, text_template = self.html, self.text
+        return [
+            (tidy(text_template.render(Context(context, autoescape=False))), html_template.render(context))
+            for context in contexts
+        ]
+
+
+VERIFICATION = EmailTemplate('emails/verification_email.html', 'Verify Your Devsplug Account')
+PASSWORD_RESET = EmailTemplate('emails/password_reset.html', 'Reset Your Devsplug Password')
@@ -0,0 +1,74 @@
+"""Follow relationships and the follower/following counters kept on User.
+
+Following relies on ``Follow.unique_together``: the insert is attempted
+directly and a duplicate is reported by the database, not by an
+``exists()`` probe first. Counters move with every Follow row created or
+deleted (see ``authentication.signals``), both users' in one UPDATE, and the follower's cached friends leaderboard is
+dropped.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from .auth import user_cache
+from .leaderboard import forget_friends
+from .models import Follow, User
+
+
+def follow(follower, following):
+    """Make follower follow following; returns (follow, created)"""
+    try:
+        with transaction.atomic():
+            return Follow.objects.create(follower=follower, following=following), True
+    except IntegrityError:
+        return Follow.objects.get(follower=follower, following=following), False
+
+
+def unfollow(follower, following):
+    """Returns whether there was a relationship to remove"""
+    deleted, _ = Follow.objects.filter(follower=follower, following=following).delete()
+    return bool(deleted)
+
+
+def adjust(follower_id, following_id, delta):
+    """Move both users' counters by delta in a single UPDATE"""
+    def bumped(field, user_id):
+        return Case(When(pk=user_id, then=F(field) + delta), default=F(field))
+
+    User.objects.filter(pk__in={follower_id, following_id}).update(
+        following_count=bumped('following_count', follower_id),
+        followers_count=bumped('followers_count', following_id)
+    )
+    user_cache.invalidate_on_commit(follower_id, following_id)
+    forget_friends(follower_id)
+
+
+def followers(user):
+    """Follow rows pointing at user, newest first, with the follower loaded"""
+    return Follow.objects.filter(following=user).select_related('follower').order_by('-created_at', '-id')
+
+
+def following(user):
+    """Follow rows from user, newest first, with the followed user loaded"""
+    return Follow.objects.filter(follower=user).select_related('following').order_by('-created_at', '-id')
+
+
+def follows_many(follower, user_ids):
+    """{user_id: bool} telling which of user_ids follower follows, in one query"""
+    user_ids = list(user_ids)
+    followed = set(
+        Follow.objects.filter(follower=follower, following_id__in=user_ids).values_list('following_id', flat=True)
+    )
+    return {user_id: user_id in followed for user_id in user_ids}
+
+
+def with_actual_counts(queryset=None):
+    """Annotate the true counts next to the cached columns (used for reconciliation)"""
+    def counted(field):
+        return Coalesce(Subquery(
+            Follow.objects.filter(**{field: OuterRef('pk')}).order_by()
+            .values(field).annotate(total=Count('id')).values('total')
+        ), Value(0))
+
+    queryset = User.objects.all() if queryset is None else queryset
+    return queryset.annotate(actual_followers=counted('following'), actual_following=counted('follower'))
@@ -1,10 +1,23 @@
 from .models import User
+from . import outbox, revocation, score_windows
 
 def increase_score():
 
     user = User.objects.first()
-    user.score += 200
-    user.save()
+    user.add_points(200, reason='scheduled bonus')
     print(f"{user.username} score increased by 200 , job done")
-    
-     
\ No newline at end of file
+
+
+def flush_outbox():
+    sent = outbox.run(once=True)
+    print(f"{sent} queued emails sent , job done")
+
+
+def purge_revoked_tokens():
+    deleted = revocation.purge_expired()
+    print(f"{deleted} expired revoked tokens deleted , job done")
+
+
+def roll_leaderboards():
+    rolled = score_windows.roll_forward()
+    print(f"{rolled} score events rolled into leaderboard buckets , job done")
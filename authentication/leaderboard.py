@@ -0,0 +1,98 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Follow, User
+
+
+def ranked_users():
+    """Users that appear on the leaderboard, in leaderboard order"""
+    return User.objects.filter(is_active=True)
+
+
+def _ahead_of(score, username):
+    return Q(score__gt=score) | Q(score=score, username__lt=username)
+
+
+def _behind(score, username):
+    return Q(score__lt=score) | Q(score=score, username__gt=username)
+
+
+def rank_of(user):
+    """1-based leaderboard position of user, ordered by (-score, username).
+
+    One COUNT of the active users ahead of them (a higher score, or the same
+    score and an earlier username), answered from ``user_active_rank_idx``
+    instead of loading every user; memory use does not depend on the number
+    of users.
+    """
+    if not user.is_active:
+        return None
+    return ranked_users().filter(_ahead_of(user.score, user.username)).count() + 1
+
+
+def neighbours(user, before=5, after=5):
+    """Return (position, users) where users surround user on the leaderboard.
+
+    Each returned user carries a ``position`` attribute. Both sides are
+    index-ordered LIMIT queries starting from the user's own key.
+    """
+    position = rank_of(user)
+    if position is None:
+        return None, []
+    above = list(
+        ranked_users().filter(_ahead_of(user.score, user.username)).order_by('score', '-username')[:before]
+    )
+    above.reverse()
+    below = list(ranked_users().filter(_behind(user.score, user.username)).order_by('-score', 'username')[:after])
+
+    users = above + [user] + below
+    first = position - len(above)
+    for offset, entry in enumerate(users):
+        entry.position = first + offset
+    return position, users
+
+
+def friends_key(user_id):
+    return f'leaderboard:friends:{user_id}'
+
+
+def friends_standings(user):
+    """[(user_id, score)] for user and everyone they follow, in leaderboard order.
+
+    One query over the follow set, cached per user for
+    ``LEADERBOARD_FRIENDS_TTL`` seconds and dropped when the user follows or
+    unfollows someone or a score on the board changes.
+    """
+    key = friends_key(user.pk)
+    entries = cache.get(key)
+    if entries is None:
+        followed = Follow.objects.filter(follower=user).values('following_id')
+        entries = [
+            tuple(row) for row in ranked_users().filter(Q(pk=user.pk) | Q(pk__in=followed))
+            .order_by('-score', 'username').values_list('pk', 'score')
+        ]
+        cache.set(key, entries, timeout=getattr(settings, 'LEADERBOARD_FRIENDS_TTL', 60))
+    return entries
+
+
+def forget_friends(*user_ids):
+    """Drop the users' cached friends boards now and again once the transaction commits"""
+    keys = [friends_key(user_id) for user_id in user_ids]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def scores_changed(user_ids):
+    """Drop every cached friends board showing these users: their own and their followers'.
+
+    Followers of users with more than ``LEADERBOARD_FRIENDS_MAX_FANOUT``
+    followers are left to the TTL rather than deleting that many keys on
+    every award.
+    """
+    followers = Follow.objects.filter(
+        following_id__in=user_ids,
+        following__followers_count__lte=getattr(settings, 'LEADERBOARD_FRIENDS_MAX_FANOUT', 1000)
+    ).values_list('follower_id', flat=True)
+    forget_friends(*user_ids, *followers)
@@ -0,0 +1,80 @@
+import random
+import statistics
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from authentication.leaderboard import rank_of
+from authentication.models import User
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks leaderboard rank lookups (time and peak memory) against loading every user'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=1000000, help='Number of synthetic users')
+        parser.add_argument('--lookups', type=int, default=50, help='Number of rank lookups to time')
+        parser.add_argument('--legacy', action='store_true',
+                            help='Also time the old list()/index() approach (slow and memory hungry)')
+        parser.add_argument('--keep', action='store_true', help='Keep the synthetic rows instead of rolling back')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options)
+                if not options['keep']:
+                    raise Rollback()
+        except Rollback:
+            self.stdout.write('Synthetic data rolled back')
+
+    def run(self, options):
+        rng = random.Random(42)
+        self.stdout.write(f"Generating {options['count']} users...")
+        self.generate(options['count'], rng)
+        users = list(User.objects.filter(username__startswith='rank-bench-').order_by('?')[:options['lookups']])
+
+        def indexed(user):
+            return rank_of(user)
+
+        def legacy(user):
+            return [u.pk for u in User.objects.filter(is_active=True).order_by('-score', 'username')].index(user.pk) + 1
+
+        strategies = [('Indexed COUNT', indexed)]
+        if options['legacy']:
+            strategies.append(('Load every user', legacy))
+
+        for label, lookup in strategies:
+            timings, peaks = [], []
+            for user in users:
+                tracemalloc.start()
+                started = time.perf_counter()
+                lookup(user)
+                timings.append((time.perf_counter() - started) * 1000)
+                peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+                tracemalloc.stop()
+            timings.sort()
+            self.stdout.write(
+                f'{label:>16}: median {statistics.median(timings):9.2f} ms  '
+                f'p95 {timings[int(len(timings) * 0.95) - 1]:9.2f} ms  peak memory {max(peaks):10.1f} KiB'
+            )
+
+    def generate(self, count, rng):
+        # bulk_create skips User.save(), so titles stay blank; rank only reads score/username
+        batch = []
+        for i in range(count):
+            batch.append(User(
+                username=f'rank-bench-{i}',
+                email=f'rank-bench-{i}@example.invalid',
+                password='!',
+                score=int(rng.paretovariate(1.5) * 100),
+            ))
+            if len(batch) == 10000:
+                User.objects.bulk_create(batch)
+                batch = []
+        User.objects.bulk_create(batch)
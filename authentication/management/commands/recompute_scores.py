@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+
+from authentication.models import ScoreEvent, User
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds User.score and title from the ScoreEvent ledger'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users',
+                            help='Only recompute the given user id (can be repeated)')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--dry-run', action='store_true', help='Report differences without writing them')
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by('pk')
+        if options['users']:
+            users = users.filter(pk__in=options['users'])
+        user_ids = list(users.values_list('pk', flat=True))
+
+        changed = 0
+        for start in range(0, len(user_ids), options['batch_size']):
+            chunk = user_ids[start:start + options['batch_size']]
+            totals = dict(
+                ScoreEvent.objects.filter(user_id__in=chunk).values('user')
+                .annotate(total=Sum('points')).values_list('user', 'total')
+            )
+            stale = []
+            for user in User.objects.filter(pk__in=chunk).only('pk', 'score', 'title'):
+                score = totals.get(user.pk, 0)
+                title = User.title_for(score) or user.title
+                if (user.score, user.title) != (score, title):
+                    user.score, user.title = score, title
+                    stale.append(user)
+            changed += len(stale)
+            if stale and not options['dry_run']:
+                with transaction.atomic():
+                    User.objects.bulk_update(stale, ['score', 'title'])
+                    User._invalidate_cached([user.pk for user in stale])
+
+        verb = 'would change' if options['dry_run'] else 'updated'
+        self.stdout.write(self.style.SUCCESS(f'Recomputed {len(user_ids)} users, {verb} {changed}'))
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q, F
+
+from authentication import follow_graph
+from authentication.auth import user_cache
+from authentication.models import User
+
+COUNTERS = (
+    ('followers_count', 'actual_followers'),
+    ('following_count', 'actual_following'),
+)
+
+class Command(BaseCommand):
+    help = 'Recomputes the cached follower/following counters on users and reports drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without fixing it')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        drifted = Q()
+        for cached, actual in COUNTERS:
+            drifted |= ~Q(**{cached: F(actual)})
+        queryset = follow_graph.with_actual_counts().filter(drifted).order_by('pk')
+
+        fixes = []
+        drifted_rows = 0
+        totals = {cached: 0 for cached, _ in COUNTERS}
+        for user in queryset.only('pk', 'username', *totals).iterator(chunk_size=options['batch_size']):
+            for cached, actual in COUNTERS:
+                drift = getattr(user, actual) - getattr(user, cached)
+                if drift:
+                    totals[cached] += abs(drift)
+                    self.stdout.write(f'User {user.username}: {cached} off by {drift:+d}', self.style.WARNING)
+                setattr(user, cached, getattr(user, actual))
+            fixes.append(user)
+            drifted_rows += 1
+            if not options['dry_run'] and len(fixes) >= options['batch_size']:
+                User.objects.bulk_update(fixes, list(totals))
+                user_cache.invalidate(*[user.pk for user in fixes])
+                fixes = []
+
+        if not options['dry_run'] and fixes:
+            User.objects.bulk_update(fixes, list(totals))
+            user_cache.invalidate(*[user.pk for user in fixes])
+
+        summary = ', '.join(f'{field}: {drift}' for field, drift in totals.items())
+        verb = 'Found' if options['dry_run'] else 'Repaired'
+        self.stdout.write(self.style.SUCCESS(f'{verb} drift on {drifted_rows} users ({summary})'))
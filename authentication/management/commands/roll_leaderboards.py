@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from authentication import score_windows
+
+
+class Command(BaseCommand):
+    help = 'Rolls new ScoreEvent rows into the hourly/daily buckets behind the windowed leaderboards'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true',
+                            help='Discard the buckets and roll the ledger again from the start')
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            rolled = score_windows.rebuild(options['batch_size'])
+        else:
+            rolled = score_windows.roll_forward(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rolled {rolled} score events into leaderboard buckets'))
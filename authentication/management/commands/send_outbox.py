@@ -0,0 +1,29 @@
+import logging
+import signal
+
+from django.core.management.base import BaseCommand
+
+from authentication import outbox
+
+
+class Command(BaseCommand):
+    help = 'Delivers queued EmailOutbox messages in batches over one reused mail connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds to wait when nothing is due')
+        parser.add_argument('--lease', type=int, default=300,
+                            help='Seconds before messages claimed by a vanished worker are retried')
+        parser.add_argument('--once', action='store_true', help='Exit once nothing is due')
+
+    def handle(self, *args, **options):
+        logging.getLogger('authentication.outbox').setLevel(logging.INFO)
+        stopping = []
+        signal.signal(signal.SIGTERM, lambda *args: stopping.append(True))
+        signal.signal(signal.SIGINT, lambda *args: stopping.append(True))
+        sent = outbox.run(
+            poll_interval=options['poll_interval'],
+            lease_seconds=options['lease'],
+            once=options['once'],
+            should_stop=lambda: bool(stopping),
+        )
+        self.stdout.write(self.style.SUCCESS(f'Sent {sent} emails'))
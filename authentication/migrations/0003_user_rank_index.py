@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-18 15:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('authentication', '0002_remove_verificationcode_user_delete_resetcode_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-score', 'username'], name='user_active_rank_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.3 on 2026-10-18 16:08
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def open_ledger(apps, schema_editor):
+    """Record existing scores as opening balances so the ledger sums to User.score"""
+    User = apps.get_model('authentication', 'User')
+    ScoreEvent = apps.get_model('authentication', 'ScoreEvent')
+    ScoreEvent.objects.bulk_create([
+        ScoreEvent(user_id=user_id, points=score, reason='opening balance')
+        for user_id, score in User.objects.exclude(score=0).values_list('pk', 'score').iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0003_user_rank_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('points', models.IntegerField()),
+                ('reason', models.CharField(blank=True, max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_events', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'created_at'], name='score_event_user_idx')],
+            },
+        ),
+        migrations.RunPython(open_ledger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.3 on 2026-10-18 16:34
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    User = apps.get_model('authentication', 'User')
+    Follow = apps.get_model('authentication', 'Follow')
+
+    def counted(field):
+        return Coalesce(Subquery(
+            Follow.objects.filter(**{field: OuterRef('pk')}).order_by()
+            .values(field).annotate(total=Count('id')).values('total')
+        ), 0)
+
+    User.objects.update(followers_count=counted('following'), following_count=counted('follower'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0006_token_revocation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='followers_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='following_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
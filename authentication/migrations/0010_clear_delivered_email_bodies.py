@@ -0,0 +1,17 @@
+from django.db import migrations
+
+
+def clear_delivered_bodies(apps, schema_editor):
+    EmailOutbox = apps.get_model('authentication', 'EmailOutbox')
+    EmailOutbox.objects.filter(status__in=['sent', 'dead']).update(text_body='', html_body='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0009_username_trigram_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_delivered_bodies, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,8 @@
 import shutil
-from django.db import models
+from bisect import bisect_right
+from django.db import models, transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.lookups import GreaterThanOrEqual
 from django.contrib.auth.models import AbstractUser
 from django.utils.text import slugify
 import os
@@ -9,10 +12,8 @@ import uuid
 from django.utils import timezone
 from datetime import timedelta
 from django.urls import reverse
-from django.template.loader import render_to_string
 from django.core.mail import send_mail
-from django.core.mail import EmailMultiAlternatives
-from django.utils.html import strip_tags
+from . import emails
 import jwt
 
 class User(AbstractUser):
@@ -22,6 +23,11 @@ class User(AbstractUser):
     motivation = models.TextField(null=True, blank=True)
     profile = models.ImageField(null=True, blank=True)
     email = models.EmailField(null=True, blank=True, unique=True)
+    # JWTs issued before this instant are rejected (authentication.revocation)
+    tokens_valid_after = models.DateTimeField(null=True, blank=True)
+    # Maintained by authentication.follow_graph; see reconcile_follow_counters
+    followers_count = models.IntegerField(default=0, editable=False)
+    following_count = models.IntegerField(default=0, editable=False)
     
     TITLES = {
         0: 'Beginner',
@@ -33,75 +39,132 @@ class User(AbstractUser):
         10000: 'Expert',
         15000: 'Legend'
     }
+    TITLE_THRESHOLDS = sorted(TITLES)
 
-    def add_points(self, points):
-        """Safely add points and update title"""
-        self.score += points
-        self._update_title()
-        self.save()
+    def add_points(self, points, reason=''):
+        """Atomically add points, record them in the ledger and update the title.
+
+        Score and title change in one UPDATE computed by the database, so
+        concurrent awards never overwrite each other.
+        """
+        with transaction.atomic():
+            ScoreEvent.objects.create(user=self, points=points, reason=reason)
+            User.objects.filter(pk=self.pk).update(
+                score=F('score') + points,
+                title=self.title_expression(F('score') + points)
+            )
+            self._invalidate_cached([self.pk])
+        self.refresh_from_db(fields=['score', 'title'])
+
+    @classmethod
+    def add_points_bulk(cls, awards):
+        """Apply many (user_id, points, reason) awards in one transaction.
+
+        Every award gets its ledger row, but all scores and titles change in a
+        single UPDATE however many users are involved.
+        """
+        awards = [(user_id, points, reason) for user_id, points, reason in awards if points]
+        if not awards:
+            return
+        totals = {}
+        for user_id, points, _ in awards:
+            totals[user_id] = totals.get(user_id, 0) + points
+        delta = Case(
+            *[When(pk=user_id, then=Value(points)) for user_id, points in totals.items()],
+            default=Value(0)
+        )
+        with transaction.atomic():
+            ScoreEvent.objects.bulk_create([
+                ScoreEvent(user_id=user_id, points=points, reason=reason) for user_id, points, reason in awards
+            ])
+            cls.objects.filter(pk__in=totals).update(
+                score=F('score') + delta,
+                title=cls.title_expression(F('score') + delta)
+            )
+            cls._invalidate_cached(list(totals))
+
+    @staticmethod
+    def _invalidate_cached(user_ids):
+        """Queryset updates skip post_save, so drop the cached auth users and friends boards by hand"""
+        from .auth import user_cache
+        from .leaderboard import scores_changed
+        user_cache.invalidate_on_commit(*user_ids)
+        scores_changed(user_ids)
+
+    @classmethod
+    def title_for(cls, score):
+        """Title for a score: bisect over the sorted TITLES thresholds"""
+        index = bisect_right(cls.TITLE_THRESHOLDS, score)
+        return cls.TITLES[cls.TITLE_THRESHOLDS[index - 1]] if index else ''
+
+    @classmethod
+    def title_expression(cls, score):
+        """SQL equivalent of title_for() for use in UPDATE statements"""
+        return Case(
+            *[
+                When(GreaterThanOrEqual(score, threshold), then=Value(cls.TITLES[threshold]))
+                for threshold in reversed(cls.TITLE_THRESHOLDS)
+            ],
+            default=F('title')
+        )
+
+    def revoke_sessions(self):
+        """Invalidate every access and refresh token issued so far; takes effect on save()"""
+        self.tokens_valid_after = timezone.now()
 
     def _update_title(self):
         """Update user title based on score"""
-        for threshold, title in sorted(self.TITLES.items()):
-            if self.score >= threshold:
-                self.title = title
+        title = self.title_for(self.score)
+        if title:
+            self.title = title
 
     def __str__(self):
         return self.username
     
+    COUNTER_FIELDS = ('followers_count', 'following_count')
+    # Only add_points/add_points_bulk move these, in an UPDATE computed by the database
+    SCORE_FIELDS = ('score', 'title')
+
     def save(self, *args, **kwargs):
         self._update_title()
-        print(f"Setting title to: {self.title}")
+        if not self._state.adding and not kwargs.get('force_insert') and kwargs.get('update_fields') is None:
+            # Counters and score only move through their own UPDATEs; a stale instance must not write them back
+            skipped = {*self.COUNTER_FIELDS, *self.SCORE_FIELDS, *self.get_deferred_fields()}
+            kwargs['update_fields'] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in skipped
+            ]
         super().save(*args, **kwargs)
 
     class Meta:
         ordering = ('-score','username')
+        indexes = [
+            # Serves leaderboard rank counts and neighbour lookups (authentication.leaderboard)
+            models.Index(fields=['-score', 'username'], condition=models.Q(is_active=True),
+                         name='user_active_rank_idx'),
+        ]
 
-    def send_verification_email(self):
-        """Send verification email with secure token"""
-        token = self._generate_verification_token()
-        verification_url = self._get_verification_url(token)
-        
-        context = {
+    def verification_email_context(self):
+        return {
             'user': self,
-            'verification_url': verification_url,
+            'verification_url': self._get_verification_url(self._generate_verification_token()),
             'expiry_hours': settings.EMAIL_VERIFICATION_TIMEOUT // 3600  # Convert seconds to hours
         }
-        
-        html_content = render_to_string('emails/verification_email.html', context)
-        text_content = strip_tags(html_content)
-        
-        email = EmailMultiAlternatives(
-            'Verify Your Devsplug Account',
-            text_content,
-            settings.DEFAULT_FROM_EMAIL,
-            [self.email]
-        )
-        email.attach_alternative(html_content, "text/html")
-        email.send()
 
-    def send_password_reset_email(self):
-        """Send password reset email with secure token"""
-        token = self._generate_reset_token()
-        reset_url = self._get_reset_url(token)
-        
-        context = {
+    def password_reset_email_context(self):
+        return {
             'user': self,
-            'reset_url': reset_url,
+            'reset_url': self._get_reset_url(self._generate_reset_token()),
             'expiry_hours': settings.PASSWORD_RESET_TIMEOUT // 3600
         }
-        
-        html_content = render_to_string('emails/password_reset.html', context)
-        text_content = strip_tags(html_content)
-        
-        email = EmailMultiAlternatives(
-            'Reset Your Devsplug Password',
-            text_content,
-            settings.DEFAULT_FROM_EMAIL,
-            [self.email]
-        )
-        email.attach_alternative(html_content, "text/html")
-        email.send()
+
+    def send_verification_email(self):
+        """Queue the verification email with a secure token; returns the EmailOutbox row"""
+        return EmailOutbox.objects.enqueue_many(EmailOutbox.VERIFICATION, [self])[0]
+
+    def send_password_reset_email(self):
+        """Queue the password reset email with a secure token; returns the EmailOutbox row"""
+        return EmailOutbox.objects.enqueue_many(EmailOutbox.PASSWORD_RESET, [self])[0]
 
     def _generate_verification_token(self):
         """Generate a secure JWT token for email verification"""
@@ -145,6 +208,135 @@ class User(AbstractUser):
         except (jwt.InvalidTokenError, User.DoesNotExist):
             raise ValueError('Invalid token')
 
+class ScoreEvent(models.Model):
+    """Append-only ledger of score changes; User.score is the running total"""
+    user = models.ForeignKey("authentication.User", on_delete=models.CASCADE, related_name="score_events")
+    points = models.IntegerField()
+    reason = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'created_at'], name='score_event_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.points:+d} for {self.user_id} ({self.reason})"
+
+class HourlyScore(models.Model):
+    """Points a user earned in one hour, rolled up from ScoreEvent (authentication.score_windows)"""
+    user = models.ForeignKey("authentication.User", on_delete=models.CASCADE, related_name="+")
+    hour = models.DateTimeField()
+    points = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('hour', 'user')
+
+    def __str__(self):
+        return f"{self.points:+d} for {self.user_id} at {self.hour:%Y-%m-%d %H:00}"
+
+class DailyScore(models.Model):
+    """Points a user earned in one day, rolled up from ScoreEvent (authentication.score_windows)"""
+    user = models.ForeignKey("authentication.User", on_delete=models.CASCADE, related_name="+")
+    day = models.DateField()
+    points = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('day', 'user')
+
+    def __str__(self):
+        return f"{self.points:+d} for {self.user_id} on {self.day}"
+
+class ScoreRollup(models.Model):
+    """How far the ScoreEvent ledger has been rolled into HourlyScore and DailyScore; a single row"""
+    last_event_id = models.BigIntegerField(default=0)
+    rolled_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Score events rolled up to {self.last_event_id}"
+
+class EmailOutboxManager(models.Manager):
+    def enqueue_many(self, kind, users):
+        """Render one kind of email for every user and queue them for the outbox worker"""
+        template, context = EmailOutbox.TEMPLATES[kind]
+        bodies = template.render_many([getattr(user, context)() for user in users])
+        return self.bulk_create([
+            self.model(kind=kind, user=user, to_email=user.email, subject=template.subject,
+                       text_body=text_body, html_body=html_body)
+            for user, (text_body, html_body) in zip(users, bodies)
+        ])
+
+class EmailOutbox(models.Model):
+    """Outgoing email waiting for (or delivered by) the send_outbox worker"""
+    VERIFICATION = 'verification'
+    PASSWORD_RESET = 'password_reset'
+
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    DEAD = 'dead'
+
+    # kind -> (authentication.emails template, User method building its context)
+    TEMPLATES = {
+        VERIFICATION: (emails.VERIFICATION, 'verification_email_context'),
+        PASSWORD_RESET: (emails.PASSWORD_RESET, 'password_reset_email_context'),
+    }
+
+    # Bodies hold live verification/reset tokens: blanked once the message is sent or dead
+    CLEARED_BODIES = {'text_body': '', 'html_body': ''}
+
+    kind = models.CharField(
+        max_length=30,
+        choices=[
+            (VERIFICATION, 'Verification'),
+            (PASSWORD_RESET, 'Password reset')
+        ]
+    )
+    user = models.ForeignKey("authentication.User", on_delete=models.SET_NULL, null=True, blank=True,
+                             related_name="outbox_emails")
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=200)
+    text_body = models.TextField()
+    html_body = models.TextField(blank=True)
+    status = models.CharField(
+        max_length=20,
+        choices=[
+            (PENDING, 'Pending'),
+            (SENDING, 'Sending'),
+            (SENT, 'Sent'),
+            (DEAD, 'Dead letter')
+        ],
+        default=PENDING
+    )
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    objects = EmailOutboxManager()
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='email_outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} email to {self.to_email} ({self.status})"
+
+class RevokedToken(models.Model):
+    """A single revoked JWT, kept until it would have expired anyway"""
+    jti = models.CharField(max_length=255, unique=True)
+    user = models.ForeignKey("authentication.User", on_delete=models.CASCADE, null=True, blank=True,
+                             related_name="revoked_tokens")
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.jti} (revoked {self.revoked_at:%Y-%m-%d %H:%M})"
+
 class Follow(models.Model):
     """Model to store follow relationships between users."""
     follower = models.ForeignKey("authentication.User", on_delete=models.CASCADE, related_name="following")
@@ -0,0 +1,141 @@
+"""Delivery of queued EmailOutbox messages.
+
+``deliver_batch`` claims due messages and sends them over one connection
+from ``EMAIL_BACKEND``, so a burst of signups costs one SMTP handshake per
+batch rather than one per request. Failures are retried with exponential
+backoff; after ``EMAIL_OUTBOX_MAX_ATTEMPTS`` a message is dead-lettered.
+A dead verification email removes the still-inactive account it was for,
+as the signup view used to do when sending failed inline. Bodies carry live
+verification and reset links, so they are blanked once a message is sent or
+dead-lettered; only the envelope is kept.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import EmailOutbox, User
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def backoff(attempts):
+    """Seconds to wait before retry number attempts (1-based)"""
+    base = _setting('EMAIL_OUTBOX_BACKOFF', 30)
+    return min(base * 2 ** (attempts - 1), _setting('EMAIL_OUTBOX_MAX_BACKOFF', 3600))
+
+
+def requeue_stale(lease_seconds):
+    """Return messages claimed by a worker that died mid-batch"""
+    cutoff = timezone.now() - timedelta(seconds=lease_seconds)
+    return EmailOutbox.objects.filter(status=EmailOutbox.SENDING, claimed_at__lt=cutoff).update(
+        status=EmailOutbox.PENDING
+    )
+
+
+def claim(limit):
+    """Atomically mark up to limit due messages as sending and return them"""
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status=EmailOutbox.PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')
+            .values_list('pk', flat=True)[:limit]
+        )
+        EmailOutbox.objects.filter(pk__in=ids, status=EmailOutbox.PENDING).update(
+            status=EmailOutbox.SENDING, claimed_at=now, attempts=F('attempts') + 1
+        )
+    return list(EmailOutbox.objects.filter(pk__in=ids, status=EmailOutbox.SENDING, claimed_at=now).order_by('id'))
+
+
+def build_message(outbox, connection):
+    message = EmailMultiAlternatives(
+        outbox.subject, outbox.text_body, settings.DEFAULT_FROM_EMAIL, [outbox.to_email], connection=connection
+    )
+    if outbox.html_body:
+        message.attach_alternative(outbox.html_body, "text/html")
+    return message
+
+
+def mark_sent(outbox):
+    EmailOutbox.objects.filter(pk=outbox.pk).update(
+        status=EmailOutbox.SENT, sent_at=timezone.now(), last_error='', **EmailOutbox.CLEARED_BODIES
+    )
+
+
+def mark_failed(outbox, error):
+    """Schedule a retry, or dead-letter the message once it is out of attempts"""
+    if outbox.attempts < _setting('EMAIL_OUTBOX_MAX_ATTEMPTS', 5):
+        EmailOutbox.objects.filter(pk=outbox.pk).update(
+            status=EmailOutbox.PENDING,
+            next_attempt_at=timezone.now() + timedelta(seconds=backoff(outbox.attempts)),
+            last_error=error
+        )
+        return
+    with transaction.atomic():
+        EmailOutbox.objects.filter(pk=outbox.pk).update(
+            status=EmailOutbox.DEAD, last_error=error, **EmailOutbox.CLEARED_BODIES
+        )
+        if outbox.kind == EmailOutbox.VERIFICATION and outbox.user_id:
+            # Same outcome as a failed inline send: the unverifiable account goes away
+            User.objects.filter(pk=outbox.user_id, is_active=False).delete()
+    logger.warning('Email %s to %s dead-lettered: %s', outbox.pk, outbox.to_email, error)
+
+
+def deliver_batch(limit=None):
+    """Send up to limit due messages over one backend connection; returns (sent, failed)"""
+    batch = claim(limit or _setting('EMAIL_OUTBOX_BATCH_SIZE', 50))
+    if not batch:
+        return 0, 0
+    sent = failed = 0
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        # Nothing went out: every message in the batch is retried
+        for outbox in batch:
+            mark_failed(outbox, f'{e.__class__.__name__}: {e}')
+        return 0, len(batch)
+    try:
+        for outbox in batch:
+            try:
+                delivered = connection.send_messages([build_message(outbox, connection)])
+            except Exception as e:
+                mark_failed(outbox, f'{e.__class__.__name__}: {e}')
+                failed += 1
+                continue
+            if delivered:
+                mark_sent(outbox)
+                sent += 1
+            else:
+                mark_failed(outbox, 'Backend reported the message as not sent')
+                failed += 1
+    finally:
+        connection.close()
+    return sent, failed
+
+
+def run(poll_interval=2.0, lease_seconds=300, once=False, should_stop=lambda: False):
+    """Deliver until should_stop(); with once, return when nothing is due"""
+    total = 0
+    while not should_stop():
+        requeue_stale(lease_seconds)
+        sent, failed = deliver_batch()
+        total += sent
+        if sent or failed:
+            logger.info('Outbox batch: %s sent, %s failed', sent, failed)
+            continue
+        if once:
+            break
+        time.sleep(poll_interval)
+    return total
@@ -0,0 +1,173 @@
+"""Revocation checks for JWTs that cost no query in the common case.
+
+Two mechanisms cover the two ways tokens are revoked:
+
+* ``User.tokens_valid_after`` kills every token of a user at once (password
+  change or reset). Access tokens are checked against the user the
+  authentication class already resolved, from ``authentication.auth``'s
+  cache; refresh tokens against the same cached user. That cache is only
+  used when every worker shares it, and the save that moves the cutoff
+  drops the entry, so all workers see the cutoff once it commits.
+* Individual tokens (logout, rotation) are stored as ``RevokedToken`` rows.
+  Each process keeps a Bloom filter of their JTIs, built on first use and
+  topped up from rows newer than the last one seen every
+  ``TOKEN_REVOCATION_SYNC_INTERVAL`` seconds. A JTI the filter has never
+  seen is not revoked; only the rare positive hits query the table.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import RevokedToken
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings; no false negatives"""
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = max(1, capacity)
+        self.size = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationList:
+    """This process's view of the RevokedToken table"""
+
+    def __init__(self, capacity=None, error_rate=None, sync_interval=None):
+        self.capacity = capacity or _setting('TOKEN_REVOCATION_CAPACITY', 100000)
+        self.error_rate = error_rate or _setting('TOKEN_REVOCATION_ERROR_RATE', 0.001)
+        self.sync_interval = sync_interval if sync_interval is not None else _setting(
+            'TOKEN_REVOCATION_SYNC_INTERVAL', 30
+        )
+        self.lock = threading.Lock()
+        self.bloom = None
+        self.last_id = 0
+        self.synced_at = 0
+        self.checks = self.lookups = 0
+
+    def rebuild(self):
+        """Load every unexpired revoked JTI into a new filter"""
+        with self.lock:
+            last_id = RevokedToken.objects.aggregate(last=Max('id'))['last'] or 0
+            jtis = list(
+                RevokedToken.objects.filter(id__lte=last_id, expires_at__gt=timezone.now())
+                .values_list('jti', flat=True)
+            )
+            bloom = BloomFilter(max(self.capacity, 2 * len(jtis)), self.error_rate)
+            for jti in jtis:
+                bloom.add(jti)
+            self.bloom, self.last_id, self.synced_at = bloom, last_id, time.monotonic()
+
+    def sync(self, force=False):
+        """Add rows revoked (by any process) since the last sync"""
+        if self.bloom is None:
+            return self.rebuild()
+        if not force and time.monotonic() - self.synced_at < self.sync_interval:
+            return
+        with self.lock:
+            rows = list(RevokedToken.objects.filter(id__gt=self.last_id).values_list('id', 'jti'))
+            for row_id, jti in rows:
+                self.bloom.add(jti)
+                self.last_id = max(self.last_id, row_id)
+            self.synced_at = time.monotonic()
+            full = self.bloom.count > self.bloom.capacity
+        if full:
+            self.rebuild()
+
+    def add(self, jti):
+        self.sync()
+        with self.lock:
+            self.bloom.add(jti)
+
+    def is_revoked(self, jti):
+        self.sync()
+        self.checks += 1
+        if jti not in self.bloom:
+            return False
+        self.lookups += 1
+        return RevokedToken.objects.filter(jti=jti).exists()
+
+    def clear(self):
+        with self.lock:
+            self.bloom = None
+            self.last_id = 0
+
+
+revocations = RevocationList()
+
+
+def _expiry(token):
+    return datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc)
+
+
+def revoke(token, user_id=None):
+    """Revoke one validated token until it expires"""
+    jti = token[api_settings.JTI_CLAIM]
+    RevokedToken.objects.bulk_create(
+        [RevokedToken(jti=jti, user_id=user_id or token.get(api_settings.USER_ID_CLAIM), expires_at=_expiry(token))],
+        ignore_conflicts=True
+    )
+    revocations.add(jti)
+
+
+def issued_before_cutoff(token, user):
+    """Whether the token predates the user's tokens_valid_after.
+
+    ``iat`` has whole-second precision, so tokens issued in the same second
+    as the cutoff are let through rather than rejecting the fresh ones.
+    """
+    if user.tokens_valid_after is None or 'iat' not in token:
+        return False
+    return token['iat'] < math.floor(user.tokens_valid_after.timestamp())
+
+
+def check(token, user):
+    """Raise AuthenticationFailed if the token or every token of its user was revoked"""
+    if revocations.is_revoked(token[api_settings.JTI_CLAIM]):
+        raise AuthenticationFailed(_("Token has been revoked"), code="token_revoked")
+    if issued_before_cutoff(token, user):
+        raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+
+def check_refresh(token, user):
+    """check() for refresh tokens, raising the TokenError the refresh serializer expects"""
+    try:
+        check(token, user)
+    except AuthenticationFailed as e:
+        raise TokenError(str(e.detail))
+
+
+def purge_expired():
+    """Delete rows for tokens that have expired anyway; returns how many"""
+    deleted, _ = RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
@@ -0,0 +1,187 @@
+"""Rolling-window leaderboards built from the ScoreEvent ledger.
+
+``roll_forward`` (the ``roll_leaderboards`` job) adds the ledger rows past
+the ``ScoreRollup`` cursor into per-hour and per-day buckets, so a run costs
+what was earned since the previous one. Windows read the buckets: ``daily``
+is the last 24 hours of hourly buckets, ``weekly`` and ``monthly`` the last
+7 and 30 days of daily buckets; the all-time board stays on ``User.score``.
+A window's standings are computed once per roll-forward and cached, so rank
+lookups and pages are list operations. Cache keys carry the rollup cursor,
+read from the database on every lookup, so a roll-forward run by the cron
+process is seen by every web worker whether or not the cache is shared.
+"""
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncDate, TruncHour
+from django.utils import timezone
+
+from .models import DailyScore, HourlyScore, ScoreEvent, ScoreRollup
+
+# window -> (bucket unit, buckets in the window)
+WINDOWS = {
+    'daily': ('hour', 24),
+    'weekly': ('day', 7),
+    'monthly': ('day', 30),
+}
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def window_start(window, now=None):
+    """First bucket (an aware hour or a date) in the window ending now"""
+    now = timezone.localtime(now or timezone.now())
+    unit, span = WINDOWS[window]
+    if unit == 'hour':
+        return now.replace(minute=0, second=0, microsecond=0) - timedelta(hours=span - 1)
+    return now.date() - timedelta(days=span - 1)
+
+
+def _add(model, field, rows):
+    """Add {(user_id, bucket): points} into a bucket table"""
+    if not rows:
+        return
+    existing = {
+        (bucket.user_id, getattr(bucket, field)): bucket
+        for bucket in model.objects.filter(
+            **{f'{field}__in': {key for _, key in rows}}, user_id__in={user_id for user_id, _ in rows}
+        )
+    }
+    created, updated = [], []
+    for (user_id, key), points in rows.items():
+        bucket = existing.get((user_id, key))
+        if bucket is None:
+            created.append(model(user_id=user_id, points=points, **{field: key}))
+        else:
+            bucket.points += points
+            updated.append(bucket)
+    model.objects.bulk_create(created, batch_size=1000)
+    model.objects.bulk_update(updated, ['points'], batch_size=1000)
+
+
+def _bucketed(events, trunc):
+    rows = events.annotate(bucket=trunc).values('user_id', 'bucket').annotate(total=Sum('points')).order_by()
+    return {(row['user_id'], row['bucket']): row['total'] for row in rows if row['total']}
+
+
+def roll_forward(batch_size=None):
+    """Move ledger rows past the cursor into the buckets; returns how many were rolled.
+
+    The cursor is an id, and ids are taken at insert time but become visible
+    at commit. So the cursor only moves over rows at least
+    ``LEADERBOARD_ROLLUP_LAG`` seconds old and stops before the first younger
+    one. A transaction that commits within the lag is still rolled. One that
+    stays open longer has its rows skipped by the cursor for good: the points
+    still count on the all-time board (``User.score``), but they are missing
+    from the windows until ``roll_leaderboards --rebuild``. Keep the lag above
+    the longest transaction that awards points.
+    """
+    batch_size = batch_size or _setting('LEADERBOARD_ROLLUP_BATCH', 5000)
+    rolled = 0
+    while True:
+        with transaction.atomic():
+            ScoreRollup.objects.get_or_create(pk=1)
+            # One roll-forward at a time: the cursor row stays locked until commit
+            rollup = ScoreRollup.objects.select_for_update().get(pk=1)
+            now = timezone.now()
+            settled = now - timedelta(seconds=_setting('LEADERBOARD_ROLLUP_LAG', 60))
+            pending = ScoreEvent.objects.filter(pk__gt=rollup.last_event_id)
+            young = pending.filter(created_at__gt=settled).order_by('pk').values_list('pk', flat=True).first()
+            if young is not None:
+                pending = pending.filter(pk__lt=young)
+            ids = list(pending.order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            events = ScoreEvent.objects.filter(pk__gt=rollup.last_event_id, pk__lte=ids[-1])
+            _add(HourlyScore, 'hour', _bucketed(
+                events.filter(created_at__gte=window_start('daily', now)), TruncHour('created_at')
+            ))
+            day = window_start('monthly', now)
+            _add(DailyScore, 'day', _bucketed(
+                events.filter(created_at__date__gte=day), TruncDate('created_at')
+            ))
+            rollup.last_event_id = ids[-1]
+            rollup.rolled_at = now
+            rollup.save(update_fields=['last_event_id', 'rolled_at'])
+        rolled += len(ids)
+        if len(ids) < batch_size:
+            break
+    purge()
+    return rolled
+
+
+def purge():
+    """Drop buckets that have left every window"""
+    HourlyScore.objects.filter(hour__lt=window_start('daily')).delete()
+    DailyScore.objects.filter(day__lt=window_start('monthly')).delete()
+
+
+def rebuild(batch_size=None):
+    """Start the buckets over from the ledger; only events still inside a window are read"""
+    with transaction.atomic():
+        HourlyScore.objects.all().delete()
+        DailyScore.objects.all().delete()
+        ScoreRollup.objects.update_or_create(pk=1, defaults={'last_event_id': 0, 'rolled_at': None})
+    return roll_forward(batch_size)
+
+
+class Standings:
+    """A window's ranking: (user_id, points) best first, ties by username"""
+
+    def __init__(self, window, entries):
+        self.window = window
+        self.entries = entries
+        self.positions = {user_id: position for position, (user_id, _) in enumerate(entries, start=1)}
+
+    def position(self, user_id):
+        return self.positions.get(user_id)
+
+    def points(self, user_id):
+        position = self.positions.get(user_id)
+        return self.entries[position - 1][1] if position else 0
+
+
+_standings = OrderedDict()
+_lock = threading.Lock()
+
+
+def _version():
+    """The rollup cursor: a primary-key lookup, never cached, since the cron moves it from another process"""
+    return ScoreRollup.objects.filter(pk=1).values_list('last_event_id', flat=True).first() or 0
+
+
+def _compute(window, since):
+    unit, _ = WINDOWS[window]
+    model = HourlyScore if unit == 'hour' else DailyScore
+    rows = (
+        model.objects.filter(**{f'{unit}__gte': since}, user__is_active=True)
+        .values('user_id').annotate(total=Sum('points')).filter(total__gt=0)
+        .order_by('-total', 'user__username').values_list('user_id', 'total')
+    )
+    return [tuple(row) for row in rows]
+
+
+def standings(window):
+    """Standings for the window; recomputed after each roll-forward and when the window slides"""
+    since = window_start(window)
+    key = f'leaderboard:{window}:{since.isoformat()}:{_version()}'
+    with _lock:
+        if key in _standings:
+            _standings.move_to_end(key)
+            return _standings[key]
+    entries = cache.get(key)
+    if entries is None:
+        entries = _compute(window, since)
+        cache.set(key, entries, timeout=_setting('LEADERBOARD_STANDINGS_TTL', 3600))
+    result = Standings(window, entries)
+    with _lock:
+        _standings[key] = result
+        while len(_standings) > 2 * len(WINDOWS):
+            _standings.popitem(last=False)
+    return result
@@ -1,13 +1,19 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer as BaseTokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 from .models import User, Follow
+from .auth import cached_user
+from . import revocation
 
 
 class UserSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = User
-        fields = ['id', 'username', 'motivation', 'score', 'profile', 'title','email']
+        fields = ['id', 'username', 'motivation', 'score', 'profile', 'title','email',
+                  'followers_count', 'following_count']
 
 class LeaderSerializer(serializers.ModelSerializer):
     class Meta:
@@ -59,8 +65,35 @@ class FollowSerializer(serializers.ModelSerializer):
             'following': {'required': True}
         }
 
-    def validate(self, data):
-        if Follow.objects.filter(follower=self.context['request'].user, following=data['following']).exists():
-            raise serializers.ValidationError("You are already following this user")
+
+class FollowerSerializer(serializers.ModelSerializer):
+    """A follower and when they started following"""
+    user = LeaderSerializer(source='follower', read_only=True)
+
+    class Meta:
+        model = Follow
+        fields = ['id', 'user', 'created_at']
+
+class FollowingSerializer(serializers.ModelSerializer):
+    """A followed user and when they were followed"""
+    user = LeaderSerializer(source='following', read_only=True)
+
+    class Meta:
+        model = Follow
+        fields = ['id', 'user', 'created_at']
+
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    """Refuses revoked refresh tokens; the rotated-out token is revoked when rotation is on"""
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        user = cached_user(refresh.get(api_settings.USER_ID_CLAIM))
+        if user is None or not user.is_active:
+            raise TokenError('User not found or inactive')
+        revocation.check_refresh(refresh, user)
+        data = super().validate(attrs)
+        if api_settings.ROTATE_REFRESH_TOKENS and api_settings.BLACKLIST_AFTER_ROTATION:
+            revocation.revoke(refresh, user.pk)
         return data
-        
\ No newline at end of file
+
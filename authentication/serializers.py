@@ -2,19 +2,11 @@ from rest_framework import serializers
 from .models import User
 
 class UserSerializer(serializers.ModelSerializer):
-    followers_count = serializers.SerializerMethodField()
-    following_count = serializers.SerializerMethodField()
     
     class Meta:
         model = User
         fields = ['username', 'email', 'score', 'title', 'bio', 
                  'profile', 'followers_count', 'following_count']
-    
-    def get_followers_count(self, obj):
-        return obj.followers.count()
-    
-    def get_following_count(self, obj):
-        return obj.following.count()
 
 # Add these serializers for deprecated endpoints
 class DeprecatedActivateSerializer(serializers.Serializer):
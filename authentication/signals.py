@@ -0,0 +1,25 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.settings import api_settings
+
+from . import follow_graph
+from .auth import user_cache
+from .models import Follow, User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Profile edits, password changes and deactivation all go through save()"""
+    user_cache.invalidate_on_commit(getattr(instance, api_settings.USER_ID_FIELD))
+
+
+@receiver(post_save, sender=Follow)
+def count_follow(sender, instance, created, **kwargs):
+    if created:
+        follow_graph.adjust(instance.follower_id, instance.following_id, 1)
+
+
+@receiver(post_delete, sender=Follow)
+def count_unfollow(sender, instance, **kwargs):
+    follow_graph.adjust(instance.follower_id, instance.following_id, -1)
@@ -4,8 +4,25 @@ from rest_framework.test import APIClient, APITestCase
 from rest_framework import status
 from django.contrib.auth import get_user_model
 from django.core import mail
-from authentication.models import Follow, VerificationCode, ResetCode
-from django.db import IntegrityError
+from authentication.models import Follow
+from django.core.management import call_command
+from io import StringIO
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+from authentication.models import ScoreEvent, EmailOutbox
+from authentication import emails, outbox
+from authentication.auth import UserCache, user_cache
+from authentication import revocation
+from authentication.models import RevokedToken, HourlyScore, DailyScore
+from authentication import follow_graph, leaderboard, score_windows
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from datetime import timedelta
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.backends.locmem import EmailBackend as LocmemEmailBackend
+from django.test import override_settings
+from django.utils import timezone
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.conf import settings
 import os
@@ -17,9 +34,18 @@ from unittest.mock import patch
 import json
 from social_django.models import UserSocialAuth
 import logging
+import tempfile
 
 User = get_user_model()
 
+# A cache every process can see, as with REDIS_URL; users are only cached on one of these
+SHARED_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(tempfile.gettempdir(), 'devsplug-test-cache'),
+    }
+}
+
 # Model Tests
 class UserModelTests(TestCase):
     def setUp(self):
@@ -60,6 +86,150 @@ class UserModelTests(TestCase):
             }
         }
 
+class ScoreLedgerTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='ledgerTester',
+            password='testpass123',
+            email='ledger@example.com'
+        )
+
+    def test_stale_instances_do_not_lose_awards(self):
+        """Test that awards through separate stale instances both land and are ledgered"""
+        first = User.objects.get(pk=self.user.pk)
+        second = User.objects.get(pk=self.user.pk)
+        first.add_points(300, reason='challenge')
+        second.add_points(300, reason='challenge')
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.score, self.user.title), (600, 'Novice'))
+        self.assertEqual(self.user.score_events.count(), 2)
+
+    def test_full_save_of_stale_instance_keeps_score(self):
+        """Test that saving a user loaded before an award does not write the old score back"""
+        stale = User.objects.get(pk=self.user.pk)
+        User.objects.get(pk=self.user.pk).add_points(700, reason='challenge')
+        stale.motivation = 'hi'
+        stale.save()
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.score, self.user.title, self.user.motivation), (700, 'Novice', 'hi'))
+        self.assertEqual(sum(self.user.score_events.values_list('points', flat=True)), 700)
+
+    def test_title_thresholds(self):
+        """Test that titles are picked by bisecting the thresholds"""
+        self.assertEqual(User.title_for(0), 'Beginner')
+        self.assertEqual(User.title_for(999), 'Novice')
+        self.assertEqual(User.title_for(1000), 'Developer')
+        self.assertEqual(User.title_for(20000), 'Legend')
+
+    def test_recompute_scores_from_ledger(self):
+        """Test that recompute_scores rebuilds drifted scores from the ledger"""
+        self.user.add_points(1200)
+        User.objects.filter(pk=self.user.pk).update(score=5)
+        call_command('recompute_scores', stdout=StringIO())
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.score, self.user.title), (1200, 'Developer'))
+
+    def test_add_points_bulk(self):
+        """Test that bulk awards ledger every award and update all users in one statement"""
+        other = User.objects.create_user(username='bulkTester', password='testpass123', email='bulk@example.com')
+        with CaptureQueriesContext(connection) as queries:
+            User.add_points_bulk([
+                (self.user.pk, 700, 'challenge 1 accepted'),
+                (other.pk, 50, 'challenge 1 accepted'),
+                (self.user.pk, -100, 'challenge 2 revoked'),
+            ])
+        self.assertEqual(sum(query['sql'].startswith('UPDATE') for query in queries.captured_queries), 1)
+        self.user.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((self.user.score, self.user.title), (600, 'Novice'))
+        self.assertEqual(other.score, 50)
+        self.assertEqual(ScoreEvent.objects.count(), 3)
+
+class FailingEmailBackend(BaseEmailBackend):
+    """Accepts the connection but rejects every message, like an SMTP server refusing recipients"""
+    def send_messages(self, email_messages):
+        raise OSError('550 mailbox unavailable')
+
+class CountingEmailBackend(LocmemEmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingEmailBackend.opened += 1
+        return super().open()
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class EmailOutboxTests(APITestCase):
+    def signup(self, username='outboxTester'):
+        return self.client.post(reverse('user-create'), {
+            'username': username, 'password': 'testpass123', 'email': f'{username}@example.com'
+        })
+
+    def test_signup_queues_instead_of_sending(self):
+        """Test that signup only queues the email and the worker delivers it"""
+        response = self.signup()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(mail.outbox), 0)
+        queued = EmailOutbox.objects.get()
+        self.assertEqual((queued.kind, queued.status), (EmailOutbox.VERIFICATION, EmailOutbox.PENDING))
+
+        self.assertEqual(outbox.deliver_batch(), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['outboxTester@example.com'])
+        self.assertEqual(mail.outbox[0].alternatives[0][1], 'text/html')
+        sent = EmailOutbox.objects.get()
+        self.assertEqual((sent.status, sent.text_body, sent.html_body), (EmailOutbox.SENT, '', ''))
+
+    @override_settings(EMAIL_BACKEND='authentication.tests.CountingEmailBackend')
+    def test_batch_reuses_one_connection(self):
+        """Test that a batch of emails goes out over a single connection"""
+        for i in range(5):
+            self.signup(f'batchTester{i}')
+        CountingEmailBackend.opened = 0
+        self.assertEqual(outbox.deliver_batch(), (5, 0))
+        self.assertEqual(CountingEmailBackend.opened, 1)
+        self.assertEqual(len(mail.outbox), 5)
+
+    @override_settings(EMAIL_BACKEND='authentication.tests.FailingEmailBackend', EMAIL_OUTBOX_MAX_ATTEMPTS=2)
+    def test_retry_then_dead_letter_rolls_back_signup(self):
+        """Test that failures back off, then dead-letter and remove the unverified account"""
+        self.signup()
+        self.assertEqual(outbox.deliver_batch(), (0, 1))
+        queued = EmailOutbox.objects.get()
+        self.assertEqual((queued.status, queued.attempts), (EmailOutbox.PENDING, 1))
+        self.assertIn('/verify-email/token/', queued.text_body)
+        self.assertGreater(queued.next_attempt_at, timezone.now())
+        self.assertEqual(outbox.deliver_batch(), (0, 0))
+
+        EmailOutbox.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(outbox.deliver_batch(), (0, 1))
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.text_body, queued.html_body), (EmailOutbox.DEAD, '', ''))
+        self.assertIn('550', queued.last_error)
+        self.assertFalse(User.objects.filter(username='outboxTester').exists())
+
+class EmailTemplateTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tmplTester', password='testpass123', email='tmpl@example.com')
+
+    def test_text_part_comes_from_the_compiled_text_template(self):
+        """Test that the plain-text part keeps link targets and isn't HTML-escaped"""
+        text, html = emails.VERIFICATION.render({'user': self.user, 'verification_url': 'https://x/v?a=1&b=2',
+                                                'expiry_hours': 48})
+        self.assertIn('Verify Email (https://x/v?a=1&b=2)', text)
+        self.assertNotIn('<', text)
+        self.assertIn('https://x/v?a=1&amp;b=2', html)
+
+    def test_batch_rendering_queues_one_email_per_user(self):
+        """Test that bulk sends render every user's email with the same compiled templates"""
+        others = [
+            User.objects.create_user(username=f'tmplTester{i}', password='testpass123', email=f'tmpl{i}@example.com')
+            for i in range(3)
+        ]
+        queued = EmailOutbox.objects.enqueue_many(EmailOutbox.PASSWORD_RESET, [self.user, *others])
+        self.assertEqual([email.to_email for email in queued], [user.email for user in [self.user, *others]])
+        self.assertTrue(all('Hi tmplTester' in email.text_body for email in queued))
+        self.assertEqual(len({email.text_body for email in queued}), 4)
+
 # API Tests
 class AuthenticationTests(APITestCase):
     def setUp(self):
@@ -100,6 +270,138 @@ class AuthenticationTests(APITestCase):
             'data': {'access_token': 'Received'}
         }
 
+@override_settings(CACHES=SHARED_CACHES)
+class CachedJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='cached', password='testpass123', email='cached@example.com')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        self.url = reverse('user-me')
+
+    def user_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        return response, [q['sql'] for q in queries if 'authentication_user' in q['sql']]
+
+    def test_repeat_requests_skip_the_user_query(self):
+        response, first = self.user_queries()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(first), 1)
+        response, second = self.user_queries()
+        self.assertEqual(response.data['username'], 'cached')
+        self.assertEqual(second, [])
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_per_process_cache_is_not_used(self):
+        """Test that a LocMem cache, which other workers can't see or invalidate, never holds users"""
+        self.assertFalse(user_cache.enabled)
+        self.user_queries()
+        response, second = self.user_queries()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(second), 1)
+
+    def test_save_points_and_deactivation_invalidate(self):
+        self.user_queries()
+        self.user.motivation = 'ship it'
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).data['motivation'], 'ship it')
+
+        self.user.add_points(40, 'test')
+        self.assertEqual(self.client.get(self.url).data['score'], 40)
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_cached_user_can_change_password(self):
+        self.user_queries()
+        response = self.client.post(reverse('user-change-password'), {
+            'current_password': 'testpass123', 'new_password': 'newpass456'
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('newpass456'))
+        self.assertEqual(self.user.motivation, None)
+
+@override_settings(CACHES=SHARED_CACHES)
+class TokenRevocationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        revocation.revocations.clear()
+        self.user = User.objects.create_user(username='revoker', password='testpass123', email='revoker@example.com')
+        self.me = reverse('user-me')
+
+    def tokens(self, age=0):
+        refresh = RefreshToken.for_user(self.user)
+        access = refresh.access_token
+        for token in (refresh, access):
+            token.set_iat(at_time=timezone.now() - timedelta(seconds=age))
+        return str(refresh), str(access)
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = revocation.BloomFilter(1000, 0.01)
+        for i in range(1000):
+            bloom.add(f'jti-{i}')
+        self.assertTrue(all(f'jti-{i}' in bloom for i in range(1000)))
+        false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+    def test_logout_revokes_refresh_and_access(self):
+        refresh, access = self.tokens()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        self.assertEqual(self.client.get(self.me).status_code, status.HTTP_200_OK)
+        response = self.client.post(reverse('token_revoke'), {'refresh': refresh})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(self.client.get(self.me).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.credentials()
+        response = self.client.post(reverse('token_refresh'), {'refresh': refresh})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_rejects_earlier_tokens(self):
+        refresh, access = self.tokens(age=5)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        response = self.client.post(reverse('user-change-password'), {
+            'current_password': 'testpass123', 'new_password': 'newpass456'
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(self.client.get(self.me).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+        self.assertEqual(self.client.get(self.me).status_code, status.HTTP_200_OK)
+        self.client.credentials()
+        response = self.client.post(reverse('token_refresh'), {'refresh': refresh})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_reaches_other_workers(self):
+        """Test that a token issued before a password change is rejected by a worker that cached its user"""
+        refresh, access = self.tokens(age=5)
+        other_worker = UserCache()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        with patch('authentication.auth.user_cache', other_worker):
+            self.assertEqual(self.client.get(self.me).status_code, status.HTTP_200_OK)
+            self.assertEqual(self.client.get(self.me).status_code, status.HTTP_200_OK)
+        self.assertEqual((other_worker.misses, other_worker.hits), (1, 1))
+
+        response = self.client.post(reverse('user-change-password'), {
+            'current_password': 'testpass123', 'new_password': 'newpass456'
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for worker in (other_worker, UserCache()):
+            with patch('authentication.auth.user_cache', worker):
+                self.assertEqual(self.client.get(self.me).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_only_filter_hits_query_the_table(self):
+        revocation.revocations.sync()
+        with self.assertNumQueries(0):
+            self.assertFalse(revocation.revocations.is_revoked('never-revoked'))
+
+        # Revoked by another process: picked up on the next sync
+        RevokedToken.objects.create(jti='elsewhere', user=self.user, expires_at=timezone.now() + timedelta(days=1))
+        revocation.revocations.sync(force=True)
+        with self.assertNumQueries(1):
+            self.assertTrue(revocation.revocations.is_revoked('elsewhere'))
+
 class FollowTests(APITestCase):
     def setUp(self):
         """Create users for follow testing"""
@@ -142,6 +444,194 @@ class FollowTests(APITestCase):
             'error': str(response.content)
         }
 
+    def test_counters_follow_unfollow_and_stale_saves(self):
+        stale = User.objects.get(pk=self.user2.pk)
+        url = reverse('follow-list')
+        response = self.client.post(url, self.test_data)
+        self.client.post(url, self.test_data)
+        self.user1.refresh_from_db()
+        self.user2.refresh_from_db()
+        self.assertEqual((self.user1.following_count, self.user1.followers_count), (1, 0))
+        self.assertEqual((self.user2.following_count, self.user2.followers_count), (0, 1))
+
+        # A full save from an instance loaded before the follow keeps the counter
+        stale.motivation = 'still here'
+        stale.save()
+        self.user2.refresh_from_db()
+        self.assertEqual(self.user2.followers_count, 1)
+
+        self.client.delete(reverse('follow-detail', kwargs={'pk': response.data['id']}))
+        self.user2.refresh_from_db()
+        self.assertEqual(self.user2.followers_count, 0)
+
+    def test_listings_and_batch_check(self):
+        user3 = User.objects.create_user(username='third', password='testpass123', email='third@test.com')
+        follow_graph.follow(self.user1, self.user2)
+        follow_graph.follow(self.user1, user3)
+        follow_graph.follow(user3, self.user2)
+
+        response = self.client.get(reverse('user-following', kwargs={'username': 'follower'}), {'page_size': 1})
+        self.assertEqual([entry['user']['username'] for entry in response.data['results']], ['third'])
+        response = self.client.get(response.data['next'])
+        self.assertEqual([entry['user']['username'] for entry in response.data['results']], ['following'])
+        response = self.client.get(reverse('user-followers', kwargs={'username': 'following'}))
+        self.assertEqual({entry['user']['username'] for entry in response.data['results']}, {'follower', 'third'})
+
+        with self.assertNumQueries(1):
+            checked = follow_graph.follows_many(self.user1, [self.user2.pk, user3.pk, self.user1.pk])
+        self.assertEqual(checked, {self.user2.pk: True, user3.pk: True, self.user1.pk: False})
+        response = self.client.get(reverse('follow-check'), {'users': f'{self.user2.pk},{self.user1.pk}'})
+        self.assertEqual(response.data, {self.user2.pk: True, self.user1.pk: False})
+
+    def test_reconcile_follow_counters(self):
+        follow_graph.follow(self.user1, self.user2)
+        User.objects.filter(pk=self.user2.pk).update(followers_count=7)
+        out = StringIO()
+        call_command('reconcile_follow_counters', stdout=out)
+        self.user2.refresh_from_db()
+        self.assertEqual(self.user2.followers_count, 1)
+        self.assertIn('Repaired drift on 1 users', out.getvalue())
+
+@override_settings(LEADERBOARD_ROLLUP_LAG=0)
+class WindowedLeaderboardTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(username='alice', password='testpass123', email='alice@example.com')
+        self.bob = User.objects.create_user(username='bob', password='testpass123', email='bob@example.com')
+        self.carol = User.objects.create_user(username='carol', password='testpass123', email='carol@example.com')
+        self.alice.add_points(100, 'test')
+        self.bob.add_points(50, 'test')
+        self.carol.add_points(500, 'test')
+        ScoreEvent.objects.filter(user=self.carol).update(created_at=timezone.now() - timedelta(days=10))
+
+    def board(self, window, **params):
+        response = self.client.get(reverse('users-leaderboard-list'), {'window': window, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_windows_rank_points_earned_in_them(self):
+        self.assertEqual(score_windows.roll_forward(), 3)
+        weekly = self.board('weekly')
+        self.assertEqual([(row['username'], row['points'], row['position']) for row in weekly['results']],
+                         [('alice', 100, 1), ('bob', 50, 2)])
+        self.assertEqual([row['username'] for row in self.board('daily')['results']], ['alice', 'bob'])
+        monthly = self.board('monthly', page_size=1, page=2)
+        self.assertEqual((monthly['count'], monthly['results'][0]['username'], monthly['results'][0]['position']),
+                         (3, 'alice', 2))
+
+        url = reverse('users-leaderboard-by-username', kwargs={'username': 'bob'})
+        data = json.loads(self.client.get(url, {'window': 'weekly'}).data)
+        self.assertEqual((data['position'], data['points']), (2, 50))
+        self.assertEqual(self.client.get(reverse('users-leaderboard-list'), {'window': 'yearly'}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+
+    def test_roll_forward_is_incremental(self):
+        score_windows.roll_forward()
+        self.assertEqual(self.board('weekly')['results'][0]['username'], 'alice')
+        self.bob.add_points(100, 'test')
+        self.assertEqual(score_windows.roll_forward(), 1)
+        self.assertEqual([row['points'] for row in self.board('weekly')['results']], [150, 100])
+        self.assertEqual(HourlyScore.objects.get(user=self.bob).points, 150)
+
+        out = StringIO()
+        call_command('roll_leaderboards', '--rebuild', stdout=out)
+        self.assertIn('Rolled 4 score events', out.getvalue())
+        self.assertEqual(DailyScore.objects.filter(user=self.bob).get().points, 150)
+
+    @override_settings(LEADERBOARD_ROLLUP_LAG=60)
+    def test_cursor_stops_before_young_rows(self):
+        """Test that the cursor never moves past a row younger than the lag, even when later rows are older"""
+        ScoreEvent.objects.filter(user=self.bob).update(created_at=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(score_windows.roll_forward(), 0)
+        ScoreEvent.objects.filter(user=self.alice).update(created_at=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(score_windows.roll_forward(), 3)
+
+    def test_users_deleted_since_the_standings_are_skipped(self):
+        """Test that cached standings naming a deleted user still render"""
+        score_windows.roll_forward()
+        self.assertEqual(len(self.board('weekly')['results']), 2)
+        self.bob.delete()
+        self.assertEqual([row['username'] for row in self.board('weekly')['results']], ['alice'])
+
+    def test_roll_forward_in_another_process_is_seen(self):
+        """Test that a roll-forward run against the cron's own private cache still moves the web boards"""
+        score_windows.roll_forward()
+        self.assertEqual(self.board('weekly')['results'][0]['points'], 100)
+        self.bob.add_points(100, 'test')
+        with patch.object(score_windows, 'cache', LocMemCache('cron', {})):
+            score_windows.roll_forward()
+        self.assertEqual([row['points'] for row in self.board('weekly')['results']], [150, 100])
+
+class FriendsLeaderboardTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = {
+            name: User.objects.create_user(
+                username=name, password='testpass123', email=f'{name}@example.com', score=score
+            )
+            for name, score in [('me', 100), ('ana', 300), ('bo', 50), ('cy', 1000)]
+        }
+        follow_graph.follow(self.users['me'], self.users['ana'])
+        follow_graph.follow(self.users['me'], self.users['bo'])
+        self.client.force_authenticate(user=self.users['me'])
+        self.url = reverse('users-leaderboard-friends')
+
+    def board(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_ranks_user_against_followed_users(self):
+        """Test that only the user and the people they follow are ranked, from the cache once built"""
+        data = self.board()
+        self.assertEqual([(row['username'], row['score'], row['position']) for row in data['results']],
+                         [('ana', 300, 1), ('me', 100, 2), ('bo', 50, 3)])
+        self.assertEqual(data['position'], 2)
+        with CaptureQueriesContext(connection) as queries:
+            leaderboard.friends_standings(self.users['me'])
+        self.assertEqual(len(queries), 0)
+
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_follows_and_scores_invalidate_the_board(self):
+        """Test that following, unfollowing and score changes are visible immediately"""
+        self.board()
+        follow_graph.follow(self.users['me'], self.users['cy'])
+        self.assertEqual(self.board()['position'], 3)
+        follow_graph.unfollow(self.users['me'], self.users['ana'])
+        self.assertEqual(self.board()['position'], 2)
+        self.users['bo'].add_points(2000, 'test')
+        self.assertEqual([row['username'] for row in self.board()['results']], ['bo', 'cy', 'me'])
+
+class LeaderboardRankTests(APITestCase):
+    def setUp(self):
+        """Create users with tied and distinct scores"""
+        for username, score in [('alice', 300), ('bob', 200), ('carol', 200), ('dave', 100), ('erin', 50)]:
+            User.objects.create_user(
+                username=username, password='testpass123', email=f'{username}@test.com', score=score
+            )
+        User.objects.create_user(
+            username='ghost', password='testpass123', email='ghost@test.com', score=1000, is_active=False
+        )
+
+    def test_position_uses_score_then_username(self):
+        """Test that rank ties are broken by username and inactive users are skipped"""
+        url = reverse('users-leaderboard-by-username', kwargs={'username': 'carol'})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.data)['position'], 3)
+
+    def test_neighbours(self):
+        """Test that neighbours returns the users around the requested one"""
+        url = reverse('users-leaderboard-neighbours', kwargs={'username': 'carol'})
+        response = self.client.get(url, {'before': 1, 'after': 5})
+        self.assertEqual(response.data['position'], 3)
+        self.assertEqual(
+            [(row['username'], row['position']) for row in response.data['results']],
+            [('bob', 2), ('carol', 3), ('dave', 4), ('erin', 5)]
+        )
+
 class UserProfileTests(APITestCase):
     def setUp(self):
         """Set up test user and authentication"""
@@ -198,7 +688,6 @@ class AccountActivationTests(APITestCase):
         self.client = APIClient()
         self.register_url = reverse('user-create')
         self.activate_url = reverse('user-activate')
-        self.claim_code_url = reverse('user-code-claim')
         self.user_data = {
             'username': 'activationtest',
             'password': 'testpass123',
@@ -215,33 +704,23 @@ class AccountActivationTests(APITestCase):
         user = User.objects.get(username=self.user_data['username'])
         self.assertFalse(user.is_active)
         
-        # 3. Verify verification code was created
-        verification = VerificationCode.objects.filter(user=user).first()
-        self.assertIsNotNone(verification)
-        
-        # 4. Verify email was sent and check content
-        self.assertEqual(len(mail.outbox), 1)
-        email = mail.outbox[0]
-        self.assertEqual(email.to[0], self.user_data['email'])
-        self.assertIn('verification code', email.subject.lower())
-        self.assertIn(verification.code, email.body)
-        print("\nVerification Email:", email.subject)
-        print("To:", email.to)
-        print("Content:", email.body)
+        # 3. Verify the verification email was queued
+        self.assertTrue(
+            EmailOutbox.objects.filter(user=user, kind=EmailOutbox.VERIFICATION, to_email=user.email).exists()
+        )
         
-        # 5. Activate account
-        activation_data = {
-            'code': verification.code,
-            'email': self.user_data['email']
-        }
-        response = self.client.post(self.activate_url, activation_data)
+        # 4. Activate account
+        response = self.client.post(self.activate_url, {'token': user._generate_verification_token()})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['status'], 'success')
         
-        # 6. Verify user is now active
+        # 5. Verify user is now active
         user.refresh_from_db()
         self.assertTrue(user.is_active)
 
+        response = self.client.post(self.activate_url, {'token': 'not-a-token'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
 class PasswordResetTests(APITestCase):
     def setUp(self):
         self.user = User.objects.create_user(
@@ -250,8 +729,7 @@ class PasswordResetTests(APITestCase):
             email='info@paullilian.dev'
         )
         self.apply_url = reverse('user-password-apply')
-        self.verify_url = reverse('user-password-verify')
-        self.change_url = reverse('user-password-change')
+        self.confirm_url = reverse('password-reset-confirm')
 
     def test_password_reset_flow(self):
         """Test complete password reset flow"""
@@ -259,38 +737,17 @@ class PasswordResetTests(APITestCase):
         response = self.client.post(self.apply_url, {'email': self.user.email})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         
-        # 2. Verify reset code was created
-        reset_code = ResetCode.objects.filter(user=self.user).first()
-        self.assertIsNotNone(reset_code)
+        # 2. Verify the reset email was queued
+        self.assertTrue(EmailOutbox.objects.filter(user=self.user, kind=EmailOutbox.PASSWORD_RESET).exists())
         
-        # 3. Verify email was sent and check content
-        self.assertEqual(len(mail.outbox), 1)
-        email = mail.outbox[0]
-        self.assertEqual(email.to[0], self.user.email)
-        self.assertIn('verification code', email.subject.lower())
-        self.assertIn(reset_code.code, email.body)
-        print("\nReset Email:", email.subject)
-        print("To:", email.to)
-        print("Content:", email.body)
-        
-        # 4. Verify reset code
-        verify_data = {
-            'code': reset_code.code,
-            'email': self.user.email
-        }
-        response = self.client.post(self.verify_url, verify_data)
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        
-        # 5. Change password
-        change_data = {
-            'code': reset_code.code,
-            'email': self.user.email,
+        # 3. Change password with the emailed token
+        response = self.client.post(self.confirm_url, {
+            'token': self.user._generate_reset_token(),
             'password': 'newpass123'
-        }
-        response = self.client.post(self.change_url, change_data)
+        })
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         
-        # 6. Verify new password works
+        # 4. Verify new password works
         login_response = self.client.post(reverse('token_obtain_pair'), {
             'username': self.user.username,
             'password': 'newpass123'
@@ -18,7 +18,8 @@ from .views import (
     SocialLoginView,
     VerifyEmailView,
     PasswordResetRequestView,
-    PasswordResetConfirmView
+    PasswordResetConfirmView,
+    TokenRevokeView
 )
 from rest_framework_social_oauth2.views import TokenView
 from oauth2_provider import views as oauth2_views
@@ -43,6 +44,7 @@ class GitlabLoginView(SocialLoginView):
 urlpatterns = [
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/token/revoke/', TokenRevokeView.as_view(), name='token_revoke'),
     path('api/user/', include(router.urls), name='user'),
     path('api/user/create', UserCreate.as_view(), name="user-create"),
     path('api/user/activate', UserActivate.as_view(), name="user-activate"),
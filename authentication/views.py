@@ -9,6 +9,8 @@ from rest_framework import permissions,status
 from .serializer import UserCreateSerializer,UserUpdateSerializer, LeaderSerializer
 from rest_framework.response import Response
 from .models import User, Follow
+from . import leaderboard, score_windows
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.decorators import action
 from django.shortcuts import get_object_or_404
 from django.db.models import Exists, OuterRef
@@ -16,11 +18,18 @@ from rest_framework.parsers import FileUploadParser,MultiPartParser,FormParser
 from .models import User
 import json
 from django.core.mail import send_mail
-from .serializer import FollowSerializer
+from .serializer import FollowSerializer, FollowerSerializer, FollowingSerializer
+from . import follow_graph
+from challenges.pagination import KeysetPagination
+from challenges.models import Category, DimensionScore
+from challenges.judge.languages import canonical_name
 from rest_framework import serializers
 from social_django.utils import load_strategy, load_backend
 from social_core.exceptions import MissingBackend
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.tokens import RefreshToken, Token
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from . import revocation
 import logging
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
@@ -38,31 +47,131 @@ from .serializers import (
 
 logger = logging.getLogger(__name__)
 
+class WindowPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
 class LeaderView(viewsets.ReadOnlyModelViewSet):
+    """Leaderboard; ?window=daily|weekly|monthly ranks by points earned in that window"""
 
     serializer_class = LeaderSerializer
+    MAX_DIMENSION_RESULTS = 100
 
     def get_queryset(self):
         return User.objects.filter(is_active=True)
+
+    def get_window(self):
+        window = self.request.query_params.get('window', 'all')
+        if window != 'all' and window not in score_windows.WINDOWS:
+            raise ValidationError({"window": f"Choose one of all, {', '.join(score_windows.WINDOWS)}."})
+        return window
+
+    def list(self, request, *args, **kwargs):
+        window = self.get_window()
+        if window == 'all':
+            return super().list(request, *args, **kwargs)
+        response = self.ranked_page(request, score_windows.standings(window).entries, 'points')
+        response.data['window'] = window
+        return response
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def friends(self, request):
+        """The requesting user ranked against everyone they follow"""
+        entries = leaderboard.friends_standings(request.user)
+        response = self.ranked_page(request, entries, 'score')
+        response.data['position'] = next(
+            (position for position, (user_id, _) in enumerate(entries, start=1) if user_id == request.user.pk), None
+        )
+        return response
+
+    def ranked_page(self, request, entries, field):
+        """A page of ranked (user_id, value) entries, each user with its position and value as field"""
+        paginator = WindowPagination()
+        page = paginator.paginate_queryset(entries, request, view=self)
+        users = User.objects.in_bulk([user_id for user_id, _ in page])
+        first = (paginator.page.number - 1) * paginator.page.paginator.per_page + 1
+        results = []
+        for position, (user_id, value) in enumerate(page, start=first):
+            if user_id not in users:
+                # Deleted since the cached standings were computed
+                continue
+            data = LeaderSerializer(users[user_id], context={'request': request}).data
+            data[field] = value
+            data['position'] = position
+            results.append(data)
+        return paginator.get_paginated_response(results)
     
     @action(detail=False, methods=['get'], url_path='by-username/(?P<username>[^/.]+)')
     def by_username(self, request, username=None):
         
-        objects_list = list(User.objects.order_by('-score'))
-        
         try:
             user = User.objects.get(username=username)
-            try:
-                position = objects_list.index(User.objects.get(pk=user.pk)) + 1  # Adding 1 to make it 1-indexed
-            except ValueError:
-                position = None  
-        except Exception as e:
+        except User.DoesNotExist:
             return Response({"error": f"User {username} not found."}, status=status.HTTP_400_BAD_REQUEST)
+        window = self.get_window()
+        extra = {}
+        if window == 'all':
+            position = leaderboard.rank_of(user)
+        else:
+            standings = score_windows.standings(window)
+            position = standings.position(user.pk)
+            extra = {"window": window, "points": standings.points(user.pk)}
         
         profile = user.profile if user.profile else None
         link = profile.url if profile is not None else ""
-        return Response(json.dumps({"username":user.username,"id":user.id,"motivation":user.motivation,"profile":link,"title":user.title,"score":user.score,"position":position}), status=status.HTTP_200_OK)
-    
+        return Response(json.dumps({"username":user.username,"id":user.id,"motivation":user.motivation,"profile":link,"title":user.title,"score":user.score,"position":position, **extra}), status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], url_path='by-username/(?P<username>[^/.]+)/neighbours')
+    def neighbours(self, request, username=None):
+        """Leaderboard page centred on a user (?before=5&after=5, at most 50 each)"""
+        user = get_object_or_404(User, username=username)
+        try:
+            before = min(max(int(request.query_params.get('before', 5)), 0), 50)
+            after = min(max(int(request.query_params.get('after', 5)), 0), 50)
+        except ValueError:
+            return Response({"error": "before and after must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+
+        position, users = leaderboard.neighbours(user, before=before, after=after)
+        results = []
+        for entry in users:
+            data = LeaderSerializer(entry, context={'request': request}).data
+            data['position'] = entry.position
+            results.append(data)
+        return Response({"position": position, "results": results}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], url_path='category/(?P<slug>[^/.]+)')
+    def category(self, request, slug=None):
+        """Top ?limit= users by points in a category, with ?username='s rank"""
+        category = get_object_or_404(Category, slug=slug)
+        return self.dimension_leaderboard(request, DimensionScore.category_key(category.pk), category=category.slug)
+
+    @action(detail=False, methods=['get'], url_path='language/(?P<language>[^/]+)')
+    def language(self, request, language=None):
+        """Top ?limit= users by points with a language, with ?username='s rank"""
+        return self.dimension_leaderboard(
+            request, DimensionScore.language_key(language), language=canonical_name(language)
+        )
+
+    def dimension_leaderboard(self, request, dimension, **extra):
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), self.MAX_DIMENSION_RESULTS)
+        except ValueError:
+            return Response({"error": "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        rows = DimensionScore.objects.ranked(dimension).select_related('user')[:limit]
+        data = {**extra, "results": [self.dimension_entry(row, position) for position, row in enumerate(rows, start=1)]}
+        username = request.query_params.get('username')
+        if username:
+            user = get_object_or_404(User, username=username)
+            rank = DimensionScore.objects.rank_of(dimension, user.pk)
+            data['user'] = self.dimension_entry(rank[1], rank[0]) if rank else None
+        return Response(data, status=status.HTTP_200_OK)
+
+    def dimension_entry(self, row, position):
+        data = LeaderSerializer(row.user, context={'request': self.request}).data
+        data.update(points=row.points, solved=row.solved, position=position)
+        return data
+
 
 class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
@@ -75,6 +184,20 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(request.user)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['get'])
+    def followers(self, request, username=None):
+        return self._follow_page(follow_graph.followers(self.get_object()), FollowerSerializer)
+
+    @action(detail=True, methods=['get'])
+    def following(self, request, username=None):
+        return self._follow_page(follow_graph.following(self.get_object()), FollowingSerializer)
+
+    def _follow_page(self, queryset, serializer_class):
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(queryset, self.request, view=self)
+        serializer = serializer_class(page, many=True, context=self.get_serializer_context())
+        return paginator.get_paginated_response(serializer.data)
+
     @action(detail=False, methods=['get'])
     def leaderboard(self, request):
         top_users = User.objects.order_by('-score')[:10]
@@ -100,8 +223,15 @@ class UserViewSet(viewsets.ModelViewSet):
         if not new_password:
             return Response({"content": "New password required."}, status=status.HTTP_400_BAD_REQUEST)
         user.set_password(new_password)
+        user.revoke_sessions()
         user.save()
-        return Response({"content": "password set successfully"}, status=status.HTTP_200_OK)
+        # Every earlier token is now rejected, including the one used for this request
+        refresh = RefreshToken.for_user(user)
+        return Response({
+            "content": "password set successfully",
+            "access": str(refresh.access_token),
+            "refresh": str(refresh)
+        }, status=status.HTTP_200_OK)
 
 
     
@@ -148,7 +278,7 @@ class UserCreate(CreateAPIView):
             user.set_password(password)
             user.save()
             
-            # Send verification email
+            # Queue the verification email; send_outbox delivers it and drops the account if it never arrives
             try:
                 user.send_verification_email()
                 return Response({
@@ -157,7 +287,7 @@ class UserCreate(CreateAPIView):
                 }, status=status.HTTP_201_CREATED)
             except Exception as e:
                 print(e)
-                user.delete()  # Rollback user creation if email fails
+                user.delete()  # Rollback user creation if the email can't be queued
                 return Response({
                     "status": "error",
                     "content": "Could not send verification email. Please try again."
@@ -246,6 +376,21 @@ class UserResetApply(CreateAPIView):
                 "content": "If an account exists with this email, password reset instructions have been sent."
             })
 
+class TokenRevokeView(APIView):
+    """Log out: revoke a refresh token and the access token sent with the request"""
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        try:
+            refresh = RefreshToken(request.data.get('refresh', ''))
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+        revocation.revoke(refresh)
+        user_claim = api_settings.USER_ID_CLAIM
+        if isinstance(request.auth, Token) and request.auth.get(user_claim) == refresh.get(user_claim):
+            revocation.revoke(request.auth)
+        return Response({"status": "success", "content": "Token revoked"}, status=status.HTTP_200_OK)
+
 class PasswordResetConfirmView(APIView):
     permission_classes = []
 
@@ -259,6 +404,7 @@ class PasswordResetConfirmView(APIView):
         try:
             user = User.verify_token(token, 'password_reset')
             user.set_password(new_password)
+            user.revoke_sessions()
             user.save()
             return Response({
                 "status": "success",
@@ -309,6 +455,7 @@ class UserClaimCode(CreateAPIView):
 class FollowViewSet(viewsets.ModelViewSet):
     serializer_class = FollowSerializer
     permission_classes = [permissions.IsAuthenticated]
+    MAX_CHECKED_USERS = 100
 
     def get_queryset(self):
         if getattr(self, 'swagger_fake_view', False):  # Handling swagger schema generation
@@ -316,10 +463,23 @@ class FollowViewSet(viewsets.ModelViewSet):
         return Follow.objects.filter(follower=self.request.user)
 
     def perform_create(self, serializer):
-        following_user = get_object_or_404(User, id=self.request.data.get('following'))
-        if Follow.objects.filter(follower=self.request.user, following=following_user).exists():
+        follow, created = follow_graph.follow(self.request.user, serializer.validated_data['following'])
+        if not created:
             raise serializers.ValidationError("You are already following this user")
-        serializer.save(follower=self.request.user)
+        serializer.instance = follow
+
+    @action(detail=False, methods=['get'])
+    def check(self, request):
+        """Which of ?users=1,2,3 the current user follows, in one query"""
+        try:
+            user_ids = [int(user_id) for user_id in request.query_params.get('users', '').split(',') if user_id]
+        except ValueError:
+            return Response({"error": "users must be a comma-separated list of ids"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(user_ids) > self.MAX_CHECKED_USERS:
+            return Response({"error": f"At most {self.MAX_CHECKED_USERS} users per request"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return Response(follow_graph.follows_many(request.user, user_ids))
 
 class SocialLoginView(APIView):
     provider = None
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from unfold.admin import ModelAdmin
+from unfold.admin import ModelAdmin, TabularInline
 from django.utils.html import format_html
 from .models import (
     Attachment, 
@@ -8,7 +8,14 @@ from .models import (
     Comment,
     Like,
     Dislike,
-    Category
+    Category,
+    ChallengeStats,
+    UserProgress,
+    DimensionScore,
+    JudgeTask,
+    TestCaseResult,
+    RejudgeRun,
+    ActivityEvent
 )
 
 @admin.register(Category)
@@ -26,6 +33,7 @@ class CategoryAdmin(ModelAdmin):
 class ChallengeAdmin(ModelAdmin):
     list_display = ['title', 'category', 'difficulty', 'points', 'completion_rate', 'created_at', 'tag_list']
     list_filter = ['category', 'difficulty', 'created_at', 'tags']
+    list_select_related = ['category', 'stats']
     search_fields = ['title', 'description']
     readonly_fields = ['slug', 'completion_rate']
     date_hierarchy = 'created_at'
@@ -41,6 +49,9 @@ class ChallengeAdmin(ModelAdmin):
         ('Attachments & Prerequisites', {
             'fields': ('attachments', 'prerequisites')
         }),
+        ('Judging', {
+            'fields': ('stop_on_first_failure',)
+        }),
         ('Tags & Metadata', {
             'fields': ('tags',)
         })
@@ -55,6 +66,68 @@ class ChallengeAdmin(ModelAdmin):
         return ", ".join(o.name for o in obj.tags.all())
     tag_list.short_description = 'Tags'
 
+@admin.register(ChallengeStats)
+class ChallengeStatsAdmin(ModelAdmin):
+    list_display = ['challenge', 'total_attempts', 'accepted_attempts', 'total_likes', 'updated_at']
+    list_select_related = ['challenge']
+    search_fields = ['challenge__title']
+    readonly_fields = ['challenge', 'total_attempts', 'accepted_attempts', 'total_likes', 'updated_at']
+
+@admin.register(UserProgress)
+class UserProgressAdmin(ModelAdmin):
+    list_display = ['user', 'completed_challenges', 'total_points', 'updated_at']
+    list_select_related = ['user']
+    search_fields = ['user__username']
+    readonly_fields = ['user', 'completed_challenges', 'total_points', 'updated_at']
+
+@admin.register(DimensionScore)
+class DimensionScoreAdmin(ModelAdmin):
+    list_display = ['user', 'dimension', 'points', 'solved']
+    list_select_related = ['user']
+    search_fields = ['user__username', 'dimension']
+    readonly_fields = ['user', 'dimension', 'points', 'solved']
+
+class TestCaseResultInline(TabularInline):
+    model = TestCaseResult
+    extra = 0
+    can_delete = False
+    fields = ['index', 'name', 'verdict', 'time_ms', 'exit_code', 'stderr']
+    readonly_fields = fields
+
+@admin.register(JudgeTask)
+class JudgeTaskAdmin(ModelAdmin):
+    inlines = [TestCaseResultInline]
+    list_display = [
+        'solution', 'status', 'priority', 'verdict', 'cache_hit', 'attempts', 'duration_ms', 'worker', 'created_at',
+        'finished_at'
+    ]
+    list_filter = ['status', 'priority', 'verdict', 'cache_hit', 'created_at']
+    list_select_related = ['solution__user', 'solution__challenge']
+    search_fields = ['solution__user__username', 'solution__challenge__title']
+    readonly_fields = [
+        'solution', 'priority', 'attempts', 'worker', 'verdict', 'results', 'compile_output', 'duration_ms',
+        'test_set_version', 'cache_hit', 'tests_total', 'error', 'created_at', 'claimed_at', 'finished_at'
+    ]
+
+@admin.register(RejudgeRun)
+class RejudgeRunAdmin(ModelAdmin):
+    list_display = ['challenge', 'test_set_version', 'status', 'enqueued', 'created_at', 'finished_at']
+    list_filter = ['status', 'created_at']
+    list_select_related = ['challenge']
+    search_fields = ['challenge__title']
+    readonly_fields = [
+        'challenge', 'test_set_version', 'status', 'last_solution_id', 'enqueued', 'created_at', 'finished_at'
+    ]
+
+@admin.register(ActivityEvent)
+class ActivityEventAdmin(ModelAdmin):
+    list_display = ['actor', 'verb', 'solution', 'created_at', 'fanned_out_at', 'pulled']
+    list_filter = ['verb', 'pulled', 'created_at']
+    list_select_related = ['actor']
+    search_fields = ['actor__username']
+    date_hierarchy = 'created_at'
+    readonly_fields = ['actor', 'verb', 'solution', 'comment', 'created_at', 'fanned_out_at', 'pulled']
+
 @admin.register(Solution)
 class SolutionAdmin(ModelAdmin):
     list_display = ['user', 'challenge', 'language', 'status', 'created_at']
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class ChallengesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'challenges'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+        from . import signals  # noqa: F401
+        from .search import create_sqlite_search_table
+
+        post_migrate.connect(create_sqlite_search_table, sender=self)
@@ -0,0 +1,150 @@
+import threading
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Q
+
+from .models import Solution
+
+NGRAM = 3
+
+
+def trigrams(text):
+    text = text.lower()
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+def match_offsets(code, term, limit=20):
+    """Return ``[start, end]`` character offsets of case-insensitive matches of term in code"""
+    if not term:
+        return []
+    haystack, needle = code.lower(), term.lower()
+    offsets = []
+    start = haystack.find(needle)
+    while start != -1 and len(offsets) < limit:
+        offsets.append([start, start + len(needle)])
+        start = haystack.find(needle, start + len(needle))
+    return offsets
+
+
+class TrigramIndex:
+    """In-process trigram inverted index over ``Solution.code``.
+
+    Used on SQLite (development and tests) where pg_trgm is unavailable.
+    Postings map each lowercase trigram to the ids of solutions containing it,
+    so a lookup intersects a handful of sets instead of scanning every source
+    file. The index is built lazily on first use and kept current by the
+    post_save/post_delete handlers in challenges.signals.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.postings = defaultdict(set)
+            self.documents = {}
+            self.languages = {}
+            self.built = False
+
+    def build(self):
+        with self.lock:
+            self.reset()
+            rows = Solution.objects.values_list('id', 'code', 'language').iterator(chunk_size=2000)
+            for pk, code, language in rows:
+                self._add(pk, code, language)
+            self.built = True
+
+    def _add(self, pk, code, language):
+        grams = trigrams(code)
+        self.documents[pk] = grams
+        self.languages[pk] = (language or '').lower()
+        for gram in grams:
+            self.postings[gram].add(pk)
+
+    def _remove(self, pk):
+        for gram in self.documents.pop(pk, ()):
+            ids = self.postings.get(gram)
+            if ids is not None:
+                ids.discard(pk)
+                if not ids:
+                    del self.postings[gram]
+        self.languages.pop(pk, None)
+
+    def update(self, solution):
+        with self.lock:
+            if self.built:
+                self._remove(solution.pk)
+                self._add(solution.pk, solution.code, solution.language)
+
+    def remove(self, pk):
+        with self.lock:
+            if self.built:
+                self._remove(pk)
+
+    def candidates(self, term, language=None):
+        """Ids of solutions containing every trigram of term (a superset of the real matches)"""
+        with self.lock:
+            if not self.built:
+                self.build()
+            grams = sorted((self.postings.get(gram, set()) for gram in trigrams(term)), key=len)
+            if not grams:
+                return set()
+            ids = set(grams[0])
+            for posting in grams[1:]:
+                ids &= posting
+                if not ids:
+                    break
+            if language:
+                language = language.lower()
+                ids = {pk for pk in ids if self.languages.get(pk) == language}
+            return ids
+
+
+class CodeSearch:
+    """Substring search over solution code and author usernames.
+
+    On PostgreSQL ``code__icontains`` compiles to ILIKE, which the pg_trgm GIN
+    index created in migration 0007 answers without a sequential scan. Elsewhere
+    the in-process TrigramIndex narrows the candidates first.
+
+    Usernames are matched in a subquery on the user table (trigram indexed by
+    authentication migration 0009) rather than through a join: ORing a
+    condition on the joined user table would keep the planner from combining
+    the code index with ``solution_user_recent_idx``.
+    """
+
+    def __init__(self):
+        self.index = TrigramIndex()
+
+    def uses_database_index(self):
+        return connection.vendor == 'postgresql'
+
+    def search(self, queryset, term, language=None):
+        term = term.strip()
+        if not term:
+            return queryset
+        if language:
+            queryset = queryset.filter(language__iexact=language)
+        code_match = Q(code__icontains=term)
+        if len(term) >= NGRAM and not self.uses_database_index():
+            # Candidates are verified by the icontains condition on just those rows
+            code_match &= Q(pk__in=self.index.candidates(term, language))
+        return queryset.filter(code_match | Q(user_id__in=self.matching_users(term)))
+
+    def matching_users(self, term):
+        # A subquery, not a list: short terms match too many users to send as parameters
+        return get_user_model().objects.filter(username__icontains=term).values('pk')
+
+    def update(self, solution):
+        if not self.uses_database_index():
+            self.index.update(solution)
+
+    def remove(self, pk):
+        if not self.uses_database_index():
+            self.index.remove(pk)
+
+
+code_search = CodeSearch()
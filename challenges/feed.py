@@ -0,0 +1,153 @@
+"""Activity feeds of the users someone follows, fanned out on write.
+
+Signals record an ``ActivityEvent`` in the same transaction as the action
+itself (a solution submitted or accepted, a like, a comment). ``fan_out``,
+run by the ``feed_worker`` command or the cron job, copies pending events
+into one ``TimelineEntry`` per follower, so reading a feed is a range scan
+over the reader's own timeline.
+
+Events of users with more than ``FEED_FANOUT_MAX_FOLLOWERS`` followers are
+not copied; they are marked ``pulled`` and merged into the page at read time
+instead. Timelines keep at most ``FEED_TIMELINE_MAX_ENTRIES`` entries and
+nothing older than ``FEED_RETENTION_DAYS``. Private solutions never get
+events, and reads skip the events of solutions made private since.
+"""
+import logging
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from authentication.models import Follow
+
+from .models import ActivityEvent, TimelineEntry
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def record(actor_id, verb, solution_id, comment_id=None):
+    return ActivityEvent.objects.create(actor_id=actor_id, verb=verb, solution_id=solution_id, comment_id=comment_id)
+
+
+def record_many(verb, solutions):
+    """record() for many solutions at once, each event by the solution's author"""
+    return ActivityEvent.objects.bulk_create([
+        ActivityEvent(actor_id=solution.user_id, verb=verb, solution_id=solution.pk) for solution in solutions
+    ])
+
+
+def _followers_by_actor(actor_ids):
+    followers = defaultdict(list)
+    rows = Follow.objects.filter(following_id__in=actor_ids).values_list('following_id', 'follower_id')
+    for actor_id, follower_id in rows.iterator(chunk_size=2000):
+        followers[actor_id].append(follower_id)
+    return followers
+
+
+def fan_out(limit=None):
+    """Copy up to limit pending events into their followers' timelines; returns (events, entries)"""
+    limit = limit or _setting('FEED_FANOUT_BATCH', 100)
+    with transaction.atomic():
+        # Locked until commit: a crash leaves the events pending, another worker skips them meanwhile
+        events = list(
+            ActivityEvent.objects.select_for_update(skip_locked=True)
+            .filter(fanned_out_at__isnull=True).order_by('id')[:limit]
+        )
+        if not events:
+            return 0, 0
+        actor_ids = {event.actor_id for event in events}
+        crowded = set(
+            get_user_model().objects.filter(
+                pk__in=actor_ids, followers_count__gt=_setting('FEED_FANOUT_MAX_FOLLOWERS', 1000)
+            ).values_list('pk', flat=True)
+        )
+        pushed = [event for event in events if event.actor_id not in crowded]
+        followers = _followers_by_actor({event.actor_id for event in pushed})
+        entries = [
+            TimelineEntry(owner_id=follower_id, event_id=event.pk, actor_id=event.actor_id, created_at=event.created_at)
+            for event in pushed
+            for follower_id in followers[event.actor_id]
+        ]
+        TimelineEntry.objects.bulk_create(entries, batch_size=1000, ignore_conflicts=True)
+        now = timezone.now()
+        ActivityEvent.objects.filter(pk__in=[event.pk for event in pushed]).update(fanned_out_at=now)
+        ActivityEvent.objects.filter(pk__in=[event.pk for event in events if event.actor_id in crowded]).update(
+            fanned_out_at=now, pulled=True
+        )
+    return len(events), len(entries)
+
+
+def backfill(follower_id, actor_id):
+    """Give a new follower the actor's recent fanned-out events"""
+    cutoff = timezone.now() - timedelta(days=_setting('FEED_RETENTION_DAYS', 30))
+    events = ActivityEvent.objects.filter(
+        actor_id=actor_id, pulled=False, fanned_out_at__isnull=False, created_at__gte=cutoff
+    ).order_by('-created_at', '-id').values_list('pk', 'created_at')[:_setting('FEED_BACKFILL', 20)]
+    TimelineEntry.objects.bulk_create([
+        TimelineEntry(owner_id=follower_id, event_id=event_id, actor_id=actor_id, created_at=created_at)
+        for event_id, created_at in events
+    ], ignore_conflicts=True)
+
+
+def forget(follower_id, actor_id):
+    """Drop an unfollowed user's events from the follower's timeline"""
+    TimelineEntry.objects.filter(owner_id=follower_id, actor_id=actor_id).delete()
+
+
+def sources(user):
+    """(queryset, event id field) pairs whose rows make up user's feed, for MergedKeysetPagination"""
+    cutoff = timezone.now() - timedelta(days=_setting('FEED_RETENTION_DAYS', 30))
+    timeline = TimelineEntry.objects.filter(owner=user, created_at__gte=cutoff, event__solution__is_private=False)
+    pulled = ActivityEvent.objects.filter(
+        pulled=True, created_at__gte=cutoff, solution__is_private=False,
+        actor_id__in=Follow.objects.filter(follower=user).values('following_id')
+    )
+    return [(timeline, 'event_id'), (pulled, 'id')]
+
+
+def load(event_ids):
+    """Events by id, with everything the feed serializer shows"""
+    return ActivityEvent.objects.filter(pk__in=event_ids, solution__is_private=False).select_related(
+        'actor', 'solution__challenge', 'comment'
+    )
+
+
+def trim(max_entries=None, retention_days=None):
+    """Apply the retention window and the per-timeline cap; returns entries deleted"""
+    max_entries = max_entries or _setting('FEED_TIMELINE_MAX_ENTRIES', 1000)
+    cutoff = timezone.now() - timedelta(days=retention_days or _setting('FEED_RETENTION_DAYS', 30))
+    deleted, _ = TimelineEntry.objects.filter(created_at__lt=cutoff).delete()
+    ActivityEvent.objects.filter(created_at__lt=cutoff, fanned_out_at__isnull=False).delete()
+
+    crowded = TimelineEntry.objects.values('owner').annotate(entries=Count('id')).filter(entries__gt=max_entries)
+    for owner_id in crowded.values_list('owner', flat=True):
+        oldest_kept = TimelineEntry.objects.filter(owner_id=owner_id).order_by(
+            '-created_at', '-event_id'
+        ).values_list('created_at', flat=True)[max_entries - 1]
+        count, _ = TimelineEntry.objects.filter(owner_id=owner_id, created_at__lt=oldest_kept).delete()
+        deleted += count
+    return deleted
+
+
+def run(poll_interval=2.0, once=False, should_stop=lambda: False):
+    """Fan out until should_stop(); with once, return when nothing is pending"""
+    total = 0
+    while not should_stop():
+        events, entries = fan_out()
+        total += events
+        if events:
+            logger.info('Fanned out %s events into %s timeline entries', events, entries)
+            continue
+        if once:
+            break
+        time.sleep(poll_interval)
+    return total
@@ -0,0 +1,21 @@
+from django.conf import settings
+
+from . import feed
+from .judge import rejudge
+
+
+def rejudge_stale():
+    queued = rejudge.rejudge_stale(
+        getattr(settings, 'JUDGE_REJUDGE_BATCH', 200), getattr(settings, 'JUDGE_REJUDGE_MAX_QUEUED', 1000)
+    )
+    print(f"Queued {queued} solutions for rejudging , job done")
+
+
+def fan_out_feed():
+    events = feed.run(once=True)
+    print(f"Fanned out {events} activity events , job done")
+
+
+def trim_feeds():
+    deleted = feed.trim()
+    print(f"Trimmed {deleted} feed entries , job done")
@@ -0,0 +1,6 @@
+"""Asynchronous judge for pending solutions.
+
+Submissions only enqueue a JudgeTask; the ``judge_worker`` management command
+claims tasks from the database, runs them in a process pool against the
+challenge's ``test_case`` attachments and writes the verdict back.
+"""
@@ -0,0 +1,86 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+from . import engine
+
+# Verdicts that depend on machine load rather than on the code alone
+UNCACHEABLE_VERDICTS = {engine.TIME_LIMIT_EXCEEDED}
+
+
+def normalize_code(code):
+    """Canonical form for hashing: line endings, trailing whitespace, leading/trailing blank lines"""
+    lines = [line.rstrip() for line in code.replace('\r\n', '\n').replace('\r', '\n').split('\n')]
+    return '\n'.join(lines).strip('\n')
+
+
+def verdict_key(challenge_id, test_set_version, language, code):
+    digest = hashlib.sha256()
+    for part in (str(challenge_id), str(test_set_version), language, normalize_code(code)):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return f'judge:verdict:{digest.hexdigest()}'
+
+
+class VerdictCache:
+    """LRU + TTL bounded cache of judge outcomes keyed by verdict_key().
+
+    An in-process OrderedDict answers repeat submissions within one worker,
+    backed by the Django cache. Other judge processes only reuse a verdict
+    when that cache is shared (``REDIS_URL``); with the default LocMem
+    backend every process keeps its own. Keys include the challenge's
+    test-set version, so editing test cases invalidates every entry for that
+    challenge at once.
+    """
+
+    def __init__(self, max_entries=None, ttl=None, alias='default'):
+        self.max_entries = max_entries or getattr(settings, 'JUDGE_CACHE_SIZE', 10000)
+        self.ttl = ttl or getattr(settings, 'JUDGE_CACHE_TTL', 24 * 3600)
+        self.alias = alias
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    def get(self, key):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                expires, outcome = entry
+                if expires > now:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return outcome
+                del self.entries[key]
+        outcome = self.shared.get(key)
+        if outcome is None:
+            self.misses += 1
+            return None
+        self._remember(key, outcome, now)
+        self.hits += 1
+        return outcome
+
+    def set(self, key, outcome):
+        if outcome['verdict'] in UNCACHEABLE_VERDICTS:
+            return
+        self._remember(key, outcome, time.monotonic())
+        self.shared.set(key, outcome, timeout=self.ttl)
+
+    def _remember(self, key, outcome, now):
+        with self.lock:
+            self.entries[key] = (now + self.ttl, outcome)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
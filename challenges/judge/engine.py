@@ -0,0 +1,162 @@
+"""Compile and run one submission against its test cases.
+
+Nothing here touches Django or the database, so ``judge_submission`` can run
+inside ``spawn``-ed pool processes that never import the project settings.
+"""
+import os
+import shutil
+import tempfile
+
+from . import sandbox, warm
+
+ACCEPTED = 'accepted'
+PASSED = 'passed'
+WRONG_ANSWER = 'wrong_answer'
+RUNTIME_ERROR = 'runtime_error'
+TIME_LIMIT_EXCEEDED = 'time_limit_exceeded'
+MEMORY_LIMIT_EXCEEDED = 'memory_limit_exceeded'
+OUTPUT_LIMIT_EXCEEDED = 'output_limit_exceeded'
+COMPILE_ERROR = 'compile_error'
+SKIPPED = 'skipped'
+
+OUT_OF_MEMORY_MARKERS = ('MemoryError', 'std::bad_alloc', 'heap out of memory', 'Cannot allocate memory')
+
+DETAIL_LIMIT = 2000
+
+
+def normalize_output(text):
+    """Ignore trailing whitespace on each line and trailing blank lines"""
+    lines = [line.rstrip() for line in text.replace('\r\n', '\n').split('\n')]
+    while lines and not lines[-1]:
+        lines.pop()
+    return '\n'.join(lines)
+
+
+def classify(result, expected):
+    """Verdict for one sandbox.RunResult"""
+    if result.timed_out:
+        return TIME_LIMIT_EXCEEDED
+    if result.output_exceeded:
+        return OUTPUT_LIMIT_EXCEEDED
+    if result.exit_code != 0:
+        if any(marker in result.stderr for marker in OUT_OF_MEMORY_MARKERS):
+            return MEMORY_LIMIT_EXCEEDED
+        return RUNTIME_ERROR
+    if normalize_output(result.stdout) != normalize_output(expected):
+        return WRONG_ANSWER
+    return PASSED
+
+
+def _command(template, limits):
+    return [part.format(memory_mb=limits.memory_mb) for part in template]
+
+
+def run_case(language, workdir, limits, stdin, limit_memory):
+    """Run the built program once, on a warm runner when the language has a pool"""
+    pool = warm.get_pool(language)
+    if pool is not None:
+        try:
+            with pool.runner() as runner:
+                return runner.run(workdir, language['source'], limits, stdin=stdin, limit_memory=limit_memory)
+        except warm.RunnerUnavailable:
+            pass
+    return sandbox.run(_command(language['run'], limits), workdir, limits, stdin=stdin, limit_memory=limit_memory)
+
+
+def build(language, code, compile_limits):
+    """Write the source into a fresh build directory and compile it.
+
+    Returns ``(build_dir, None)`` on success, or ``(None, outcome)`` with a
+    compile_error outcome; the caller removes build_dir with ``cleanup``.
+    """
+    build_dir = tempfile.mkdtemp(prefix='judge-')
+    try:
+        with open(os.path.join(build_dir, language['source']), 'w', encoding='utf-8') as source:
+            source.write(code)
+        sandbox.hand_over(build_dir, compile_limits)
+        if language.get('compile'):
+            result = sandbox.run(
+                _command(language['compile'], compile_limits), build_dir, compile_limits,
+                limit_memory=language.get('memory', True)
+            )
+            if result.exit_code != 0 or result.timed_out:
+                cleanup(build_dir)
+                return None, {
+                    'verdict': COMPILE_ERROR,
+                    'compile_output': (result.stderr or result.stdout)[:DETAIL_LIMIT],
+                    'tests': [],
+                    'time_ms': result.time_ms,
+                }
+        # Runs only get copies; nothing a run does may change what the next one starts from
+        sandbox.reclaim(build_dir)
+    except BaseException:
+        cleanup(build_dir)
+        raise
+    return build_dir, None
+
+
+def cleanup(build_dir):
+    shutil.rmtree(build_dir, ignore_errors=True)
+
+
+def _test(language, workdir, case, limits):
+    result = run_case(language, workdir, limits, case.input, language.get('memory', True))
+    verdict = classify(result, case.expected)
+    return {
+        'name': case.name,
+        'verdict': verdict,
+        'time_ms': result.time_ms,
+        'exit_code': result.exit_code,
+        'stderr': result.stderr[:DETAIL_LIMIT] if verdict != PASSED else '',
+    }
+
+
+def run_test(language, build_dir, case, limits):
+    """Run one case in a fresh private copy of build_dir, so cases can run concurrently"""
+    workdir = tempfile.mkdtemp(prefix='judge-run-')
+    try:
+        # Copy links as links: the judge must not read through anything a build left behind
+        shutil.copytree(build_dir, workdir, symlinks=True, dirs_exist_ok=True)
+        sandbox.hand_over(workdir, limits)
+        return _test(language, workdir, case, limits)
+    finally:
+        cleanup(workdir)
+
+
+def skipped(case):
+    return {'name': case.name, 'verdict': SKIPPED, 'time_ms': 0, 'exit_code': None, 'stderr': ''}
+
+
+def summarize(tests):
+    """Outcome for per-test results in case order; the first failed case decides the verdict"""
+    failed = next((test['verdict'] for test in tests if test['verdict'] not in (PASSED, SKIPPED)), None)
+    return {
+        'verdict': failed or ACCEPTED,
+        'compile_output': '',
+        'tests': tests,
+        'time_ms': round(sum(test['time_ms'] for test in tests), 2),
+    }
+
+
+def judge_submission(language, code, cases, limits, compile_limits, stop_on_failure=False):
+    """Judge code against cases one after another and return a picklable outcome dict.
+
+    ``language`` is a config dict from ``judge.languages``; ``cases`` are
+    ``testcases.TestCase`` tuples; ``limits``/``compile_limits`` are
+    ``sandbox.Limits``. With stop_on_failure the cases after the first
+    failure are reported as skipped. ``JudgeWorker`` fans the cases out with
+    ``build``/``run_test`` instead.
+    """
+    build_dir, outcome = build(language, code, compile_limits)
+    if outcome is not None:
+        return outcome
+    tests = []
+    try:
+        for case in cases:
+            if stop_on_failure and any(test['verdict'] != PASSED for test in tests):
+                tests.append(skipped(case))
+            else:
+                tests.append(run_test(language, build_dir, case, limits))
+    finally:
+        cleanup(build_dir)
+    return summarize(tests)
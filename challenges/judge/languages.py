@@ -0,0 +1,73 @@
+import sys
+
+from django.conf import settings
+
+# How to build and run a submission. Commands run inside the per-run working
+# directory; ``compile`` is optional. ``memory`` False skips RLIMIT_AS for
+# runtimes that reserve large virtual address ranges up front (V8). ``warm``
+# keeps a pool of pre-started runners per judge process (see judge.warm);
+# override it per language with settings.JUDGE_WARM_POOLS, None to disable.
+DEFAULT_LANGUAGES = {
+    'python': {
+        'source': 'main.py',
+        'run': [sys.executable, '-I', '-S', 'main.py'],
+        'warm': {
+            'size': 2,
+            'max_uses': 200,
+            'preload': [
+                'bisect', 'collections', 'decimal', 'fractions', 'functools', 'heapq',
+                'itertools', 'math', 'random', 're', 'string',
+            ],
+        },
+    },
+    'javascript': {
+        'source': 'main.js',
+        'run': ['node', '--max-old-space-size={memory_mb}', 'main.js'],
+        'memory': False,
+    },
+    'c': {
+        'source': 'main.c',
+        'compile': ['gcc', '-O2', '-std=c17', '-o', 'main', 'main.c', '-lm'],
+        'run': ['./main'],
+    },
+    'cpp': {
+        'source': 'main.cpp',
+        'compile': ['g++', '-O2', '-std=c++17', '-o', 'main', 'main.cpp'],
+        'run': ['./main'],
+    },
+}
+
+ALIASES = {
+    'py': 'python',
+    'python3': 'python',
+    'js': 'javascript',
+    'node': 'javascript',
+    'c++': 'cpp',
+}
+
+
+def canonical_name(name):
+    """The key a Solution.language value stands for: 'Py ' and 'python3' are both 'python'"""
+    key = (name or '').strip().lower()
+    return ALIASES.get(key, key)
+
+
+def get_language(name):
+    """Language config for a Solution.language value, or None if it can't be judged"""
+    key = canonical_name(name)
+    languages = {**DEFAULT_LANGUAGES, **getattr(settings, 'JUDGE_LANGUAGES', {})}
+    config = languages.get(key)
+    if config is None:
+        return None
+    config = dict(config, name=key)
+    pools = getattr(settings, 'JUDGE_WARM_POOLS', {})
+    if key in pools:
+        config['warm'] = pools[key] and {**config.get('warm', {}), **pools[key]}
+    return config
+
+
+def warm_languages():
+    """Configs of every language that has a warm runner pool"""
+    names = {**DEFAULT_LANGUAGES, **getattr(settings, 'JUDGE_LANGUAGES', {})}
+    configs = (get_language(name) for name in names)
+    return [config for config in configs if config.get('warm')]
@@ -0,0 +1,150 @@
+"""Re-judge solutions after a challenge's test cases change.
+
+Every judge task records the test-set version it ran against. ``step``
+queues, in id order and a batch at a time, the solutions of a challenge
+whose latest verdict came from an older version; a ``RejudgeRun`` keeps
+the cursor, so an interrupted run carries on where it stopped. Rejudge
+tasks get the lowest scheduling priority, and the worker applies their
+verdicts with ``apply_statuses`` in bulk rather than saving each solution.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F, Max, Q
+from django.utils import timezone
+
+from .. import feed
+from ..models import (
+    ActivityEvent, Challenge, ChallengeStats, DimensionScore, JudgeTask, RejudgeRun, Solution, UserProgress
+)
+
+JUDGED = ['accepted', 'rejected']
+ACTIVE = [JudgeTask.QUEUED, JudgeTask.RUNNING]
+
+
+def stale_challenges():
+    """Challenges with at least one verdict from an older test set"""
+    return Challenge.objects.filter(
+        pk__in=JudgeTask.objects.filter(
+            status=JudgeTask.DONE, test_set_version__lt=F('solution__challenge__test_set_version')
+        ).values('solution__challenge_id')
+    )
+
+
+def stale_solutions(challenge):
+    """Judged solutions whose latest verdict predates the challenge's test set and aren't queued again"""
+    return (
+        Solution.objects.filter(challenge=challenge, status__in=JUDGED)
+        .exclude(judge_tasks__status__in=ACTIVE)
+        .annotate(judged_version=Max('judge_tasks__test_set_version', filter=Q(judge_tasks__status=JudgeTask.DONE)))
+        .filter(judged_version__lt=challenge.test_set_version)
+    )
+
+
+def queued_rejudges():
+    return JudgeTask.objects.filter(priority=JudgeTask.REJUDGE, status__in=ACTIVE).count()
+
+
+def step(challenge, batch_size=200, budget=None):
+    """Queue the next batch of a challenge's stale solutions; returns how many were queued"""
+    RejudgeRun.objects.filter(
+        challenge=challenge, status=RejudgeRun.RUNNING, test_set_version__lt=challenge.test_set_version
+    ).update(status=RejudgeRun.SUPERSEDED, finished_at=timezone.now())
+    run, _ = RejudgeRun.objects.get_or_create(challenge=challenge, test_set_version=challenge.test_set_version)
+    if run.status != RejudgeRun.RUNNING:
+        return 0
+    limit = batch_size if budget is None else min(batch_size, budget)
+    if limit <= 0:
+        return 0
+    ids = list(
+        stale_solutions(challenge).filter(pk__gt=run.last_solution_id)
+        .order_by('pk').values_list('pk', flat=True)[:limit]
+    )
+    with transaction.atomic():
+        if not ids:
+            run.status = RejudgeRun.DONE
+            run.finished_at = timezone.now()
+            run.save(update_fields=['status', 'finished_at'])
+            return 0
+        JudgeTask.objects.bulk_create([
+            JudgeTask(solution_id=solution_id, priority=JudgeTask.REJUDGE) for solution_id in ids
+        ])
+        # Cursor and tasks commit together, so a crash never skips or doubles a batch
+        run.last_solution_id = ids[-1]
+        run.enqueued = F('enqueued') + len(ids)
+        run.save(update_fields=['last_solution_id', 'enqueued'])
+    return len(ids)
+
+
+def rejudge_stale(batch_size=200, max_queued=1000, challenges=None):
+    """Queue stale solutions across challenges until max_queued rejudge tasks are waiting"""
+    total = 0
+    for challenge in (challenges if challenges is not None else stale_challenges()):
+        while True:
+            queued = step(challenge, batch_size, budget=max_queued - queued_rejudges())
+            total += queued
+            if queued < batch_size:
+                break
+        if queued_rejudges() >= max_queued:
+            break
+    return total
+
+
+def _accepted_pairs(pairs):
+    """Which (user_id, challenge_id) pairs have at least one accepted solution"""
+    if not pairs:
+        return set()
+    users = {user_id for user_id, _ in pairs}
+    challenges = {challenge_id for _, challenge_id in pairs}
+    accepted = Solution.objects.filter(
+        status='accepted', user_id__in=users, challenge_id__in=challenges
+    ).values_list('user_id', 'challenge_id').distinct()
+    return set(accepted) & pairs
+
+
+def apply_statuses(statuses):
+    """Set many solutions' statuses at once from {solution_id: status}.
+
+    The bulk counterpart of saving each solution: challenge stats get one
+    bump per challenge, progress one rebuild for the affected users, and
+    points move through ``User.add_points_bulk``, and newly accepted public
+    solutions get their feed event in one insert. Returns the number of
+    solutions whose status changed.
+    """
+    with transaction.atomic():
+        solutions = list(
+            Solution.objects.select_for_update().filter(pk__in=statuses).select_related('challenge')
+        )
+        changed = [(solution, solution.status) for solution in solutions if solution.status != statuses[solution.pk]]
+        if not changed:
+            return 0
+        pairs = {(solution.user_id, solution.challenge_id) for solution, _ in changed}
+        before = _accepted_pairs(pairs)
+        for solution, _ in changed:
+            solution.status = statuses[solution.pk]
+            solution._loaded_status = solution.status
+        Solution.objects.bulk_update([solution for solution, _ in changed], ['status'])
+        after = _accepted_pairs(pairs)
+
+        accepted = {}
+        for solution, previous in changed:
+            delta = (solution.status == 'accepted') - (previous == 'accepted')
+            accepted[solution.challenge_id] = accepted.get(solution.challenge_id, 0) + delta
+        for challenge_id, delta in accepted.items():
+            ChallengeStats.objects.bump(challenge_id, accepted_attempts=delta)
+        user_ids = list({user_id for user_id, _ in pairs})
+        UserProgress.objects.rebuild(user_ids=user_ids)
+        DimensionScore.objects.rebuild(user_ids=user_ids)
+
+        points = {solution.challenge_id: solution.challenge.points for solution, _ in changed}
+        awards = []
+        for user_id, challenge_id in pairs:
+            delta = ((user_id, challenge_id) in after) - ((user_id, challenge_id) in before)
+            if delta:
+                verb = 'accepted' if delta > 0 else 'revoked'
+                awards.append((user_id, delta * points[challenge_id], f'challenge {challenge_id} {verb} on rejudge'))
+        get_user_model().add_points_bulk(awards)
+        feed.record_many(ActivityEvent.ACCEPTED, [
+            solution for solution, previous in changed
+            if solution.status == 'accepted' and previous != 'accepted' and not solution.is_private
+        ])
+    return len(changed)
@@ -0,0 +1,167 @@
+import os
+import shutil
+import signal
+import subprocess
+import tempfile
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+from .zygote import apply_limits, drop_privileges
+
+RunResult = namedtuple('RunResult', 'exit_code stdout stderr time_ms timed_out output_exceeded')
+
+# uid/gid: the unprivileged account submissions run as (settings.JUDGE_RUN_AS_UID/GID)
+Limits = namedtuple('Limits', 'cpu_seconds wall_seconds memory_mb output_kb processes uid gid',
+                    defaults=(None, None))
+
+# A run's stdin and captured output, kept out of any directory the submission can write
+RunFiles = namedtuple('RunFiles', 'stdin stdout stderr')
+
+
+class SandboxError(RuntimeError):
+    """Submissions can't be isolated as configured, so none may run"""
+
+
+def check_account(limits):
+    """Refuse to judge unless programs will run as a separate unprivileged account"""
+    if limits.uid is None or limits.gid is None:
+        raise SandboxError('Set JUDGE_RUN_AS_UID and JUDGE_RUN_AS_GID to an unprivileged account')
+    if limits.uid == 0 or limits.gid == 0:
+        raise SandboxError('Submissions must not run as root')
+    if os.geteuid() != 0 and (limits.uid, limits.gid) != (os.geteuid(), os.getegid()):
+        raise SandboxError(
+            f'Only root can switch to uid {limits.uid}; run the judge as root or as that account'
+        )
+
+
+def _chown_tree(path, uid, gid):
+    # Never follow links: the tree may hold symlinks a submission planted
+    for root, dirs, files in os.walk(path):
+        os.chown(root, uid, gid, follow_symlinks=False)
+        for name in dirs + files:
+            os.chown(os.path.join(root, name), uid, gid, follow_symlinks=False)
+
+
+def hand_over(path, limits):
+    """Give the run's account ownership of a scratch directory it builds or runs in"""
+    check_account(limits)
+    if os.geteuid() == 0:
+        _chown_tree(path, limits.uid, limits.gid)
+
+
+def reclaim(path):
+    """Take a scratch directory back from the run's account, e.g. a build shared by later runs"""
+    if os.geteuid() == 0:
+        _chown_tree(path, 0, 0)
+
+
+@contextmanager
+def run_files(stdin=''):
+    """Fresh stdin/stdout/stderr files for one run, in a directory only the judge can enter.
+
+    The files are created with O_EXCL and opened with O_NOFOLLOW, so the
+    judge never reads back or truncates a file a submission pointed it at.
+    """
+    directory = tempfile.mkdtemp(prefix='judge-io-')
+    try:
+        files = RunFiles(*(os.path.join(directory, name) for name in RunFiles._fields))
+        for path, data in zip(files, (stdin.encode(), b'', b'')):
+            with os.fdopen(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_NOFOLLOW, 0o600), 'wb') as f:
+                f.write(data)
+        yield files
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def _open(path, flags):
+    return os.fdopen(os.open(path, flags | os.O_NOFOLLOW), 'rb' if flags == os.O_RDONLY else 'wb')
+
+
+def _limit_child(limits, limit_memory):
+    """preexec_fn: runs in the child between fork and exec"""
+    def apply():
+        os.setsid()
+        drop_privileges(limits.uid, limits.gid)
+        apply_limits(limits.cpu_seconds, limits.memory_mb, limits.output_kb, limits.processes, limit_memory)
+    return apply
+
+
+def _kill_group(process):
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def child_env(home):
+    return {
+        'PATH': os.environ.get('PATH', '/usr/bin:/bin'),
+        'HOME': home,
+        'LANG': 'C.UTF-8',
+        'PYTHONDONTWRITEBYTECODE': '1',
+    }
+
+
+def run(command, workdir, limits, stdin='', limit_memory=True):
+    """Run command in workdir under CPU, memory, output and wall-clock limits.
+
+    The child gets its own session so the whole process group can be killed
+    on timeout, a minimal environment, and stdout redirected to a file capped
+    by RLIMIT_FSIZE. It runs as ``limits.uid``/``limits.gid``, an account
+    that owns nothing but the scratch directory, so it can't read the
+    project's settings or share RLIMIT_NPROC with the web workers; network
+    isolation is still up to the host (a firewall rule for that uid). Its
+    stdio are descriptors the judge opened before the fork (``run_files``).
+    """
+    check_account(limits)
+    env = child_env(workdir)
+    with run_files(stdin) as files:
+        started = time.perf_counter()
+        with _open(files.stdin, os.O_RDONLY) as stdin_file, \
+                _open(files.stdout, os.O_WRONLY) as stdout, _open(files.stderr, os.O_WRONLY) as stderr:
+            process = subprocess.Popen(
+                command,
+                cwd=workdir,
+                env=env,
+                stdin=stdin_file,
+                stdout=stdout,
+                stderr=stderr,
+                preexec_fn=_limit_child(limits, limit_memory),
+                close_fds=True,
+            )
+            timed_out = False
+            try:
+                process.wait(timeout=limits.wall_seconds)
+            except subprocess.TimeoutExpired:
+                timed_out = True
+                _kill_group(process)
+                process.wait()
+            finally:
+                # Reap anything the program left behind in its process group
+                _kill_group(process)
+        elapsed = (time.perf_counter() - started) * 1000
+        return collect(files, limits, process.returncode, elapsed, timed_out)
+
+
+def collect(files, limits, exit_code, elapsed, timed_out):
+    """Build the RunResult from an exit status and the capped output in run_files"""
+    if exit_code == -signal.SIGXCPU or (exit_code == -signal.SIGKILL and elapsed >= limits.cpu_seconds * 1000):
+        timed_out = True
+    cap = limits.output_kb * 1024
+    output = _read_capped(files.stdout, cap)
+    errors = _read_capped(files.stderr, cap)
+    return RunResult(
+        exit_code=exit_code,
+        stdout=output.decode('utf-8', errors='replace'),
+        stderr=errors.decode('utf-8', errors='replace'),
+        time_ms=round(elapsed, 2),
+        timed_out=timed_out,
+        # CPython ignores SIGXFSZ and fails the write instead, so check the size too
+        output_exceeded=exit_code == -signal.SIGXFSZ or len(output) >= cap,
+    )
+
+
+def _read_capped(path, cap):
+    with _open(path, os.O_RDONLY) as handle:
+        return handle.read(cap)
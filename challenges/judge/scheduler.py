@@ -0,0 +1,119 @@
+"""Which queued judge tasks run next, and how full the queue is.
+
+Tasks are ordered by priority class (a user's first attempt at a challenge
+before their resubmissions, with resubmissions promoted once they have
+waited ``JUDGE_PRIORITY_AGING`` seconds, and background rejudges last),
+then, while the queue is deeper than ``JUDGE_PEAK_QUEUE_DEPTH``, easy
+challenges before hard ones, then by each user's position in their own
+queue so a user with fifty pending solutions gets one judged per round like
+everybody else.
+"""
+import math
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Avg, Case, Count, DurationField, ExpressionWrapper, F, IntegerField, Min, Value, When
+from django.db.models.functions import RowNumber
+from django.db.models.expressions import Window
+from django.utils import timezone
+
+from ..models import JudgeTask, Solution
+
+ACTIVE = [JudgeTask.QUEUED, JudgeTask.RUNNING]
+
+DIFFICULTY_RANK = Case(
+    When(solution__challenge__difficulty='easy', then=Value(0)),
+    When(solution__challenge__difficulty='medium', then=Value(1)),
+    default=Value(2),
+    output_field=IntegerField(),
+)
+
+
+def priority_for(solution):
+    """FIRST_ATTEMPT unless the user already submitted to this challenge"""
+    earlier = Solution.objects.filter(user_id=solution.user_id, challenge_id=solution.challenge_id)
+    if solution.pk:
+        earlier = earlier.exclude(pk=solution.pk)
+    return JudgeTask.RESUBMISSION if earlier.exists() else JudgeTask.FIRST_ATTEMPT
+
+
+def queue_depth():
+    return JudgeTask.objects.filter(status=JudgeTask.QUEUED).count()
+
+
+def candidates(limit, depth=None):
+    """Ids of the next limit queued tasks in scheduling order"""
+    if depth is None:
+        depth = queue_depth()
+    aging = timezone.now() - timedelta(seconds=getattr(settings, 'JUDGE_PRIORITY_AGING', 300))
+    queued = JudgeTask.objects.filter(status=JudgeTask.QUEUED).annotate(
+        effective_priority=Case(
+            When(priority=JudgeTask.RESUBMISSION, created_at__lt=aging, then=Value(JudgeTask.FIRST_ATTEMPT)),
+            default=F('priority'),
+            output_field=IntegerField(),
+        ),
+        user_turn=Window(
+            RowNumber(),
+            partition_by=[F('solution__user_id')],
+            order_by=[F('created_at').asc(), F('id').asc()],
+        ),
+    )
+    ordering = ['effective_priority', 'user_turn', 'created_at', 'id']
+    if depth > getattr(settings, 'JUDGE_PEAK_QUEUE_DEPTH', 100):
+        queued = queued.annotate(difficulty_rank=DIFFICULTY_RANK)
+        ordering.insert(1, 'difficulty_rank')
+    return list(queued.order_by(*ordering).values_list('pk', flat=True)[:limit])
+
+
+def submitted(user):
+    """Tasks for the user's own submissions; rejudges aren't the user's doing"""
+    return JudgeTask.objects.filter(solution__user=user, priority__lt=JudgeTask.REJUDGE)
+
+
+def active_count(user):
+    """Solutions of user still waiting for a verdict from the judge"""
+    return submitted(user).filter(status__in=ACTIVE).count()
+
+
+def over_limit(user):
+    return active_count(user) >= getattr(settings, 'JUDGE_MAX_PENDING_PER_USER', 5)
+
+
+def retry_after(user):
+    """Seconds until the user's oldest active task is likely judged"""
+    average = recent_wait()
+    oldest = submitted(user).filter(status__in=ACTIVE).aggregate(
+        oldest=Min('created_at')
+    )['oldest']
+    if average is None or oldest is None:
+        return getattr(settings, 'JUDGE_RETRY_AFTER', 10)
+    remaining = average - (timezone.now() - oldest).total_seconds()
+    return max(1, math.ceil(remaining))
+
+
+def recent_wait(window_seconds=3600):
+    """Average seconds between submission and claim for user tasks claimed in the window"""
+    since = timezone.now() - timedelta(seconds=window_seconds)
+    wait = JudgeTask.objects.filter(claimed_at__gte=since, priority__lt=JudgeTask.REJUDGE).aggregate(
+        wait=Avg(ExpressionWrapper(F('claimed_at') - F('created_at'), output_field=DurationField()))
+    )['wait']
+    return wait.total_seconds() if wait is not None else None
+
+
+def queue_stats():
+    """Queue depth per status and priority, oldest queued task age and recent average wait"""
+    counts = JudgeTask.objects.filter(status__in=ACTIVE).values('status', 'priority').annotate(count=Count('id'))
+    depth = {status: {'total': 0} for status in ACTIVE}
+    for row in counts:
+        label = dict(JudgeTask.PRIORITY_CHOICES)[row['priority']]
+        depth[row['status']][label] = row['count']
+        depth[row['status']]['total'] += row['count']
+    oldest = JudgeTask.objects.filter(status=JudgeTask.QUEUED).aggregate(oldest=Min('created_at'))['oldest']
+    users = JudgeTask.objects.filter(status__in=ACTIVE).values('solution__user_id').distinct().count()
+    return {
+        'depth': depth,
+        'users_waiting': users,
+        'oldest_wait_seconds': round((timezone.now() - oldest).total_seconds(), 1) if oldest else 0,
+        'recent_wait_seconds': recent_wait(),
+        'peak': depth[JudgeTask.QUEUED]['total'] > getattr(settings, 'JUDGE_PEAK_QUEUE_DEPTH', 100),
+    }
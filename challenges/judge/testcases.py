@@ -0,0 +1,55 @@
+import json
+from collections import namedtuple
+
+TEST_CASE_FILE_TYPE = 'test_case'
+
+TestCase = namedtuple('TestCase', 'name input expected')
+
+
+class TestCaseError(ValueError):
+    """A test_case attachment that can't be parsed"""
+
+
+def test_case_attachments(challenge):
+    return challenge.attachments.filter(file_type__iexact=TEST_CASE_FILE_TYPE).order_by('title', 'id')
+
+
+def parse_test_cases(raw, source='attachment'):
+    """Parse one test_case attachment.
+
+    The file is JSON: a single case, a list of cases, or ``{"cases": [...]}``.
+    Each case has ``input`` (stdin, optional) and ``output`` or
+    ``expected_output``, plus an optional ``name``.
+    """
+    try:
+        data = json.loads(raw)
+    except (TypeError, ValueError) as e:
+        raise TestCaseError(f'{source}: invalid JSON ({e})')
+    if isinstance(data, dict):
+        data = data.get('cases', [data])
+    if not isinstance(data, list):
+        raise TestCaseError(f'{source}: expected a list of test cases')
+
+    cases = []
+    for index, case in enumerate(data, start=1):
+        if not isinstance(case, dict):
+            raise TestCaseError(f'{source}: case {index} is not an object')
+        expected = case.get('output', case.get('expected_output'))
+        if expected is None:
+            raise TestCaseError(f'{source}: case {index} has no expected output')
+        cases.append(TestCase(
+            name=str(case.get('name') or f'{source}#{index}'),
+            input=str(case.get('input', '')),
+            expected=str(expected),
+        ))
+    return cases
+
+
+def load_test_cases(challenge):
+    """All test cases for a challenge, in attachment title order"""
+    cases = []
+    for attachment in test_case_attachments(challenge):
+        with attachment.file.open('rb') as handle:
+            raw = handle.read().decode('utf-8')
+        cases.extend(parse_test_cases(raw, source=attachment.title))
+    return cases
@@ -0,0 +1,178 @@
+"""Pools of pre-started runners so test cases skip interpreter start-up.
+
+A runner is a long-lived ``zygote.py`` process that has already imported
+the language's common modules. Every run forks a fresh child from it inside
+the run's scratch directory under the same rlimits as a cold ``sandbox.run``,
+so nothing a submission does survives its own run. Runners are still
+replaced after ``max_uses`` runs to bound any slow growth in the zygote.
+
+Pools are per process: each judge pool process keeps ``size`` idle runners
+for every language with a ``warm`` config.
+"""
+import atexit
+import json
+import os
+import select
+import subprocess
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from . import sandbox
+
+ZYGOTE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'zygote.py')
+# Time allowed on top of the wall limit for the zygote to reap and reply
+REPLY_GRACE_SECONDS = 5
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class RunnerUnavailable(RuntimeError):
+    """The runner died or stopped answering; the run should be retried cold"""
+
+
+class WarmRunner:
+    def __init__(self, interpreter, preload=()):
+        self.process = subprocess.Popen(
+            [interpreter, '-I', '-S', ZYGOTE, *preload],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=sandbox.child_env(tempfile.gettempdir()),
+            start_new_session=True,
+            close_fds=True,
+        )
+        self.uses = 0
+
+    @property
+    def alive(self):
+        return self.process.poll() is None
+
+    def run(self, workdir, source, limits, stdin='', limit_memory=True):
+        """Same contract as sandbox.run for a program file in workdir"""
+        sandbox.check_account(limits)
+        with sandbox.run_files(stdin) as files:
+            job = {
+                'workdir': workdir,
+                'source': source,
+                **files._asdict(),
+                'limits': limits._asdict(),
+                'limit_memory': limit_memory,
+            }
+            try:
+                self.process.stdin.write(json.dumps(job).encode() + b'\n')
+                self.process.stdin.flush()
+                ready, _, _ = select.select([self.process.stdout], [], [], limits.wall_seconds + REPLY_GRACE_SECONDS)
+                line = self.process.stdout.readline() if ready else b''
+            except OSError:
+                line = b''
+            if not line:
+                self.close()
+                raise RunnerUnavailable('warm runner did not reply')
+            self.uses += 1
+            reply = json.loads(line)
+            return sandbox.collect(files, limits, reply['exit_code'], reply['time_ms'], reply['timed_out'])
+
+    def close(self):
+        if self.alive:
+            self.process.kill()
+        self.process.wait()
+        for stream in (self.process.stdin, self.process.stdout):
+            stream.close()
+
+
+class RunnerPool:
+    """Up to size idle runners for one interpreter, replaced after max_uses runs"""
+
+    def __init__(self, interpreter, size=1, max_uses=200, preload=()):
+        self.interpreter = interpreter
+        self.size = size
+        self.max_uses = max_uses
+        self.preload = list(preload)
+        self.idle = []
+        self.lock = threading.Lock()
+        self.started = self.recycled = 0
+
+    def spawn(self):
+        self.started += 1
+        return WarmRunner(self.interpreter, self.preload)
+
+    def warm(self):
+        """Start runners until size are idle"""
+        with self.lock:
+            missing = self.size - len(self.idle)
+        fresh = [self.spawn() for _ in range(missing)]
+        for runner in fresh:
+            self.release(runner)
+
+    def acquire(self):
+        with self.lock:
+            while self.idle:
+                runner = self.idle.pop()
+                if runner.alive:
+                    return runner
+                runner.close()
+        return self.spawn()
+
+    def release(self, runner):
+        if runner.uses >= self.max_uses:
+            runner.close()
+            self.recycled += 1
+            runner = self.spawn()
+        if runner.alive:
+            with self.lock:
+                if len(self.idle) < self.size:
+                    self.idle.append(runner)
+                    return
+        runner.close()
+
+    @contextmanager
+    def runner(self):
+        runner = self.acquire()
+        try:
+            yield runner
+        except BaseException:
+            runner.close()
+            raise
+        self.release(runner)
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for runner in idle:
+            runner.close()
+
+
+def get_pool(language):
+    """The process-wide pool for a language config, or None if it runs cold"""
+    config = language.get('warm')
+    if not config or config.get('size', 1) < 1:
+        return None
+    with _pools_lock:
+        pool = _pools.get(language['name'])
+        if pool is None:
+            pool = _pools[language['name']] = RunnerPool(
+                language['run'][0],
+                size=config.get('size', 1),
+                max_uses=config.get('max_uses', 200),
+                preload=config.get('preload', ()),
+            )
+    return pool
+
+
+def prewarm(languages):
+    """ProcessPoolExecutor initializer: start every pool before the first task"""
+    for language in languages:
+        pool = get_pool(language)
+        if pool is not None:
+            pool.warm()
+
+
+@atexit.register
+def close_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,441 @@
+import logging
+import multiprocessing
+import os
+import socket
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import Challenge, JudgeTask, Solution, TestCaseResult
+from . import engine, rejudge, sandbox, scheduler, warm
+from .cache import VerdictCache, verdict_key
+from .languages import get_language, warm_languages
+from .sandbox import Limits
+from .testcases import TestCaseError, load_test_cases
+
+logger = logging.getLogger(__name__)
+
+
+def _account_id(name):
+    value = getattr(settings, name, None)
+    return None if value in (None, '') else int(value)
+
+
+def get_limits():
+    run = Limits(
+        cpu_seconds=getattr(settings, 'JUDGE_TIME_LIMIT', 2),
+        wall_seconds=getattr(settings, 'JUDGE_WALL_TIME_LIMIT', 5),
+        memory_mb=getattr(settings, 'JUDGE_MEMORY_LIMIT_MB', 256),
+        output_kb=getattr(settings, 'JUDGE_OUTPUT_LIMIT_KB', 1024),
+        processes=getattr(settings, 'JUDGE_MAX_PROCESSES', 64),
+        uid=_account_id('JUDGE_RUN_AS_UID'),
+        gid=_account_id('JUDGE_RUN_AS_GID'),
+    )
+    compile_ = run._replace(
+        cpu_seconds=getattr(settings, 'JUDGE_COMPILE_TIME_LIMIT', 20),
+        wall_seconds=getattr(settings, 'JUDGE_COMPILE_TIME_LIMIT', 20) * 2,
+        memory_mb=max(run.memory_mb, 1024),
+        output_kb=64 * 1024,
+    )
+    return run, compile_
+
+
+def enqueue(solution):
+    return JudgeTask.objects.create(solution=solution, priority=scheduler.priority_for(solution))
+
+
+def claim(worker_id, limit):
+    """Move up to limit queued tasks, in scheduler order, to running for this worker.
+
+    The scheduler's window query can't take row locks, so exclusivity comes
+    from the conditional UPDATE: when two workers pick the same candidates,
+    each task goes to whichever UPDATE reaches it first.
+    """
+    ids = scheduler.candidates(limit)
+    JudgeTask.objects.filter(pk__in=ids, status=JudgeTask.QUEUED).update(
+        status=JudgeTask.RUNNING,
+        worker=worker_id,
+        claimed_at=timezone.now(),
+        attempts=F('attempts') + 1
+    )
+    order = {pk: position for position, pk in enumerate(ids)}
+    tasks = JudgeTask.objects.filter(pk__in=ids, status=JudgeTask.RUNNING, worker=worker_id).select_related(
+        'solution__challenge'
+    )
+    return sorted(tasks, key=lambda task: order[task.pk])
+
+
+def requeue_stale(lease_seconds, max_attempts):
+    """Return tasks held by crashed workers to the queue, or give up on them"""
+    cutoff = timezone.now() - timedelta(seconds=lease_seconds)
+    stale = JudgeTask.objects.filter(status=JudgeTask.RUNNING, claimed_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=max_attempts).update(
+        status=JudgeTask.FAILED, error='Worker lost the task too many times', finished_at=timezone.now()
+    )
+    requeued = stale.update(status=JudgeTask.QUEUED, worker='')
+    return requeued, failed
+
+
+def resolve_language(task):
+    """Language config for the task's solution, or None after skipping the task"""
+    language = get_language(task.solution.language)
+    if language is None:
+        skip(task, f'No judge configured for language {task.solution.language!r}')
+    return language
+
+
+def cache_key(task, language):
+    solution = task.solution
+    return verdict_key(solution.challenge_id, solution.challenge.test_set_version, language['name'], solution.code)
+
+
+def load_cases(task):
+    """Test cases for the task's challenge, or None after recording why there are none"""
+    try:
+        cases = load_test_cases(task.solution.challenge)
+    except (TestCaseError, OSError, UnicodeDecodeError) as e:
+        fail(task, f'Could not load test cases: {e}')
+        return None
+    if not cases:
+        skip(task, 'Challenge has no test_case attachments')
+        return None
+    return cases
+
+
+def skip(task, reason):
+    """Leave the solution pending for manual review"""
+    JudgeTask.objects.filter(pk=task.pk).update(
+        status=JudgeTask.SKIPPED, error=reason, finished_at=timezone.now()
+    )
+
+
+def fail(task, reason):
+    JudgeTask.objects.filter(pk=task.pk).update(
+        status=JudgeTask.FAILED, error=reason, finished_at=timezone.now()
+    )
+
+
+def release(task):
+    """Hand a claimed task back to the queue (the worker is shutting down)"""
+    JudgeTask.objects.filter(pk=task.pk, status=JudgeTask.RUNNING).update(status=JudgeTask.QUEUED, worker='')
+
+
+def start(task, total):
+    """Reset per-test rows left by an earlier attempt before streaming new ones"""
+    TestCaseResult.objects.filter(task=task).delete()
+    JudgeTask.objects.filter(pk=task.pk).update(tests_total=total)
+
+
+def _test_result(task, index, test):
+    return TestCaseResult(
+        task=task,
+        index=index,
+        name=test['name'][:200],
+        verdict=test['verdict'],
+        time_ms=test['time_ms'],
+        exit_code=test['exit_code'],
+        stderr=test['stderr'],
+    )
+
+
+def record_test(task, index, test):
+    _test_result(task, index, test).save()
+
+
+def _set_solution_status(solution_id, status):
+    solution = Solution.objects.select_for_update().filter(pk=solution_id).first()
+    if solution is None or solution.status == status:
+        return
+    solution.status = status
+    # save() rather than update() so stats, progress and points signals see the transition
+    solution.save(update_fields=['status'])
+
+
+def reject_early(task):
+    """A case failed, so the solution is rejected whatever the remaining cases do"""
+    with transaction.atomic():
+        _set_solution_status(task.solution_id, 'rejected')
+
+
+def record_outcome(task, outcome, cache_hit=False):
+    """Store the outcome on the task, adding any per-test rows that weren't streamed"""
+    JudgeTask.objects.filter(pk=task.pk).update(
+        status=JudgeTask.DONE,
+        verdict=outcome['verdict'],
+        results=outcome['tests'],
+        compile_output=outcome['compile_output'],
+        duration_ms=outcome['time_ms'],
+        test_set_version=task.solution.challenge.test_set_version,
+        cache_hit=cache_hit,
+        tests_total=len(outcome['tests']),
+        finished_at=timezone.now()
+    )
+    # Cases that were not streamed: cache hits, joined duplicates, skipped cases
+    recorded = set(TestCaseResult.objects.filter(task=task).values_list('index', flat=True))
+    TestCaseResult.objects.bulk_create([
+        _test_result(task, index, test)
+        for index, test in enumerate(outcome['tests'])
+        if index not in recorded
+    ])
+    requeue_if_outdated(task)
+
+
+def requeue_if_outdated(task):
+    """The test data changed while the task ran: judge the solution again against the new set.
+
+    The task keeps the version it was judged on. The rejudge run for the new
+    version skipped this solution while the task was active and may already
+    be done, so the follow-up task is queued here.
+    """
+    judged = task.solution.challenge.test_set_version
+    current = Challenge.objects.filter(pk=task.solution.challenge_id).values_list('test_set_version', flat=True).first()
+    if current is None or current <= judged:
+        return
+    if JudgeTask.objects.filter(solution_id=task.solution_id, status__in=rejudge.ACTIVE).exists():
+        return
+    JudgeTask.objects.create(solution_id=task.solution_id, priority=JudgeTask.REJUDGE)
+
+
+def _status_for(outcome):
+    return 'accepted' if outcome['verdict'] == engine.ACCEPTED else 'rejected'
+
+
+def finish(task, outcome, cache_hit=False):
+    """Store the outcome and move the solution to accepted/rejected"""
+    with transaction.atomic():
+        record_outcome(task, outcome, cache_hit)
+        _set_solution_status(task.solution_id, _status_for(outcome))
+
+
+def finish_rejudged(finished):
+    """finish() for many rejudge tasks at once, from [(task, outcome, cache_hit)]"""
+    with transaction.atomic():
+        for task, outcome, cache_hit in finished:
+            record_outcome(task, outcome, cache_hit)
+        rejudge.apply_statuses({task.solution_id: _status_for(outcome) for task, outcome, _ in finished})
+
+
+class Submission:
+    """A claimed submission whose test cases are spread over the pool"""
+
+    def __init__(self, key, task, language, cases, stop_on_failure):
+        self.key = key
+        # Tasks for identical submissions that share this run
+        self.tasks = [task]
+        self.language = language
+        self.cases = cases
+        self.stop_on_failure = stop_on_failure
+        self.queue = deque(range(len(cases)))
+        self.tests = [None] * len(cases)
+        self.build_dir = None
+        self.running = 0
+        self.failed = False
+        self.error = None
+
+
+class JudgeWorker:
+    """Claims tasks and judges their test cases on a pool of processes.
+
+    Each submission is built once, then its cases are fanned out across the
+    pool round-robin with the other submissions in progress, and every
+    case's result is written as it arrives. Run several ``judge_worker``
+    commands (on one or many hosts) to scale out; each claims its own
+    batches from the shared queue.
+    """
+
+    def __init__(self, processes=None, poll_interval=1.0, lease_seconds=300, max_attempts=3, cache=None):
+        self.processes = processes or os.cpu_count() or 1
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        self.limits, self.compile_limits = get_limits()
+        # Refuse to start rather than run submissions as the project's own account
+        sandbox.check_account(self.limits)
+        self.cache = cache if cache is not None else VerdictCache()
+        self.stopping = False
+        self.judged = 0
+        # cache key -> Submission being judged; identical submissions join it
+        self.submissions = {}
+        # Built submissions with cases still to start
+        self.ready = deque()
+        # Finished rejudge tasks waiting to be applied in one batch
+        self.rejudged = []
+        self.rejudged_since = 0
+
+    def stop(self, *args):
+        self.stopping = True
+
+    def run(self, once=False):
+        """Judge until stopped; with once, return when the queue is drained"""
+        # spawn: pool processes never inherit the parent's database connections
+        context = multiprocessing.get_context('spawn')
+        pool = ProcessPoolExecutor(
+            max_workers=self.processes, mp_context=context,
+            initializer=warm.prewarm, initargs=(warm_languages(),),
+        )
+        with pool:
+            # future -> (submission, case index, or None for the build)
+            in_flight = {}
+            next_sweep = 0
+            while not self.stopping:
+                if time.monotonic() >= next_sweep:
+                    requeue_stale(self.lease_seconds, self.max_attempts)
+                    logger.info('Judge queue: %s', scheduler.queue_stats())
+                    next_sweep = time.monotonic() + self.lease_seconds / 4
+
+                self.schedule(pool, in_flight)
+                free = self.processes - len(in_flight)
+                if free > 0:
+                    for task in claim(self.worker_id, free):
+                        self.dispatch(task, pool, in_flight)
+                    self.schedule(pool, in_flight)
+
+                if not in_flight:
+                    self.flush_rejudged(force=True)
+                    if once:
+                        break
+                    time.sleep(self.poll_interval)
+                    continue
+
+                done, _ = wait(in_flight, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self.complete(future, in_flight)
+                self.flush_rejudged(force=not in_flight)
+
+            for future in wait(in_flight).done:
+                self.complete(future, in_flight)
+            self.flush_rejudged(force=True)
+            # Stopped part-way: let another worker judge these from scratch
+            for submission in list(self.submissions.values()):
+                if submission.build_dir:
+                    engine.cleanup(submission.build_dir)
+                for task in submission.tasks:
+                    release(task)
+            self.submissions.clear()
+            self.ready.clear()
+
+    def dispatch(self, task, pool, in_flight):
+        """Answer a claimed task from the cache, join an identical run, or start building it"""
+        language = resolve_language(task)
+        if language is None:
+            return
+        key = cache_key(task, language)
+        if key in self.submissions:
+            self.submissions[key].tasks.append(task)
+            return
+        outcome = self.cache.get(key)
+        if outcome is not None:
+            self.finish(task, outcome, cache_hit=True)
+            return
+        cases = load_cases(task)
+        if cases is None:
+            return
+        start(task, len(cases))
+        submission = Submission(key, task, language, cases, task.solution.challenge.stop_on_first_failure)
+        self.submissions[key] = submission
+        if language.get('compile'):
+            future = pool.submit(engine.build, language, task.solution.code, self.compile_limits)
+            in_flight[future] = (submission, None)
+        else:
+            # Nothing to compile: writing the source here is cheaper than a round trip
+            submission.build_dir, _ = engine.build(language, task.solution.code, self.compile_limits)
+            self.ready.append(submission)
+
+    def schedule(self, pool, in_flight):
+        """Start cases on free pool slots, one per ready submission in turn"""
+        while self.ready and len(in_flight) < self.processes:
+            submission = self.ready.popleft()
+            index = submission.queue.popleft()
+            future = pool.submit(
+                engine.run_test, submission.language, submission.build_dir, submission.cases[index], self.limits
+            )
+            in_flight[future] = (submission, index)
+            submission.running += 1
+            if submission.queue:
+                self.ready.append(submission)
+
+    def complete(self, future, in_flight):
+        submission, index = in_flight.pop(future)
+        if index is not None:
+            submission.running -= 1
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.exception('Judging tasks %s failed', [task.pk for task in submission.tasks])
+            submission.error = f'{e.__class__.__name__}: {e}'
+            self.stop_cases(submission)
+        else:
+            if index is None:
+                build_dir, outcome = result
+                if outcome is not None:
+                    self.settle(submission, outcome)
+                    return
+                submission.build_dir = build_dir
+                self.ready.append(submission)
+                return
+            submission.tests[index] = result
+            record_test(submission.tasks[0], index, result)
+            if result['verdict'] != engine.PASSED and not submission.failed:
+                submission.failed = True
+                for task in submission.tasks:
+                    if task.priority != JudgeTask.REJUDGE:
+                        reject_early(task)
+                if submission.stop_on_failure:
+                    self.stop_cases(submission)
+        if submission.running == 0 and not submission.queue:
+            self.settle(submission)
+
+    def stop_cases(self, submission):
+        """Start no more cases for submission; the ones running still report"""
+        submission.queue.clear()
+        if submission in self.ready:
+            self.ready.remove(submission)
+
+    def settle(self, submission, outcome=None):
+        del self.submissions[submission.key]
+        if submission.build_dir:
+            engine.cleanup(submission.build_dir)
+        if submission.error:
+            for task in submission.tasks:
+                fail(task, submission.error)
+            return
+        if outcome is None:
+            outcome = engine.summarize([
+                test or engine.skipped(case) for test, case in zip(submission.tests, submission.cases)
+            ])
+        self.cache.set(submission.key, outcome)
+        for index, task in enumerate(submission.tasks):
+            self.finish(task, outcome, cache_hit=index > 0)
+        logger.info(
+            'Solution %s judged %s in %.0f ms', submission.tasks[0].solution_id, outcome['verdict'], outcome['time_ms']
+        )
+
+    def finish(self, task, outcome, cache_hit=False):
+        self.judged += 1
+        if task.priority != JudgeTask.REJUDGE:
+            finish(task, outcome, cache_hit)
+            return
+        if not self.rejudged:
+            self.rejudged_since = time.monotonic()
+        self.rejudged.append((task, outcome, cache_hit))
+
+    def flush_rejudged(self, force=False):
+        """Apply buffered rejudge verdicts once enough have piled up or they've waited long enough.
+
+        Until then their tasks stay running, so a crash only means the lease
+        expires and they are judged again.
+        """
+        if not self.rejudged:
+            return
+        batch_size = getattr(settings, 'JUDGE_REJUDGE_FLUSH_SIZE', 50)
+        overdue = time.monotonic() - self.rejudged_since >= self.poll_interval * 5
+        if force or overdue or len(self.rejudged) >= batch_size:
+            finish_rejudged(self.rejudged)
+            self.rejudged = []
@@ -0,0 +1,169 @@
+"""Warm Python runner: ``python -I -S zygote.py [module ...]``.
+
+Imports the listed modules once, then reads one JSON job per line on stdin.
+Each job forks a child that moves into the job's working directory,
+redirects stdio to the judge's private files for the run, switches to the judge's unprivileged account,
+applies the resource limits and executes the source as ``__main__``; the zygote waits for it and writes one JSON reply line.
+The fork skips interpreter start-up, which dominates short programs.
+
+Standalone on purpose: it runs outside Django, and sandbox imports
+``drop_privileges`` and ``apply_limits`` from here so cold and warm runs share
+the same account and limits.
+"""
+import builtins
+import importlib
+import json
+import os
+import resource
+import select
+import signal
+import sys
+import time
+import traceback
+
+
+def apply_limits(cpu_seconds, memory_mb, output_kb, processes, limit_memory=True):
+    cpu = max(1, int(-(-cpu_seconds // 1)))
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+    if limit_memory:
+        memory = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    output = output_kb * 1024
+    resource.setrlimit(resource.RLIMIT_FSIZE, (output, output))
+    resource.setrlimit(resource.RLIMIT_NPROC, (processes, processes))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+
+
+def drop_privileges(uid, gid):
+    """Become the unprivileged judge account for good (real, effective and saved ids).
+
+    A judge already running as that account has nothing to drop; anything
+    else, including ending up as root, raises so the program never runs.
+    """
+    if uid is None or gid is None or uid == 0 or gid == 0:
+        raise PermissionError('Submissions need an unprivileged uid and gid to run as')
+    if os.geteuid() == 0:
+        os.setgroups([])
+        os.setresgid(gid, gid, gid)
+        os.setresuid(uid, uid, uid)
+    if os.getresuid() != (uid, uid, uid) or os.getresgid() != (gid, gid, gid):
+        raise PermissionError(f'Could not switch to uid {uid} and gid {gid}')
+
+
+def _redirect(path, fd, flags):
+    # The judge created these files already (sandbox.run_files); never follow a link in their place
+    opened = os.open(path, flags | os.O_NOFOLLOW)
+    os.dup2(opened, fd)
+    os.close(opened)
+
+
+def _execute(job):
+    """Child side: never returns"""
+    status = 1
+    try:
+        os.setsid()
+        os.chdir(job['workdir'])
+        _redirect(job['stdin'], 0, os.O_RDONLY)
+        _redirect(job['stdout'], 1, os.O_WRONLY | os.O_TRUNC)
+        _redirect(job['stderr'], 2, os.O_WRONLY | os.O_TRUNC)
+        sys.stdin = open(0, 'r', closefd=False)
+        sys.stdout = open(1, 'w', closefd=False)
+        sys.stderr = open(2, 'w', closefd=False)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        limits = job['limits']
+        drop_privileges(limits['uid'], limits['gid'])
+        apply_limits(limits['cpu_seconds'], limits['memory_mb'], limits['output_kb'], limits['processes'],
+                     job.get('limit_memory', True))
+        sys.argv = [job['source']]
+        with open(job['source'], encoding='utf-8') as handle:
+            code = compile(handle.read(), job['source'], 'exec')
+        status = 0
+        try:
+            exec(code, {'__name__': '__main__', '__file__': job['source'], '__builtins__': builtins})
+        except SystemExit as e:
+            if e.code is None:
+                status = 0
+            elif isinstance(e.code, int):
+                status = e.code
+            else:
+                print(e.code, file=sys.stderr)
+                status = 1
+        except BaseException:
+            traceback.print_exc()
+            status = 1
+        sys.stdout.flush()
+        sys.stderr.flush()
+    except BaseException:
+        try:
+            traceback.print_exc()
+        except BaseException:
+            pass
+        status = status or 1
+    finally:
+        os._exit(status & 0xFF)
+
+
+def _wait(pid, wall_seconds):
+    """Wait up to wall_seconds for pid to exit; returns (wait status, timed_out).
+
+    The group is killed while the child is still unreaped, so leftover
+    grandchildren die and the pid can't have been recycled yet.
+    """
+    timed_out = False
+    try:
+        pidfd = os.pidfd_open(pid)
+    except (AttributeError, OSError):
+        pidfd = None
+    if pidfd is not None:
+        try:
+            ready, _, _ = select.select([pidfd], [], [], wall_seconds)
+        finally:
+            os.close(pidfd)
+        timed_out = not ready
+    else:
+        deadline = time.monotonic() + wall_seconds
+        while True:
+            # WNOWAIT leaves the child a zombie so the group kill below stays safe
+            if os.waitid(os.P_PID, pid, os.WEXITED | os.WNOHANG | os.WNOWAIT) is not None:
+                break
+            if time.monotonic() >= deadline:
+                timed_out = True
+                break
+            time.sleep(0.002)
+    _kill_group(pid)
+    _, status, _ = os.wait4(pid, 0)
+    return status, timed_out
+
+
+def _kill_group(pid):
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def serve(preload):
+    for name in preload:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for line in sys.stdin:
+        job = json.loads(line)
+        started = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            _execute(job)
+        status, timed_out = _wait(pid, job['limits']['wall_seconds'])
+        elapsed = (time.perf_counter() - started) * 1000
+        sys.stdout.write(json.dumps({
+            'exit_code': os.waitstatus_to_exitcode(status),
+            'time_ms': round(elapsed, 2),
+            'timed_out': timed_out,
+        }) + '\n')
+        sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    serve(sys.argv[1:])
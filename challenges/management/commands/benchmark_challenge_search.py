@@ -0,0 +1,113 @@
+import random
+import statistics
+import time
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from taggit.models import Tag, TaggedItem
+
+from challenges.models import Challenge
+from challenges.search import get_search_backend
+
+WORDS = (
+    'array graph tree string sort search binary dynamic greedy matrix stack queue heap hash '
+    'linked list recursion prime fibonacci palindrome anagram calculator parser compiler cache '
+    'network socket thread async database index query python javascript rust golang algorithm '
+    'interval bitmask geometry probability shortest path traversal window pointer backtracking'
+).split()
+
+
+def make_vocabulary(rng, size=5000):
+    """Pseudo-words so search terms are as selective as real ones"""
+    syllables = ['ka', 'lo', 'mi', 'ne', 'ru', 'sa', 'ti', 'vo', 'ze', 'qu', 'ph', 'ex', 'or', 'an', 'is']
+    words = set(WORDS)
+    while len(words) < size:
+        words.add(''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks indexed challenge search against the old icontains SearchFilter on synthetic data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=100000, help='Number of synthetic challenges')
+        parser.add_argument('--queries', type=int, default=50, help='Number of search terms to time')
+        parser.add_argument('--keep', action='store_true', help='Keep the synthetic rows instead of rolling back')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options)
+                if not options['keep']:
+                    raise Rollback()
+        except Rollback:
+            self.stdout.write('Synthetic data rolled back')
+
+    def run(self, options):
+        rng = random.Random(42)
+        backend = get_search_backend()
+        self.stdout.write(f"Generating {options['count']} challenges...")
+        vocabulary = make_vocabulary(rng)
+        self.generate(options['count'], rng, vocabulary)
+
+        started = time.perf_counter()
+        backend.rebuild()
+        self.stdout.write(f'Index build with {backend.__class__.__name__}: {time.perf_counter() - started:.1f}s')
+
+        terms = [' '.join(rng.sample(vocabulary, rng.choice((1, 2)))) for _ in range(options['queries'])]
+        terms += [word[:5] for word in rng.sample(vocabulary, 5)]  # prefix queries
+
+        def icontains(term):
+            condition = Q()
+            for token in term.split():
+                condition &= Q(title__icontains=token) | Q(description__icontains=token) | Q(tags__name__icontains=token)
+            return Challenge.objects.filter(condition).distinct()
+
+        def indexed(term):
+            return backend.search(Challenge.objects.all(), term)
+
+        for label, search in (('SearchFilter icontains', icontains), ('Indexed search', indexed)):
+            timings = []
+            for term in terms:
+                started = time.perf_counter()
+                # A listing page: the count plus the first 12 rows, as ChallengePagination does
+                results = search(term)
+                results.count()
+                list(results[:12])
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            self.stdout.write(
+                f'{label:>24}: median {statistics.median(timings):8.2f} ms  '
+                f'p95 {timings[int(len(timings) * 0.95) - 1]:8.2f} ms  max {timings[-1]:8.2f} ms'
+            )
+
+    def generate(self, count, rng, vocabulary):
+        offset = Challenge.objects.count()
+        batch = []
+        for i in range(count):
+            title = f"Synthetic {offset + i} {' '.join(rng.sample(vocabulary, 3))}"
+            batch.append(Challenge(
+                title=title,
+                slug=f'synthetic-{offset + i}',
+                description=' '.join(rng.choice(vocabulary) for _ in range(30)),
+                content='Synthetic benchmark challenge',
+                difficulty=rng.choice(('easy', 'medium', 'hard')),
+                points=rng.randint(10, 200),
+            ))
+        challenges = Challenge.objects.bulk_create(batch, batch_size=2000)
+        if not challenges or challenges[0].pk is None:
+            challenges = Challenge.objects.filter(slug__startswith='synthetic-')
+
+        tags = [Tag.objects.get_or_create(name=word, defaults={'slug': word})[0] for word in WORDS[:40]]
+        content_type = ContentType.objects.get_for_model(Challenge)
+        TaggedItem.objects.bulk_create([
+            TaggedItem(tag=tag, content_type=content_type, object_id=challenge.pk)
+            for challenge in challenges
+            for tag in rng.sample(tags, 2)
+        ], batch_size=5000)
@@ -0,0 +1,71 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from challenges.judge import engine, sandbox, warm
+from challenges.judge.languages import get_language
+from challenges.judge.testcases import TestCase
+from challenges.judge.worker import get_limits
+from challenges.management.commands.populate_challenges import CHALLENGES_DATA
+
+# stdin for the sample programs: numbers for the calculators, then a word for the string ones
+INPUTS = ['7\n3\n', '12\n4\n', '5\n', 'devsplug\n']
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks judging the populate_challenges Python solutions with cold starts against warm runner pools'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Times to judge every solution per mode')
+        parser.add_argument('--max-uses', type=int, default=None, help='Recycle warm runners after this many runs')
+
+    def handle(self, *args, **options):
+        language = get_language('python')
+        if not language.get('warm'):
+            raise CommandError('Python has no warm pool configured (JUDGE_WARM_POOLS)')
+        if options['max_uses']:
+            language['warm'] = dict(language['warm'], max_uses=options['max_uses'])
+        cold = {key: value for key, value in language.items() if key != 'warm'}
+
+        codes = [
+            solution['code']
+            for challenge in CHALLENGES_DATA
+            for solution in challenge.get('solutions', [])
+            if (get_language(solution['language']) or {}).get('name') == 'python'
+        ]
+        cases = [TestCase(name=f'input#{i}', input=text, expected='') for i, text in enumerate(INPUTS, start=1)]
+        limits, compile_limits = get_limits()
+        try:
+            sandbox.check_account(limits)
+        except sandbox.SandboxError as e:
+            raise CommandError(str(e))
+        self.stdout.write(f'{len(codes)} Python solutions x {len(cases)} cases x {options["repeat"]} rounds')
+
+        started = time.perf_counter()
+        warm.get_pool(language).warm()
+        self.stdout.write(f'Pool start: {(time.perf_counter() - started) * 1000:.1f} ms')
+
+        verdicts = {}
+        for label, config in (('Cold start', cold), ('Warm pool', language)):
+            timings = []
+            verdicts[label] = []
+            started = time.perf_counter()
+            for _ in range(options['repeat']):
+                for code in codes:
+                    outcome = engine.judge_submission(config, code, cases, limits, compile_limits)
+                    timings.extend(test['time_ms'] for test in outcome['tests'])
+                    verdicts[label].append([(test['verdict'], test['exit_code']) for test in outcome['tests']])
+            elapsed = time.perf_counter() - started
+            timings.sort()
+            self.stdout.write(
+                f'{label:>10}: {len(timings) / elapsed:8.1f} runs/s  median {statistics.median(timings):7.2f} ms  '
+                f'p95 {timings[int(len(timings) * 0.95) - 1]:7.2f} ms'
+            )
+
+        # The guessing game draws a random number, so an occasional mismatch there is expected
+        mismatches = sum(a != b for a, b in zip(verdicts['Cold start'], verdicts['Warm pool']))
+        pool = warm.get_pool(language)
+        self.stdout.write(
+            f'Verdict mismatches: {mismatches}; runners started {pool.started}, recycled {pool.recycled}'
+        )
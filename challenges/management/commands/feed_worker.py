@@ -0,0 +1,26 @@
+import logging
+import signal
+
+from django.core.management.base import BaseCommand
+
+from challenges import feed
+
+
+class Command(BaseCommand):
+    help = 'Fans recorded activity events out into their followers\' feed timelines'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds to wait when nothing is pending')
+        parser.add_argument('--once', action='store_true', help='Exit once nothing is pending')
+
+    def handle(self, *args, **options):
+        logging.getLogger('challenges.feed').setLevel(logging.INFO)
+        stopping = []
+        signal.signal(signal.SIGTERM, lambda *args: stopping.append(True))
+        signal.signal(signal.SIGINT, lambda *args: stopping.append(True))
+        events = feed.run(
+            poll_interval=options['poll_interval'],
+            once=options['once'],
+            should_stop=lambda: bool(stopping),
+        )
+        self.stdout.write(self.style.SUCCESS(f'Fanned out {events} events'))
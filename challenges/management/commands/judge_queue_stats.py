@@ -0,0 +1,27 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from challenges.judge.scheduler import queue_stats
+
+
+class Command(BaseCommand):
+    help = 'Prints judge queue depth and wait-time metrics'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--json', action='store_true', help='Print one JSON object for monitoring scripts')
+
+    def handle(self, *args, **options):
+        stats = queue_stats()
+        if options['json']:
+            self.stdout.write(json.dumps(stats))
+            return
+        for status, counts in stats['depth'].items():
+            breakdown = ', '.join(f'{label}: {count}' for label, count in counts.items() if label != 'total')
+            self.stdout.write(f"{status:>8}: {counts['total']}" + (f' ({breakdown})' if breakdown else ''))
+        self.stdout.write(f"Users waiting: {stats['users_waiting']}")
+        self.stdout.write(f"Oldest queued task: {stats['oldest_wait_seconds']} s")
+        recent = stats['recent_wait_seconds']
+        self.stdout.write(f"Average wait (last hour): {'n/a' if recent is None else f'{recent:.1f} s'}")
+        if stats['peak']:
+            self.stdout.write(self.style.WARNING('Queue is above JUDGE_PEAK_QUEUE_DEPTH: easy challenges go first'))
@@ -0,0 +1,38 @@
+import logging
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from challenges.judge.sandbox import SandboxError
+from challenges.judge.worker import JudgeWorker
+
+
+class Command(BaseCommand):
+    help = 'Judges pending solutions from the JudgeTask queue on a pool of sandboxed processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=None,
+                            help='Concurrent submissions (default: number of CPUs)')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to wait when the queue is empty')
+        parser.add_argument('--lease', type=int, default=300,
+                            help='Seconds before a task claimed by a vanished worker is requeued')
+        parser.add_argument('--max-attempts', type=int, default=3)
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is drained')
+
+    def handle(self, *args, **options):
+        logging.getLogger('challenges.judge').setLevel(logging.INFO)
+        try:
+            worker = JudgeWorker(
+                processes=options['processes'],
+                poll_interval=options['poll_interval'],
+                lease_seconds=options['lease'],
+                max_attempts=options['max_attempts'],
+            )
+        except SandboxError as e:
+            raise CommandError(str(e))
+        signal.signal(signal.SIGTERM, worker.stop)
+        signal.signal(signal.SIGINT, worker.stop)
+        self.stdout.write(f'Judge worker {worker.worker_id} running with {worker.processes} processes')
+        worker.run(once=options['once'])
+        self.stdout.write(self.style.SUCCESS(f'Judged {worker.judged} solutions'))
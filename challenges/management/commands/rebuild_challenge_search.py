@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from challenges.search import get_search_backend
+
+class Command(BaseCommand):
+    help = 'Rebuilds the challenge full-text search index (tsvector on PostgreSQL, FTS5 on SQLite)'
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        count = backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} challenges with {backend.__class__.__name__}'))
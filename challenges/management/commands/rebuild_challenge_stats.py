@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from challenges.models import ChallengeStats
+
+class Command(BaseCommand):
+    help = 'Rebuilds the denormalized per-challenge statistics from solutions and likes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--challenge', type=int, action='append', dest='challenges',
+                            help='Only rebuild the given challenge id (can be repeated)')
+
+    def handle(self, *args, **options):
+        count = ChallengeStats.objects.rebuild(challenge_ids=options['challenges'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt stats for {count} challenges'))
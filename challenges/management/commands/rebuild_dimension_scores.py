@@ -0,0 +1,21 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from challenges.models import DimensionScore
+
+class Command(BaseCommand):
+    help = 'Rebuilds the per-category and per-language leaderboard scores from accepted solutions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users',
+                            help='Only rebuild the given user id (can be repeated)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options['users']:
+            count = DimensionScore.objects.rebuild(user_ids=options['users'])
+        else:
+            count = 0
+            user_ids = list(get_user_model().objects.order_by('pk').values_list('pk', flat=True))
+            for start in range(0, len(user_ids), options['batch_size']):
+                count += DimensionScore.objects.rebuild(user_ids=user_ids[start:start + options['batch_size']])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} category and language scores'))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q, F
+from challenges.models import Solution
+
+COUNTERS = (
+    ('likes_count', 'actual_likes'),
+    ('dislikes_count', 'actual_dislikes'),
+    ('comments_count', 'actual_comments'),
+)
+
+class Command(BaseCommand):
+    help = 'Recomputes the cached like/dislike/comment counters on solutions and reports drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without fixing it')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        drifted = Q()
+        for cached, actual in COUNTERS:
+            drifted |= ~Q(**{cached: F(actual)})
+        queryset = Solution.objects.with_actual_counts().filter(drifted).order_by('pk')
+
+        fixes = []
+        drifted_rows = 0
+        totals = {cached: 0 for cached, _ in COUNTERS}
+        for solution in queryset.only('pk', *totals).iterator(chunk_size=options['batch_size']):
+            for cached, actual in COUNTERS:
+                drift = getattr(solution, actual) - getattr(solution, cached)
+                if drift:
+                    totals[cached] += abs(drift)
+                    self.stdout.write(f'Solution {solution.pk}: {cached} off by {drift:+d}', self.style.WARNING)
+                setattr(solution, cached, getattr(solution, actual))
+            fixes.append(solution)
+            drifted_rows += 1
+            if not options['dry_run'] and len(fixes) >= options['batch_size']:
+                Solution.objects.bulk_update(fixes, list(totals))
+                fixes = []
+
+        if not options['dry_run'] and fixes:
+            Solution.objects.bulk_update(fixes, list(totals))
+
+        summary = ', '.join(f'{field}: {drift}' for field, drift in totals.items())
+        verb = 'Found' if options['dry_run'] else 'Repaired'
+        self.stdout.write(self.style.SUCCESS(f'{verb} drift on {drifted_rows} solutions ({summary})'))
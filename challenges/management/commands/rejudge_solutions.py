@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from challenges.judge import rejudge
+from challenges.models import Challenge
+
+
+class Command(BaseCommand):
+    help = 'Queues solutions judged against an older test set of their challenge for low-priority rejudging'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--challenge', action='append', default=[], help='Challenge slug (repeatable; default: all stale)')
+        parser.add_argument('--batch-size', type=int, default=getattr(settings, 'JUDGE_REJUDGE_BATCH', 200))
+        parser.add_argument('--max-queued', type=int, default=getattr(settings, 'JUDGE_REJUDGE_MAX_QUEUED', 1000),
+                            help='Stop once this many rejudge tasks are waiting; run again later to resume')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many solutions are stale')
+
+    def handle(self, *args, **options):
+        if options['challenge']:
+            challenges = list(Challenge.objects.filter(slug__in=options['challenge']))
+            missing = set(options['challenge']) - {challenge.slug for challenge in challenges}
+            if missing:
+                raise CommandError(f"Unknown challenge(s): {', '.join(sorted(missing))}")
+        else:
+            challenges = list(rejudge.stale_challenges())
+
+        if options['dry_run']:
+            for challenge in challenges:
+                count = rejudge.stale_solutions(challenge).count()
+                self.stdout.write(f'{challenge.slug}: {count} stale solutions (test set v{challenge.test_set_version})')
+            return
+
+        queued = rejudge.rejudge_stale(options['batch_size'], options['max_queued'], challenges=challenges)
+        self.stdout.write(self.style.SUCCESS(
+            f'Queued {queued} solutions for rejudging; {rejudge.queued_rejudges()} rejudge tasks waiting'
+        ))
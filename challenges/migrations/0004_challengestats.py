@@ -0,0 +1,56 @@
+# Generated by Django 5.0.3 on 2026-10-18 15:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_stats(apps, schema_editor):
+    Challenge = apps.get_model('challenges', 'Challenge')
+    ChallengeStats = apps.get_model('challenges', 'ChallengeStats')
+    Solution = apps.get_model('challenges', 'Solution')
+    Like = apps.get_model('challenges', 'Like')
+
+    attempts = {
+        row['challenge']: row
+        for row in Solution.objects.values('challenge').annotate(
+            total=Count('id'), accepted=Count('id', filter=Q(status='accepted'))
+        )
+    }
+    likes = dict(
+        Like.objects.values('solution__challenge').annotate(total=Count('id'))
+        .values_list('solution__challenge', 'total')
+    )
+    ChallengeStats.objects.bulk_create([
+        ChallengeStats(
+            challenge_id=challenge_id,
+            total_attempts=attempts.get(challenge_id, {}).get('total', 0),
+            accepted_attempts=attempts.get(challenge_id, {}).get('accepted', 0),
+            total_likes=likes.get(challenge_id, 0)
+        )
+        for challenge_id in Challenge.objects.values_list('pk', flat=True)
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0003_alter_challenge_options_solution_documentation_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChallengeStats',
+            fields=[
+                ('challenge', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='challenges.challenge')),
+                ('total_attempts', models.IntegerField(default=0)),
+                ('accepted_attempts', models.IntegerField(default=0)),
+                ('total_likes', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Challenge stats',
+            },
+        ),
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
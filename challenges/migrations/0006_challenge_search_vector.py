@@ -0,0 +1,67 @@
+# Generated by Django 5.0.3 on 2026-10-18 15:46
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def build_search_index(apps, schema_editor):
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    content_type = ContentType.objects.filter(app_label='challenges', model='challenge').first()
+    content_type_id = content_type.pk if content_type else None
+    vendor = schema_editor.connection.vendor
+
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS challenge_search_vector_gin "
+            "ON challenges_challenge USING gin (search_vector)"
+        )
+        schema_editor.execute(
+            "UPDATE challenges_challenge c SET search_vector = "
+            "setweight(to_tsvector('english', coalesce(c.title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(c.description, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(("
+            "  SELECT string_agg(tag.name, ' ') FROM taggit_taggeditem ti "
+            "  JOIN taggit_tag tag ON tag.id = ti.tag_id "
+            "  WHERE ti.object_id = c.id AND ti.content_type_id = %s), '')), 'C')",
+            [content_type_id]
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS challenges_challenge_fts "
+            "USING fts5(title, description, tags, tokenize='unicode61')"
+        )
+        schema_editor.execute(
+            "INSERT INTO challenges_challenge_fts (rowid, title, description, tags) "
+            "SELECT c.id, c.title, c.description, coalesce(("
+            "  SELECT group_concat(tag.name, ' ') FROM taggit_taggeditem ti "
+            "  JOIN taggit_tag tag ON tag.id = ti.tag_id "
+            "  WHERE ti.object_id = c.id AND ti.content_type_id = %s), '') "
+            "FROM challenges_challenge c",
+            [content_type_id]
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS challenge_search_vector_gin")
+    elif vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS challenges_challenge_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0005_keyset_indexes'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='challenge',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, help_text='Maintained by challenges.search; GIN-indexed on PostgreSQL', null=True),
+        ),
+        migrations.RunPython(build_search_index, drop_search_index),
+    ]
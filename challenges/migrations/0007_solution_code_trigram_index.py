@@ -0,0 +1,30 @@
+# Generated by Django 5.0.3 on 2026-10-18 16:20
+
+from django.db import migrations
+
+
+def create_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS solution_code_trgm_idx "
+        "ON challenges_solution USING gin (code gin_trgm_ops)"
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS solution_code_trgm_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0006_challenge_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.0.3 on 2026-10-18 15:50
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Solution = apps.get_model('challenges', 'Solution')
+
+    def counted(model_name):
+        model = apps.get_model('challenges', model_name)
+        return Coalesce(Subquery(
+            model.objects.filter(solution=OuterRef('pk')).order_by()
+            .values('solution').annotate(total=Count('id')).values('total')
+        ), 0)
+
+    Solution.objects.update(
+        likes_count=counted('Like'),
+        dislikes_count=counted('Dislike'),
+        comments_count=counted('Comment')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0007_solution_code_trigram_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='solution',
+            name='comments_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='solution',
+            name='dislikes_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='solution',
+            name='likes_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
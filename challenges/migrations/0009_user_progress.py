@@ -0,0 +1,86 @@
+# Generated by Django 5.0.3 on 2026-10-18 15:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_progress(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    Solution = apps.get_model('challenges', 'Solution')
+    UserProgress = apps.get_model('challenges', 'UserProgress')
+    UserCategoryProgress = apps.get_model('challenges', 'UserCategoryProgress')
+
+    accepted = Solution.objects.filter(status='accepted')
+    totals = {
+        row['user']: row
+        for row in accepted.values('user').annotate(completed=Count('id'), points=Sum('challenge__points'))
+    }
+    UserProgress.objects.bulk_create([
+        UserProgress(
+            user_id=user_id,
+            completed_challenges=totals.get(user_id, {}).get('completed', 0),
+            total_points=totals.get(user_id, {}).get('points') or 0
+        )
+        for user_id in User.objects.values_list('pk', flat=True)
+    ], batch_size=500)
+    UserCategoryProgress.objects.bulk_create([
+        UserCategoryProgress(user_id=row['user'], category_id=row['challenge__category'], completed=row['completed'])
+        for row in accepted.filter(challenge__category__isnull=False).values(
+            'user', 'challenge__category'
+        ).annotate(completed=Count('id'))
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0002_remove_verificationcode_user_delete_resetcode_and_more'),
+        ('challenges', '0008_solution_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserCategoryProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('completed', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'User category progress',
+            },
+        ),
+        migrations.CreateModel(
+            name='UserProgress',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='challenge_progress', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('completed_challenges', models.IntegerField(default=0)),
+                ('total_points', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'User progress',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='solution',
+            index=models.Index(fields=['user', '-created_at'], name='solution_user_recent_idx'),
+        ),
+        migrations.AddField(
+            model_name='usercategoryprogress',
+            name='category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_progress', to='challenges.category'),
+        ),
+        migrations.AddField(
+            model_name='usercategoryprogress',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='category_progress', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterUniqueTogether(
+            name='usercategoryprogress',
+            unique_together={('user', 'category')},
+        ),
+        migrations.RunPython(backfill_progress, migrations.RunPython.noop),
+    ]
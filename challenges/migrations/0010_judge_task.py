@@ -0,0 +1,36 @@
+# Generated by Django 5.0.3 on 2026-10-18 16:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0009_user_progress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JudgeTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed'), ('skipped', 'Skipped')], default='queued', max_length=20)),
+                ('attempts', models.IntegerField(default=0)),
+                ('worker', models.CharField(blank=True, max_length=100)),
+                ('verdict', models.CharField(blank=True, max_length=30)),
+                ('results', models.JSONField(blank=True, default=list, help_text='Per-test verdicts and timings')),
+                ('compile_output', models.TextField(blank=True)),
+                ('duration_ms', models.FloatField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('solution', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='judge_tasks', to='challenges.solution')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='judge_task_queue_idx')],
+            },
+        ),
+    ]
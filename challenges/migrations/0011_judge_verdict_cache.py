@@ -0,0 +1,28 @@
+# Generated by Django 5.0.3 on 2026-10-18 16:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0010_judge_task'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='challenge',
+            name='test_set_version',
+            field=models.IntegerField(default=1, editable=False, help_text="Bumped whenever the challenge's test_case attachments change"),
+        ),
+        migrations.AddField(
+            model_name='judgetask',
+            name='cache_hit',
+            field=models.BooleanField(default=False, help_text='Verdict reused from an identical earlier submission'),
+        ),
+        migrations.AddField(
+            model_name='judgetask',
+            name='test_set_version',
+            field=models.IntegerField(blank=True, help_text='Challenge test set judged against', null=True),
+        ),
+    ]
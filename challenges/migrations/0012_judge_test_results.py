@@ -0,0 +1,42 @@
+# Generated by Django 5.0.3 on 2026-10-18 16:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0011_judge_verdict_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='challenge',
+            name='stop_on_first_failure',
+            field=models.BooleanField(default=False, help_text='Skip the remaining test cases once one fails'),
+        ),
+        migrations.AddField(
+            model_name='judgetask',
+            name='tests_total',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='TestCaseResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.IntegerField(help_text="Position of the case in the challenge's test set")),
+                ('name', models.CharField(max_length=200)),
+                ('verdict', models.CharField(max_length=30)),
+                ('time_ms', models.FloatField(default=0)),
+                ('exit_code', models.IntegerField(blank=True, null=True)),
+                ('stderr', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='test_results', to='challenges.judgetask')),
+            ],
+            options={
+                'ordering': ['task', 'index'],
+                'unique_together': {('task', 'index')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-18 16:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0012_judge_test_results'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='judgetask',
+            name='priority',
+            field=models.SmallIntegerField(choices=[(0, 'First attempt'), (1, 'Resubmission')], default=0, help_text='Scheduling class; lower runs first (see challenges.judge.scheduler)'),
+        ),
+    ]
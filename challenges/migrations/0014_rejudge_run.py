@@ -0,0 +1,36 @@
+# Generated by Django 5.0.3 on 2026-10-18 16:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0013_judge_task_priority'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='judgetask',
+            name='priority',
+            field=models.SmallIntegerField(choices=[(0, 'First attempt'), (1, 'Resubmission'), (2, 'Rejudge')], default=0, help_text='Scheduling class; lower runs first (see challenges.judge.scheduler)'),
+        ),
+        migrations.CreateModel(
+            name='RejudgeRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('test_set_version', models.IntegerField()),
+                ('status', models.CharField(choices=[('running', 'Running'), ('done', 'Done'), ('superseded', 'Superseded')], default='running', max_length=20)),
+                ('last_solution_id', models.IntegerField(default=0, help_text='Solutions up to this id have been queued')),
+                ('enqueued', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('challenge', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rejudge_runs', to='challenges.challenge')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'unique_together': {('challenge', 'test_set_version')},
+            },
+        ),
+    ]
@@ -1,8 +1,16 @@
+from collections import defaultdict
+
 from django.db import models
 from django.utils.text import slugify
+from django.utils import timezone
 from taggit.managers import TaggableManager
+from django.contrib.postgres.search import SearchVectorField
 from django.core.exceptions import ValidationError
-from django.db.models import Avg, Count
+from django.db import IntegrityError, transaction
+from django.db.models import Avg, Count, F, Q, Sum, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .judge import languages
 
 class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -63,9 +71,18 @@ class Challenge(models.Model):
     estimated_time = models.IntegerField(default=30, help_text="Estimated time in minutes to complete")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(null=True, editable=False,
+                                      help_text="Maintained by challenges.search; GIN-indexed on PostgreSQL")
+    test_set_version = models.IntegerField(default=1, editable=False,
+                                           help_text="Bumped whenever the challenge's test_case attachments change")
+    stop_on_first_failure = models.BooleanField(default=False,
+                                                help_text="Skip the remaining test cases once one fails")
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='challenge_created_keyset_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -75,21 +92,121 @@ class Challenge(models.Model):
     def __str__(self):
         return self.title
 
+    def get_challenge_stats(self):
+        """Return the denormalized stats row, rebuilding it if it is missing"""
+        try:
+            return self.stats
+        except ChallengeStats.DoesNotExist:
+            ChallengeStats.objects.rebuild(challenge_ids=[self.pk])
+            return ChallengeStats.objects.get(challenge=self)
+
     def get_completion_rate(self):
-        total_attempts = Solution.objects.filter(challenge=self).count()
-        if total_attempts == 0:
-            return 0
-        successful_attempts = Solution.objects.filter(challenge=self, status='accepted').count()
-        return (successful_attempts / total_attempts) * 100
+        return self.get_challenge_stats().completion_rate
 
     def get_stats(self):
-        solutions = Solution.objects.filter(challenge=self)
+        stats = self.get_challenge_stats()
         return {
-            'total_attempts': solutions.count(),
-            'successful_attempts': solutions.filter(status='accepted').count(),
-            'total_likes': Like.objects.filter(solution__challenge=self).count(),
-            'completion_rate': self.get_completion_rate()
+            'total_attempts': stats.total_attempts,
+            'successful_attempts': stats.accepted_attempts,
+            'total_likes': stats.total_likes,
+            'completion_rate': stats.completion_rate
+        }
+
+class ChallengeStatsManager(models.Manager):
+    def bump(self, challenge_id, rebuild_missing=True, **deltas):
+        """Atomically apply counter deltas to a challenge's stats row"""
+        updates = {field: F(field) + delta for field, delta in deltas.items() if delta}
+        if not updates:
+            return
+        updates['updated_at'] = timezone.now()
+        updated = self.filter(challenge_id=challenge_id).update(**updates)
+        if not updated and rebuild_missing:
+            # Row missing (e.g. data predating the table): recount from source
+            self.rebuild(challenge_ids=[challenge_id])
+
+    def rebuild(self, challenge_ids=None):
+        """Recompute stats from Solution/Like in a few aggregate queries"""
+        challenges = Challenge.objects.all()
+        solutions = Solution.objects.all()
+        likes = Like.objects.all()
+        if challenge_ids is not None:
+            challenges = challenges.filter(pk__in=challenge_ids)
+            solutions = solutions.filter(challenge_id__in=challenge_ids)
+            likes = likes.filter(solution__challenge_id__in=challenge_ids)
+
+        attempts = {
+            row['challenge']: row
+            for row in solutions.values('challenge').annotate(
+                total=Count('id'),
+                accepted=Count('id', filter=Q(status='accepted'))
+            )
         }
+        like_counts = dict(
+            likes.values('solution__challenge').annotate(total=Count('id'))
+            .values_list('solution__challenge', 'total')
+        )
+
+        rows = []
+        for challenge_id in challenges.values_list('pk', flat=True):
+            counts = attempts.get(challenge_id, {})
+            rows.append(self.model(
+                challenge_id=challenge_id,
+                total_attempts=counts.get('total', 0),
+                accepted_attempts=counts.get('accepted', 0),
+                total_likes=like_counts.get(challenge_id, 0)
+            ))
+        self.bulk_create(
+            rows,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['challenge'],
+            update_fields=['total_attempts', 'accepted_attempts', 'total_likes']
+        )
+        return len(rows)
+
+class ChallengeStats(models.Model):
+    """Per-challenge counters maintained incrementally by challenges.signals"""
+    challenge = models.OneToOneField(Challenge, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    total_attempts = models.IntegerField(default=0)
+    accepted_attempts = models.IntegerField(default=0)
+    total_likes = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ChallengeStatsManager()
+
+    class Meta:
+        verbose_name_plural = "Challenge stats"
+
+    def __str__(self):
+        return f"Stats for {self.challenge_id}"
+
+    @property
+    def completion_rate(self):
+        if self.total_attempts == 0:
+            return 0
+        return (self.accepted_attempts / self.total_attempts) * 100
+
+class SolutionManager(models.Manager):
+    COUNTER_FIELDS = ('likes_count', 'dislikes_count', 'comments_count')
+
+    def bump_counters(self, solution_id, **deltas):
+        """Atomically apply deltas to a solution's cached like/dislike/comment counters"""
+        updates = {field: F(field) + delta for field, delta in deltas.items() if delta}
+        if updates:
+            self.filter(pk=solution_id).update(**updates)
+
+    def with_actual_counts(self):
+        """Annotate the true counts next to the cached columns (used for reconciliation)"""
+        def counted(model):
+            return Coalesce(Subquery(
+                model.objects.filter(solution=OuterRef('pk')).order_by()
+                .values('solution').annotate(total=Count('id')).values('total')
+            ), 0)
+        return self.annotate(
+            actual_likes=counted(Like),
+            actual_dislikes=counted(Dislike),
+            actual_comments=counted(Comment)
+        )
 
 class Solution(models.Model):
     user = models.ForeignKey('authentication.User', on_delete=models.CASCADE)
@@ -108,10 +225,32 @@ class Solution(models.Model):
     )
     is_private = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    likes_count = models.IntegerField(default=0, editable=False)
+    dislikes_count = models.IntegerField(default=0, editable=False)
+    comments_count = models.IntegerField(default=0, editable=False)
+
+    objects = SolutionManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='solution_created_keyset_idx'),
+            models.Index(fields=['user', '-created_at'], name='solution_user_recent_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username}'s solution for {self.challenge.title}"
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding and not kwargs.get('force_insert') and kwargs.get('update_fields') is None:
+            # Counters only move through SolutionManager.bump_counters; a stale instance must not write them back
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in Solution.objects.COUNTER_FIELDS
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
 class Comment(models.Model):
     user = models.ForeignKey('authentication.User', on_delete=models.CASCADE)
     solution = models.ForeignKey(Solution, on_delete=models.CASCADE, related_name='comments')
@@ -169,4 +308,363 @@ class UserChallenge(models.Model):
             challenge=self.challenge,
             status='accepted'
         ).count()
-    
\ No newline at end of file
+    
+class UserProgressManager(models.Manager):
+    def for_user(self, user):
+        """Return the user's progress row, rebuilding it if it is missing"""
+        try:
+            return self.get(user=user)
+        except self.model.DoesNotExist:
+            self.rebuild(user_ids=[user.pk])
+            return self.get(user=user)
+
+    def bump(self, user_id, category_id, rebuild_missing=True, completed=0, points=0):
+        """Atomically apply an accepted-solution delta to a user's progress rows"""
+        if not completed and not points:
+            return
+        updated = self.filter(user_id=user_id).update(
+            completed_challenges=F('completed_challenges') + completed,
+            total_points=F('total_points') + points,
+            updated_at=timezone.now()
+        )
+        if updated and category_id is not None and completed:
+            updated = UserCategoryProgress.objects.filter(
+                user_id=user_id, category_id=category_id
+            ).update(completed=F('completed') + completed)
+        if not updated and rebuild_missing:
+            # First accepted solution in this category (or data predating the table)
+            self.rebuild(user_ids=[user_id])
+
+    def rebuild(self, user_ids=None):
+        """Recompute progress from accepted solutions in a few aggregate queries"""
+        from django.contrib.auth import get_user_model
+
+        users = get_user_model().objects.all()
+        accepted = Solution.objects.filter(status='accepted')
+        if user_ids is not None:
+            users = users.filter(pk__in=user_ids)
+            accepted = accepted.filter(user_id__in=user_ids)
+
+        totals = {
+            row['user']: row
+            for row in accepted.values('user').annotate(
+                completed=Count('id'), points=Sum('challenge__points')
+            )
+        }
+        by_category = accepted.filter(challenge__category__isnull=False).values(
+            'user', 'challenge__category'
+        ).annotate(completed=Count('id'))
+
+        user_ids = list(users.values_list('pk', flat=True))
+        rows = [
+            self.model(
+                user_id=user_id,
+                completed_challenges=totals.get(user_id, {}).get('completed', 0),
+                total_points=totals.get(user_id, {}).get('points') or 0
+            )
+            for user_id in user_ids
+        ]
+        with transaction.atomic():
+            self.bulk_create(
+                rows,
+                batch_size=500,
+                update_conflicts=True,
+                unique_fields=['user'],
+                update_fields=['completed_challenges', 'total_points', 'updated_at']
+            )
+            UserCategoryProgress.objects.filter(user_id__in=user_ids).delete()
+            UserCategoryProgress.objects.bulk_create([
+                UserCategoryProgress(
+                    user_id=row['user'],
+                    category_id=row['challenge__category'],
+                    completed=row['completed']
+                )
+                for row in by_category
+            ], batch_size=500)
+        return len(rows)
+
+class UserProgress(models.Model):
+    """Per-user progress counters maintained incrementally by challenges.signals"""
+    user = models.OneToOneField('authentication.User', on_delete=models.CASCADE, primary_key=True,
+                                related_name='challenge_progress')
+    completed_challenges = models.IntegerField(default=0)
+    total_points = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = UserProgressManager()
+
+    class Meta:
+        verbose_name_plural = "User progress"
+
+    def __str__(self):
+        return f"Progress for {self.user_id}"
+
+class UserCategoryProgress(models.Model):
+    """Accepted solutions per user and category, kept alongside UserProgress"""
+    user = models.ForeignKey('authentication.User', on_delete=models.CASCADE, related_name='category_progress')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='user_progress')
+    completed = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('user', 'category')
+        verbose_name_plural = "User category progress"
+
+    def __str__(self):
+        return f"Progress for {self.user_id} in {self.category_id}"
+
+class DimensionScoreManager(models.Manager):
+    def bump(self, dimension, user_id, points=0, solved=0):
+        """Atomically move a user's score in one dimension, creating the row on a first solve"""
+        if not points and not solved:
+            return
+        rows = self.filter(dimension=dimension, user_id=user_id)
+        if rows.update(points=F('points') + points, solved=F('solved') + solved):
+            if solved < 0:
+                rows.filter(solved__lte=0).delete()
+            return
+        if solved <= 0:
+            # Nothing to take back from (data predating the table); a rebuild fixes it
+            return
+        try:
+            with transaction.atomic():
+                self.create(dimension=dimension, user_id=user_id, points=points, solved=solved)
+        except IntegrityError:
+            # Created concurrently: the row is there now
+            rows.update(points=F('points') + points, solved=F('solved') + solved)
+
+    def rebuild(self, user_ids=None):
+        """Recompute the users' rows (everyone's without user_ids) from accepted solutions"""
+        accepted = Solution.objects.filter(status='accepted')
+        existing = self.all()
+        if user_ids is not None:
+            accepted = accepted.filter(user_id__in=user_ids)
+            existing = existing.filter(user_id__in=user_ids)
+
+        # A challenge counts once per dimension, however many accepted solutions it has
+        totals = defaultdict(lambda: [0, 0])
+        counted = set()
+        rows = accepted.order_by().values_list(
+            'user_id', 'challenge_id', 'challenge__points', 'challenge__category_id', 'language'
+        ).distinct()
+        for user_id, challenge_id, points, category_id, language in rows.iterator(chunk_size=2000):
+            dimensions = [self.model.language_key(language)]
+            if category_id is not None:
+                dimensions.append(self.model.category_key(category_id))
+            for dimension in dimensions:
+                if (dimension, user_id, challenge_id) in counted:
+                    continue
+                counted.add((dimension, user_id, challenge_id))
+                totals[dimension, user_id][0] += points
+                totals[dimension, user_id][1] += 1
+
+        with transaction.atomic():
+            existing.delete()
+            self.bulk_create([
+                self.model(dimension=dimension, user_id=user_id, points=points, solved=solved)
+                for (dimension, user_id), (points, solved) in totals.items()
+            ], batch_size=1000)
+        return len(totals)
+
+    def ranked(self, dimension):
+        """Rows on the dimension's leaderboard, in leaderboard order"""
+        return self.filter(dimension=dimension, user__is_active=True).order_by('-points', 'user_id')
+
+    def rank_of(self, dimension, user_id):
+        """(position, row) of the user in the dimension, ordered by (-points, user id); None if unranked.
+
+        One index range count over ``dimension_score_rank_idx``, like
+        ``authentication.leaderboard.rank_of``.
+        """
+        row = self.ranked(dimension).filter(user_id=user_id).select_related('user').first()
+        if row is None:
+            return None
+        ahead = self.ranked(dimension).filter(
+            Q(points__gt=row.points) | Q(points=row.points, user_id__lt=user_id)
+        ).count()
+        return ahead + 1, row
+
+class DimensionScore(models.Model):
+    """Points per user within a category or a language, maintained by challenges.signals"""
+    user = models.ForeignKey('authentication.User', on_delete=models.CASCADE, related_name='dimension_scores')
+    # 'category:<id>' or 'language:<canonical name>'
+    dimension = models.CharField(max_length=64)
+    points = models.IntegerField(default=0)
+    solved = models.IntegerField(default=0)
+
+    objects = DimensionScoreManager()
+
+    class Meta:
+        unique_together = ('dimension', 'user')
+        indexes = [
+            models.Index(fields=['dimension', '-points', 'user'], name='dimension_score_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} in {self.dimension}: {self.points}"
+
+    @staticmethod
+    def category_key(category_id):
+        return f'category:{category_id}'
+
+    @staticmethod
+    def language_key(language):
+        return f'language:{languages.canonical_name(language)}'
+
+class JudgeTask(models.Model):
+    """A solution waiting for (or judged by) the judge_worker queue"""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    SKIPPED = 'skipped'
+
+    FIRST_ATTEMPT = 0
+    RESUBMISSION = 1
+    REJUDGE = 2
+    PRIORITY_CHOICES = [
+        (FIRST_ATTEMPT, 'First attempt'),
+        (RESUBMISSION, 'Resubmission'),
+        (REJUDGE, 'Rejudge'),
+    ]
+
+    solution = models.ForeignKey(Solution, on_delete=models.CASCADE, related_name='judge_tasks')
+    status = models.CharField(
+        max_length=20,
+        choices=[
+            (QUEUED, 'Queued'),
+            (RUNNING, 'Running'),
+            (DONE, 'Done'),
+            (FAILED, 'Failed'),
+            (SKIPPED, 'Skipped')
+        ],
+        default=QUEUED
+    )
+    priority = models.SmallIntegerField(choices=PRIORITY_CHOICES, default=FIRST_ATTEMPT,
+                                        help_text="Scheduling class; lower runs first (see challenges.judge.scheduler)")
+    attempts = models.IntegerField(default=0)
+    worker = models.CharField(max_length=100, blank=True)
+    verdict = models.CharField(max_length=30, blank=True)
+    results = models.JSONField(default=list, blank=True, help_text="Per-test verdicts and timings")
+    compile_output = models.TextField(blank=True)
+    duration_ms = models.FloatField(null=True, blank=True)
+    test_set_version = models.IntegerField(null=True, blank=True, help_text="Challenge test set judged against")
+    cache_hit = models.BooleanField(default=False, help_text="Verdict reused from an identical earlier submission")
+    tests_total = models.IntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='judge_task_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"Judge task {self.pk} for solution {self.solution_id} ({self.status})"
+
+
+class RejudgeRun(models.Model):
+    """Progress of re-queueing a challenge's solutions for one test-set version"""
+    RUNNING = 'running'
+    DONE = 'done'
+    SUPERSEDED = 'superseded'
+
+    challenge = models.ForeignKey(Challenge, on_delete=models.CASCADE, related_name='rejudge_runs')
+    test_set_version = models.IntegerField()
+    status = models.CharField(
+        max_length=20,
+        choices=[
+            (RUNNING, 'Running'),
+            (DONE, 'Done'),
+            (SUPERSEDED, 'Superseded')
+        ],
+        default=RUNNING
+    )
+    last_solution_id = models.IntegerField(default=0, help_text="Solutions up to this id have been queued")
+    enqueued = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        unique_together = ['challenge', 'test_set_version']
+
+    def __str__(self):
+        return f"Rejudge of {self.challenge} at test set v{self.test_set_version} ({self.status})"
+
+
+class TestCaseResult(models.Model):
+    """One test case of a judge task, written as soon as that case finishes"""
+    task = models.ForeignKey(JudgeTask, on_delete=models.CASCADE, related_name='test_results')
+    index = models.IntegerField(help_text="Position of the case in the challenge's test set")
+    name = models.CharField(max_length=200)
+    verdict = models.CharField(max_length=30)
+    time_ms = models.FloatField(default=0)
+    exit_code = models.IntegerField(null=True, blank=True)
+    stderr = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['task', 'index']
+        unique_together = ['task', 'index']
+
+    def __str__(self):
+        return f"Test {self.index} of judge task {self.task_id}: {self.verdict}"
+
+
+class ActivityEvent(models.Model):
+    """Something a user did that shows up in their followers' feeds (challenges.feed)"""
+    SUBMITTED = 'submitted'
+    ACCEPTED = 'accepted'
+    LIKED = 'liked'
+    COMMENTED = 'commented'
+
+    actor = models.ForeignKey('authentication.User', on_delete=models.CASCADE, related_name='activity_events')
+    verb = models.CharField(
+        max_length=20,
+        choices=[
+            (SUBMITTED, 'Submitted a solution'),
+            (ACCEPTED, 'Solution accepted'),
+            (LIKED, 'Liked a solution'),
+            (COMMENTED, 'Commented on a solution')
+        ]
+    )
+    solution = models.ForeignKey(Solution, on_delete=models.CASCADE, related_name='activity_events')
+    comment = models.ForeignKey(Comment, on_delete=models.CASCADE, null=True, blank=True,
+                                related_name='activity_events')
+    created_at = models.DateTimeField(default=timezone.now)
+    fanned_out_at = models.DateTimeField(null=True, blank=True)
+    pulled = models.BooleanField(default=False, help_text="Too many followers to fan out; read at request time")
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['id'], condition=models.Q(fanned_out_at__isnull=True),
+                         name='activity_pending_idx'),
+            models.Index(fields=['actor', '-created_at', '-id'], condition=models.Q(pulled=True),
+                         name='activity_pulled_idx'),
+            models.Index(fields=['created_at'], name='activity_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.actor_id} {self.verb} solution {self.solution_id}"
+
+
+class TimelineEntry(models.Model):
+    """An event fanned out into one follower's feed"""
+    owner = models.ForeignKey('authentication.User', on_delete=models.CASCADE, related_name='timeline_entries')
+    event = models.ForeignKey(ActivityEvent, on_delete=models.CASCADE, related_name='timeline_entries')
+    actor = models.ForeignKey('authentication.User', on_delete=models.CASCADE, related_name='+')
+    # Copied from the event so feed pages are a range scan over one index
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ['owner', 'event']
+        indexes = [
+            models.Index(fields=['owner', '-created_at', '-event'], name='timeline_owner_idx'),
+        ]
+
+    def __str__(self):
+        return f"Event {self.event_id} in {self.owner_id}'s feed"
@@ -0,0 +1,195 @@
+import base64
+import binascii
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination keyed on ``(created_at, id)``, newest first.
+
+    Unlike ``PageNumberPagination`` this never runs ``COUNT(*)`` and every page
+    is an index range scan, so deep pages cost the same as the first one.
+    Cursors are opaque base64 tokens encoding the boundary row's key.
+    """
+    cursor_query_param = 'cursor'
+    page_size = 12
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        created_at, pk, self.reverse = self.decode_cursor(request)
+        self.has_cursor = created_at is not None
+
+        if self.reverse:
+            queryset = queryset.order_by('created_at', 'id')
+            if self.has_cursor:
+                queryset = queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+        else:
+            queryset = queryset.order_by('-created_at', '-id')
+            if self.has_cursor:
+                queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+        results = list(queryset[:self.page_size + 1])
+        self.has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.reverse:
+            results.reverse()
+        self.page = results
+        return results
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, None, False
+        try:
+            decoded = base64.urlsafe_b64decode(encoded.encode('ascii')).decode('ascii')
+            created_at, pk, direction = decoded.split('|')
+            created_at = parse_datetime(created_at)
+            pk = int(pk)
+        except (TypeError, ValueError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None or direction not in ('n', 'p'):
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, pk, direction == 'p'
+
+    def encode_cursor(self, obj, reverse=False):
+        raw = f"{obj.created_at.isoformat()}|{obj.pk}|{'p' if reverse else 'n'}"
+        token = base64.urlsafe_b64encode(raw.encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def get_next_link(self):
+        if not self.page:
+            return None
+        # Coming back from a later page means there is always something after us
+        if self.has_more or self.reverse:
+            return self.encode_cursor(self.page[-1])
+        return None
+
+    def get_previous_link(self):
+        if not self.page:
+            if self.has_cursor:
+                return remove_query_param(self.base_url, self.cursor_query_param)
+            return None
+        if (self.reverse and self.has_more) or (not self.reverse and self.has_cursor):
+            return self.encode_cursor(self.page[0], reverse=True)
+        return None
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Opaque cursor returned in the next/previous links',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Number of results to return per page',
+                'schema': {'type': 'integer'},
+            },
+        ]
+
+
+class MergedKeysetPagination(KeysetPagination):
+    """KeysetPagination over several sources merged into one stream.
+
+    Each source is a ``(queryset, key_field)`` pair whose rows carry
+    ``created_at`` and the id of the object they stand for in ``key_field``.
+    Every source contributes at most one page of keys, in index order from
+    the cursor; the merged page is then loaded in one query.
+    """
+
+    def paginate_sources(self, sources, load, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        created_at, pk, self.reverse = self.decode_cursor(request)
+        self.has_cursor = created_at is not None
+
+        keys = set()
+        for queryset, field in sources:
+            lookup = 'gt' if self.reverse else 'lt'
+            if self.has_cursor:
+                queryset = queryset.filter(
+                    Q(**{f'created_at__{lookup}': created_at}) | Q(created_at=created_at, **{f'{field}__{lookup}': pk})
+                )
+            if self.reverse:
+                queryset = queryset.order_by('created_at', field)
+            else:
+                queryset = queryset.order_by('-created_at', f'-{field}')
+            keys.update(queryset.values_list('created_at', field)[:self.page_size + 1])
+
+        keys = sorted(keys, reverse=not self.reverse)
+        self.has_more = len(keys) > self.page_size
+        keys = keys[:self.page_size]
+        if self.reverse:
+            keys.reverse()
+        objects = {obj.pk: obj for obj in load([key for _, key in keys])}
+        self.page = [objects[key] for _, key in keys if key in objects]
+        return self.page
+
+
+class OptionalKeysetPaginationMixin:
+    """Switch a viewset to keyset pagination with ``?pagination=cursor``.
+
+    Requests that already carry a ``cursor`` parameter stay in cursor mode,
+    so clients only need to opt in on the first page.
+    """
+    keyset_pagination_class = KeysetPagination
+
+    def use_keyset_pagination(self):
+        params = self.request.query_params
+        return params.get('pagination') == 'cursor' or KeysetPagination.cursor_query_param in params
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if getattr(self, 'request', None) is not None and self.use_keyset_pagination():
+                self._paginator = self.keyset_pagination_class()
+            elif self.pagination_class is None:
+                self._paginator = None
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
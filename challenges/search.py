@@ -0,0 +1,203 @@
+import re
+
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank, SearchVector
+from django.db import connection, connections
+from django.db.models import CharField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import BaseFilterBackend
+
+from .models import Challenge
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Fields indexed for challenge search, with their relative weights (A is highest)
+SEARCH_WEIGHTS = (
+    ('title', 'A'),
+    ('description', 'B'),
+    ('tags', 'C'),
+)
+
+
+def tokenize(term):
+    return TOKEN_RE.findall(term.lower())[:16]
+
+
+def tag_text(challenge):
+    return ' '.join(challenge.tags.names())
+
+
+class IcontainsChallengeSearch:
+    """Unindexed fallback matching the historical SearchFilter behaviour"""
+    vendor = None
+
+    def index(self, challenge):
+        pass
+
+    def remove(self, challenge_id):
+        pass
+
+    def rebuild(self, queryset=None):
+        return 0
+
+    def search(self, queryset, term):
+        condition = Q()
+        for token in tokenize(term):
+            condition &= (
+                Q(title__icontains=token) |
+                Q(description__icontains=token) |
+                Q(tags__name__icontains=token)
+            )
+        return queryset.filter(condition).distinct()
+
+
+class PostgresChallengeSearch(IcontainsChallengeSearch):
+    """Ranked search over ``Challenge.search_vector`` (tsvector + GIN index)"""
+    vendor = 'postgresql'
+    config = 'english'
+
+    def _vector(self, tags):
+        vector = None
+        for field, weight in SEARCH_WEIGHTS:
+            source = Value(tags, output_field=CharField()) if field == 'tags' else field
+            part = SearchVector(source, weight=weight, config=self.config)
+            vector = part if vector is None else vector + part
+        return vector
+
+    def index(self, challenge):
+        Challenge.objects.filter(pk=challenge.pk).update(search_vector=self._vector(tag_text(challenge)))
+
+    def rebuild(self, queryset=None):
+        """Recompute every vector in one UPDATE, aggregating tags in SQL"""
+        content_type = ContentType.objects.get_for_model(Challenge)
+        ids = list(queryset.values_list('pk', flat=True)) if queryset is not None else None
+        weighted = ' || '.join(
+            f"setweight(to_tsvector(%s, coalesce({source}, '')), '{weight}')"
+            for source, weight in (('c.title', 'A'), ('c.description', 'B'), ('t.tags', 'C'))
+        )
+        sql = (
+            f"UPDATE challenges_challenge c SET search_vector = {weighted} "
+            "FROM (SELECT c2.id, string_agg(tag.name, ' ') AS tags "
+            "      FROM challenges_challenge c2 "
+            "      LEFT JOIN taggit_taggeditem ti ON ti.object_id = c2.id AND ti.content_type_id = %s "
+            "      LEFT JOIN taggit_tag tag ON tag.id = ti.tag_id "
+            "      GROUP BY c2.id) t "
+            "WHERE t.id = c.id"
+        )
+        params = [self.config] * 3 + [content_type.pk]
+        if ids is not None:
+            sql += " AND c.id = ANY(%s)"
+            params.append(ids)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.rowcount
+
+    def search(self, queryset, term):
+        tokens = tokenize(term)
+        if not tokens:
+            return queryset
+        # Prefix-match every token: "graph trav" -> 'graph:* & trav:*'
+        query = SearchQuery(' & '.join(f'{token}:*' for token in tokens), search_type='raw', config=self.config)
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank('search_vector', query),
+            search_highlight=SearchHeadline(
+                'description', query, config=self.config,
+                start_sel='<mark>', stop_sel='</mark>', max_words=24, min_words=8
+            )
+        ).order_by('-search_rank', '-created_at')
+
+
+class SqliteChallengeSearch(IcontainsChallengeSearch):
+    """FTS5 fallback for local development and the test database"""
+    vendor = 'sqlite'
+    table = 'challenges_challenge_fts'
+
+    def ensure_table(self, using='default'):
+        # Must run outside atomic blocks: SQLite can't roll back a virtual table creation
+        # cleanly, so this is wired to post_migrate rather than done lazily per query.
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} "
+                f"USING fts5(title, description, tags, tokenize='unicode61')"
+            )
+
+    def index(self, challenge):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE rowid = %s", [challenge.pk])
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, title, description, tags) VALUES (%s, %s, %s, %s)",
+                [challenge.pk, challenge.title, challenge.description, tag_text(challenge)]
+            )
+
+    def remove(self, challenge_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE rowid = %s", [challenge_id])
+
+    def rebuild(self, queryset=None):
+        self.ensure_table()
+        queryset = queryset if queryset is not None else Challenge.objects.all()
+        rows = [
+            (challenge.pk, challenge.title, challenge.description, ' '.join(tag.name for tag in challenge.tags.all()))
+            for challenge in queryset.prefetch_related('tags')
+        ]
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {self.table} WHERE rowid = %s", [(row[0],) for row in rows])
+            cursor.executemany(
+                f"INSERT INTO {self.table} (rowid, title, description, tags) VALUES (%s, %s, %s, %s)", rows
+            )
+        return len(rows)
+
+    def search(self, queryset, term):
+        tokens = tokenize(term)
+        if not tokens:
+            return queryset
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        table = self.table
+        matched = f"FROM {table} WHERE {table}.rowid = challenges_challenge.id AND {table} MATCH %s"
+        # bm25() is lower-is-better; flip it so both backends sort on -search_rank
+        return queryset.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {table} WHERE {table} MATCH %s", [match])
+        ).annotate(
+            search_rank=RawSQL(f"SELECT -bm25({table}, 10.0, 4.0, 2.0) {matched}", [match],
+                               output_field=FloatField()),
+            search_highlight=RawSQL(
+                f"SELECT snippet({table}, 1, '<mark>', '</mark>', '...', 16) {matched}", [match],
+                output_field=CharField()
+            )
+        ).order_by('-search_rank', '-created_at')
+
+
+BACKENDS = {
+    backend.vendor: backend
+    for backend in (PostgresChallengeSearch(), SqliteChallengeSearch())
+}
+
+
+def get_search_backend():
+    return BACKENDS.get(connection.vendor) or IcontainsChallengeSearch()
+
+
+def create_sqlite_search_table(sender, using='default', **kwargs):
+    """post_migrate hook so databases built without migrations (tests) get the FTS table"""
+    if connections[using].vendor == SqliteChallengeSearch.vendor:
+        BACKENDS[SqliteChallengeSearch.vendor].ensure_table(using)
+
+
+class ChallengeSearchFilter(BaseFilterBackend):
+    """Drop-in replacement for SearchFilter backed by the challenge search index"""
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        term = request.query_params.get(self.search_param, '').strip()
+        if not term:
+            return queryset
+        return get_search_backend().search(queryset, term)
+
+    def get_schema_operation_parameters(self, view):
+        return [{
+            'name': self.search_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Full-text search over title, description and tags (prefix matching, ranked)',
+            'schema': {'type': 'string'},
+        }]
@@ -2,7 +2,7 @@ from rest_framework import serializers
 from taggit.serializers import (TagListSerializerField,
                                TaggitSerializer)
 from django.contrib.auth import get_user_model
-from django.db.models import Count
+from django.db.models import Avg, Count
 
 from .models import (
     Challenge,
@@ -12,7 +12,11 @@ from .models import (
     Dislike,
     Attachment,
     Category,
-    UserChallenge
+    UserChallenge,
+    UserProgress,
+    JudgeTask,
+    TestCaseResult,
+    ActivityEvent
 )
 
 class UserSerializer(serializers.ModelSerializer):
@@ -32,7 +36,31 @@ class CategorySerializer(serializers.ModelSerializer):
         model = Category
         fields = ['id', 'name', 'slug', 'description', 'icon', 'order', 'stats']
     
+    @staticmethod
+    def resolve_stats(category_ids):
+        """Category.get_stats() for many categories in two grouped queries"""
+        category_ids = [pk for pk in set(category_ids) if pk is not None]
+        stats = {
+            row['pk']: {
+                'total_challenges': row['total_challenges'],
+                'avg_difficulty': row['avg_difficulty'] or 0,
+                'total_solutions': 0
+            }
+            for row in Category.objects.filter(pk__in=category_ids).values('pk').annotate(
+                total_challenges=Count('challenges'), avg_difficulty=Avg('challenges__points')
+            )
+        }
+        solutions = Solution.objects.filter(challenge__category__in=category_ids).values(
+            'challenge__category'
+        ).annotate(total=Count('id')).values_list('challenge__category', 'total')
+        for category_id, total in solutions:
+            stats[category_id]['total_solutions'] = total
+        return stats
+
     def get_stats(self, obj):
+        stats = self.context.get('category_stats')
+        if stats is not None and obj.pk in stats:
+            return stats[obj.pk]
         return obj.get_stats()
 
 class ChallengeListSerializer(serializers.ModelSerializer):
@@ -40,30 +68,71 @@ class ChallengeListSerializer(serializers.ModelSerializer):
     category = CategorySerializer()
     completion_rate = serializers.SerializerMethodField()
     user_status = serializers.SerializerMethodField()
+    search_highlight = serializers.SerializerMethodField()
     
     class Meta:
         model = Challenge
         fields = [
             'id', 'title', 'slug', 'description', 'difficulty', 
             'points', 'tags', 'category', 'estimated_time',
-            'completion_rate', 'user_status'
+            'completion_rate', 'user_status', 'search_highlight'
         ]
     
     def get_completion_rate(self, obj):
         return obj.get_completion_rate()
+
+    def get_search_highlight(self, obj):
+        """Description snippet with matched terms wrapped in <mark>, only set for searches"""
+        return getattr(obj, 'search_highlight', None)
     
-    def get_user_status(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            solution = Solution.objects.filter(
-                user=request.user,
-                challenge=obj
-            ).first()
-            if solution:
-                return {
-                    'status': solution.status,
-                    'submitted_at': solution.created_at
+    @staticmethod
+    def resolve_user_statuses(user, challenges):
+        """Load a user's solutions and subscriptions for many challenges at once.
+
+        Returns a map keyed by challenge id that the list/detail serializers read
+        from ``context['user_statuses']`` instead of querying per row.
+        """
+        challenge_ids = [challenge.pk for challenge in challenges]
+        statuses = {
+            challenge_id: {'solution': None, 'is_subscribed': False}
+            for challenge_id in challenge_ids
+        }
+        if not user or not user.is_authenticated or not challenge_ids:
+            return statuses
+
+        solutions = Solution.objects.filter(
+            user=user,
+            challenge_id__in=challenge_ids
+        ).order_by('challenge_id', 'id').values_list('challenge_id', 'status', 'created_at')
+        for challenge_id, solution_status, created_at in solutions:
+            if statuses[challenge_id]['solution'] is None:
+                statuses[challenge_id]['solution'] = {
+                    'status': solution_status,
+                    'submitted_at': created_at
                 }
+
+        subscribed = UserChallenge.objects.filter(
+            user=user,
+            challenge_id__in=challenge_ids,
+            is_subscribed=True
+        ).values_list('challenge_id', flat=True)
+        for challenge_id in subscribed:
+            statuses[challenge_id]['is_subscribed'] = True
+        return statuses
+
+    def _get_user_status_entry(self, obj):
+        request = self.context.get('request')
+        if not request or not request.user.is_authenticated:
+            return None
+        statuses = self.context.get('user_statuses')
+        if statuses is None or obj.pk not in statuses:
+            statuses = self.resolve_user_statuses(request.user, [obj])
+        return statuses[obj.pk]
+
+    def get_user_status(self, obj):
+        entry = self._get_user_status_entry(obj)
+        if entry and entry['solution']:
+            return entry['solution']
         return None
 
 class ChallengeDetailSerializer(ChallengeListSerializer):
@@ -87,32 +156,21 @@ class ChallengeDetailSerializer(ChallengeListSerializer):
         }
 
     def get_user_status(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            solution = Solution.objects.filter(
-                user=request.user,
-                challenge=obj
-            ).first()
-            
-            # Check subscription status
-            is_subscribed = UserChallenge.objects.filter(
-                user=request.user,
-                challenge=obj,
-                is_subscribed=True
-            ).exists()
-            
-            status_data = {
-                'is_subscribed': is_subscribed
-            }
-            
-            if solution:
-                status_data.update({
-                    'solution_status': solution.status,
-                    'submitted_at': solution.created_at
-                })
-            
-            return status_data
-        return None
+        entry = self._get_user_status_entry(obj)
+        if entry is None:
+            return None
+
+        status_data = {
+            'is_subscribed': entry['is_subscribed']
+        }
+
+        if entry['solution']:
+            status_data.update({
+                'solution_status': entry['solution']['status'],
+                'submitted_at': entry['solution']['submitted_at']
+            })
+
+        return status_data
 
 class ChallengeSerializer(TaggitSerializer, serializers.ModelSerializer):
     tags = TagListSerializerField()
@@ -157,6 +215,24 @@ class SolutionSerializer(serializers.ModelSerializer):
         
         return data
 
+class TestCaseResultSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TestCaseResult
+        fields = ['index', 'name', 'verdict', 'time_ms', 'exit_code', 'stderr']
+        read_only_fields = fields
+
+class JudgeTaskSerializer(serializers.ModelSerializer):
+    """``tests`` fills in case by case while the task runs; ``results`` is the final summary"""
+    tests = TestCaseResultSerializer(source='test_results', many=True, read_only=True)
+
+    class Meta:
+        model = JudgeTask
+        fields = [
+            'id', 'status', 'verdict', 'tests_total', 'tests', 'results', 'compile_output', 'duration_ms',
+            'error', 'created_at', 'finished_at'
+        ]
+        read_only_fields = fields
+
 class CommentSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     
@@ -207,43 +283,62 @@ class UserChallengeSerializer(serializers.ModelSerializer):
             'completed', 'completed_at'
         ]
     
+    @staticmethod
+    def resolve_attempts(user, challenge_ids):
+        """Attempt counts and latest solution for many subscriptions in one query.
+
+        Returns a map keyed by challenge id that the serializer reads from
+        ``context['subscription_attempts']`` instead of querying per row.
+        """
+        attempts = {
+            challenge_id: {'attempts': 0, 'successful_attempts': 0, 'latest': None}
+            for challenge_id in challenge_ids
+        }
+        solutions = Solution.objects.filter(
+            user=user,
+            challenge_id__in=challenge_ids
+        ).order_by('challenge_id', '-created_at', '-id').values_list(
+            'challenge_id', 'status', 'created_at', 'language'
+        )
+        for challenge_id, solution_status, created_at, language in solutions:
+            entry = attempts[challenge_id]
+            entry['attempts'] += 1
+            entry['successful_attempts'] += solution_status == 'accepted'
+            if entry['latest'] is None:
+                entry['latest'] = {
+                    'status': solution_status,
+                    'submitted_at': created_at,
+                    'language': language
+                }
+        return attempts
+
+    def _get_attempts_entry(self, obj):
+        attempts = self.context.get('subscription_attempts')
+        if attempts is None or obj.challenge_id not in attempts:
+            attempts = self.resolve_attempts(obj.user_id, [obj.challenge_id])
+        return attempts[obj.challenge_id]
+
     def get_attempts(self, obj):
-        return obj.get_attempts()
+        return self._get_attempts_entry(obj)['attempts']
     
     def get_successful_attempts(self, obj):
-        return obj.get_successful_attempts()
+        return self._get_attempts_entry(obj)['successful_attempts']
     
     def get_solution_status(self, obj):
-        solution = Solution.objects.filter(
-            user=obj.user,
-            challenge=obj.challenge
-        ).order_by('-created_at').first()
-        
-        if solution:
-            return {
-                'status': solution.status,
-                'submitted_at': solution.created_at,
-                'language': solution.language
-            }
-        return None
+        return self._get_attempts_entry(obj)['latest']
     
     def get_challenge_stats(self, obj):
-        challenge = obj.challenge
-        total_attempts = Solution.objects.filter(challenge=challenge).count()
-        successful_attempts = Solution.objects.filter(
-            challenge=challenge,
-            status='accepted'
-        ).count()
-        total_likes = Like.objects.filter(
-            solution__challenge=challenge
-        ).count()
-        
-        return {
-            'total_attempts': total_attempts,
-            'successful_attempts': successful_attempts,
-            'total_likes': total_likes,
-            'completion_rate': (successful_attempts / total_attempts * 100) if total_attempts > 0 else 0
-        }
+        return obj.challenge.get_stats()
+
+    @classmethod
+    def get_batch_context(cls, user, subscriptions, context=None):
+        """Serializer context resolving everything a page of subscriptions needs up front"""
+        challenges = [subscription.challenge for subscription in subscriptions]
+        context = dict(context or {})
+        context['subscription_attempts'] = cls.resolve_attempts(user, [c.pk for c in challenges])
+        context['user_statuses'] = ChallengeListSerializer.resolve_user_statuses(user, challenges)
+        context['category_stats'] = CategorySerializer.resolve_stats([c.category_id for c in challenges])
+        return context
 
 class UserProgressSerializer(serializers.Serializer):
     total_challenges = serializers.IntegerField()
@@ -254,28 +349,24 @@ class UserProgressSerializer(serializers.Serializer):
     subscribed_challenges = UserChallengeSerializer(many=True, source='subscribed_challenges.all')
     
     def to_representation(self, instance):
-        data = super().to_representation(instance)
         user = instance
-        solutions = Solution.objects.filter(user=user)
-        completed = solutions.filter(status='accepted')
-        
-        # Get completion by category
-        categories = Category.objects.all()
+        progress = UserProgress.objects.for_user(user)
+
+        # Totals are global, so they are counted per category rather than stored per user
+        completed_by_category = dict(user.category_progress.values_list('category_id', 'completed'))
+        categories = Category.objects.annotate(total=Count('challenges')).filter(total__gt=0)
         completion_by_category = {}
         for category in categories:
-            category_challenges = category.challenges.count()
-            if category_challenges > 0:
-                completed_in_category = completed.filter(
-                    challenge__category=category
-                ).count()
-                completion_by_category[category.name] = {
-                    'total': category_challenges,
-                    'completed': completed_in_category,
-                    'percentage': (completed_in_category / category_challenges) * 100
-                }
-        
-        # Get recent solutions
-        recent = solutions.order_by('-created_at')[:5]
+            completed_in_category = completed_by_category.get(category.pk, 0)
+            completion_by_category[category.name] = {
+                'total': category.total,
+                'completed': completed_in_category,
+                'percentage': (completed_in_category / category.total) * 100
+            }
+
+        recent = Solution.objects.filter(user=user).select_related('challenge').only(
+            'status', 'created_at', 'challenge__title', 'challenge__slug', 'challenge__difficulty'
+        ).order_by('-created_at')[:5]
         recent_solutions = [{
             'challenge': {
                 'title': sol.challenge.title,
@@ -285,26 +376,27 @@ class UserProgressSerializer(serializers.Serializer):
             'status': sol.status,
             'submitted_at': sol.created_at
         } for sol in recent]
-        
-        # Add subscribed challenges data
-        subscribed = UserChallenge.objects.filter(
+
+        subscribed = list(UserChallenge.objects.filter(
             user=user,
             is_subscribed=True
-        ).select_related('challenge').order_by('-subscribed_at')
-        
-        data['subscribed_challenges'] = UserChallengeSerializer(
-            subscribed, 
+        ).select_related('challenge__category', 'challenge__stats').prefetch_related(
+            'challenge__tags'
+        ).order_by('-subscribed_at'))
+
+        subscribed_challenges = UserChallengeSerializer(
+            subscribed,
             many=True,
-            context=self.context
+            context=UserChallengeSerializer.get_batch_context(user, subscribed, self.context)
         ).data
-        
+
         return {
             'total_challenges': Challenge.objects.count(),
-            'completed_challenges': completed.count(),
-            'total_points': sum(sol.challenge.points for sol in completed),
+            'completed_challenges': progress.completed_challenges,
+            'total_points': progress.total_points,
             'completion_by_category': completion_by_category,
             'recent_solutions': recent_solutions,
-            'subscribed_challenges': data['subscribed_challenges']
+            'subscribed_challenges': subscribed_challenges
         }
 
 class SolutionCreatorSerializer(serializers.ModelSerializer):
@@ -316,8 +408,6 @@ class SolutionCreatorSerializer(serializers.ModelSerializer):
 class PublicSolutionSerializer(serializers.ModelSerializer):
     """Serializer for public solutions with creator information"""
     user = SolutionCreatorSerializer(read_only=True)
-    likes_count = serializers.SerializerMethodField()
-    comments_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Solution
@@ -326,9 +416,28 @@ class PublicSolutionSerializer(serializers.ModelSerializer):
             'language', 'status', 'created_at', 'likes_count', 
             'comments_count'
         ]
-    
-    def get_likes_count(self, obj):
-        return obj.likes.count()
-    
-    def get_comments_count(self, obj):
-        return obj.comments.count()
\ No newline at end of file
+        read_only_fields = ['likes_count', 'comments_count']
+
+class ActivityActorSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = get_user_model()
+        fields = ['id', 'username', 'profile', 'title']
+
+class ActivitySolutionSerializer(serializers.ModelSerializer):
+    challenge = serializers.SlugRelatedField(slug_field='slug', read_only=True)
+    challenge_title = serializers.CharField(source='challenge.title', read_only=True)
+
+    class Meta:
+        model = Solution
+        fields = ['id', 'challenge', 'challenge_title', 'language', 'status']
+
+class ActivityEventSerializer(serializers.ModelSerializer):
+    """One feed item; expects actor, solution__challenge and comment to be selected"""
+    actor = ActivityActorSerializer(read_only=True)
+    solution = ActivitySolutionSerializer(read_only=True)
+    comment = serializers.CharField(source='comment.content', read_only=True, default=None)
+
+    class Meta:
+        model = ActivityEvent
+        fields = ['id', 'verb', 'actor', 'solution', 'comment', 'created_at']
+
@@ -0,0 +1,318 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import post_init, post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+from taggit.models import TaggedItem
+
+from authentication.models import Follow
+
+from . import feed
+from .models import (
+    ActivityEvent, Attachment, Challenge, ChallengeStats, Comment, DimensionScore, Dislike, JudgeTask, Solution,
+    Like, UserProgress
+)
+from .judge import scheduler as judge_scheduler
+from .judge.testcases import TEST_CASE_FILE_TYPE
+from .search import get_search_backend
+from .code_search import code_search
+
+
+@receiver(post_init, sender=Solution)
+def remember_solution_status(sender, instance, **kwargs):
+    """Keep the loaded status around so saves can detect transitions"""
+    instance._loaded_status = instance.__dict__.get('status')
+
+
+@receiver(post_init, sender=Challenge)
+def remember_challenge_scoring(sender, instance, **kwargs):
+    """Keep the loaded points/category so saves can tell when progress must be recounted"""
+    instance._loaded_scoring = (instance.__dict__.get('points'), instance.__dict__.get('category_id'))
+
+
+@receiver(post_save, sender=Challenge)
+def create_challenge_stats(sender, instance, created, **kwargs):
+    if created:
+        ChallengeStats.objects.get_or_create(challenge=instance)
+
+
+@receiver(post_save, sender=Challenge)
+def index_challenge_on_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        get_search_backend().index(instance)
+
+
+@receiver(post_save, sender=Challenge)
+def recount_progress_on_scoring_change(sender, instance, created, raw=False, **kwargs):
+    scoring = (instance.points, instance.category_id)
+    if not created and not raw and scoring != instance._loaded_scoring:
+        user_ids = Solution.objects.filter(
+            challenge=instance, status='accepted'
+        ).values_list('user_id', flat=True).distinct()
+        UserProgress.objects.rebuild(user_ids=list(user_ids))
+        DimensionScore.objects.rebuild(user_ids=list(user_ids))
+    instance._loaded_scoring = scoring
+
+
+@receiver(post_delete, sender=Challenge)
+def unindex_challenge_on_delete(sender, instance, **kwargs):
+    get_search_backend().remove(instance.pk)
+
+
+@receiver(m2m_changed, sender=TaggedItem)
+def reindex_challenge_on_tag_change(sender, instance, action, **kwargs):
+    if isinstance(instance, Challenge) and action in ('post_add', 'post_remove', 'post_clear'):
+        get_search_backend().index(instance)
+
+
+def _is_test_case(file_type):
+    return (file_type or '').lower() == TEST_CASE_FILE_TYPE
+
+
+def _bump_test_set_version(challenge_ids):
+    """New test data: cached verdicts keyed on the old version stop matching"""
+    Challenge.objects.filter(pk__in=challenge_ids).update(test_set_version=F('test_set_version') + 1)
+
+
+@receiver(post_init, sender=Attachment)
+def remember_attachment_file(sender, instance, **kwargs):
+    instance._loaded_test_data = (instance.__dict__.get('file_type'), str(instance.__dict__.get('file') or ''))
+
+
+@receiver(post_save, sender=Attachment)
+def bump_version_on_attachment_save(sender, instance, created, raw=False, **kwargs):
+    loaded = instance._loaded_test_data
+    current = (instance.file_type, instance.file.name or '')
+    was_or_is_test_case = _is_test_case(loaded[0]) or _is_test_case(current[0])
+    if not created and was_or_is_test_case and current != loaded:
+        _bump_test_set_version(instance.challenge_set.values_list('pk', flat=True))
+    instance._loaded_test_data = current
+
+
+@receiver(pre_delete, sender=Attachment)
+def bump_version_on_attachment_delete(sender, instance, **kwargs):
+    # pre_delete: the m2m rows linking it to challenges are still there
+    if _is_test_case(instance.file_type):
+        _bump_test_set_version(list(instance.challenge_set.values_list('pk', flat=True)))
+
+
+@receiver(m2m_changed, sender=Challenge.attachments.through)
+def bump_version_on_attachments_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if reverse:
+        # instance is an Attachment, pk_set holds challenge ids
+        if _is_test_case(instance.file_type):
+            challenge_ids = pk_set if action != 'pre_clear' else instance.challenge_set.values_list('pk', flat=True)
+            _bump_test_set_version(list(challenge_ids))
+        return
+    attachments = instance.attachments.all() if action == 'pre_clear' else Attachment.objects.filter(pk__in=pk_set)
+    if attachments.filter(file_type__iexact=TEST_CASE_FILE_TYPE).exists():
+        _bump_test_set_version([instance.pk])
+
+
+def _accepted_delta(solution, created):
+    """+1/-1 when a save moves a solution into or out of 'accepted', else 0"""
+    previous = None if created else solution._loaded_status
+    if previous == solution.status or 'accepted' not in (previous, solution.status):
+        return 0
+    return 1 if solution.status == 'accepted' else -1
+
+
+def _challenge_scoring(solution):
+    """(points, category_id) of the solution's challenge, or None if it is gone"""
+    challenge = solution._state.fields_cache.get('challenge')
+    if challenge is not None:
+        return challenge.points, challenge.category_id
+    return Challenge.objects.filter(pk=solution.challenge_id).values_list('points', 'category_id').first()
+
+
+def _bump_user_progress(solution, delta, rebuild_missing=True):
+    scoring = _challenge_scoring(solution)
+    if scoring is None:
+        return
+    points, category_id = scoring
+    UserProgress.objects.bump(
+        solution.user_id, category_id, rebuild_missing=rebuild_missing,
+        completed=delta, points=delta * points
+    )
+
+
+def _bump_dimension_scores(solution, delta):
+    """Count a challenge in its category and the solution's language on the first accepted solution there"""
+    scoring = _challenge_scoring(solution)
+    if scoring is None:
+        return
+    points, category_id = scoring
+    others = {
+        DimensionScore.language_key(language)
+        for language in Solution.objects.filter(
+            user_id=solution.user_id, challenge_id=solution.challenge_id, status='accepted'
+        ).exclude(pk=solution.pk).values_list('language', flat=True)
+    }
+    dimensions = []
+    if category_id is not None and not others:
+        dimensions.append(DimensionScore.category_key(category_id))
+    if DimensionScore.language_key(solution.language) not in others:
+        dimensions.append(DimensionScore.language_key(solution.language))
+    for dimension in dimensions:
+        DimensionScore.objects.bump(dimension, solution.user_id, points=delta * points, solved=delta)
+
+
+def _award_points(solution, delta):
+    """Award a challenge's points on its first accepted solution and take them back on the last"""
+    others = Solution.objects.filter(
+        user_id=solution.user_id, challenge_id=solution.challenge_id, status='accepted'
+    ).exclude(pk=solution.pk).exists()
+    scoring = _challenge_scoring(solution)
+    if others or scoring is None:
+        return
+    verb = 'accepted' if delta > 0 else 'revoked'
+    get_user_model().add_points_bulk([
+        (solution.user_id, delta * scoring[0], f'challenge {solution.challenge_id} {verb}')
+    ])
+
+
+def _deleting_user(origin):
+    """True when a delete cascades from a user, whose ledger is going away with it"""
+    user_model = get_user_model()
+    return isinstance(origin, user_model) or getattr(origin, 'model', None) is user_model
+
+
+@receiver(post_save, sender=Solution)
+def record_solution_activity(sender, instance, created, raw=False, **kwargs):
+    # Registered before update_stats_on_solution_save, which resets _loaded_status
+    if raw or instance.is_private:
+        return
+    if created:
+        feed.record(instance.user_id, ActivityEvent.SUBMITTED, instance.pk)
+    if _accepted_delta(instance, created) > 0:
+        feed.record(instance.user_id, ActivityEvent.ACCEPTED, instance.pk)
+
+
+@receiver(post_save, sender=Solution)
+def award_points_on_solution_save(sender, instance, created, raw=False, **kwargs):
+    # Registered before update_stats_on_solution_save, which resets _loaded_status
+    accepted = _accepted_delta(instance, created)
+    if accepted and not raw:
+        _award_points(instance, accepted)
+
+
+@receiver(post_save, sender=Solution)
+def update_stats_on_solution_save(sender, instance, created, raw=False, **kwargs):
+    accepted = _accepted_delta(instance, created)
+    if created:
+        ChallengeStats.objects.bump(instance.challenge_id, total_attempts=1, accepted_attempts=accepted)
+    elif accepted:
+        ChallengeStats.objects.bump(instance.challenge_id, accepted_attempts=accepted)
+    if accepted:
+        _bump_user_progress(instance, accepted)
+        _bump_dimension_scores(instance, accepted)
+    instance._loaded_status = instance.status
+
+
+@receiver(post_save, sender=Solution)
+def enqueue_for_judging(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and instance.status == 'pending':
+        JudgeTask.objects.create(solution=instance, priority=judge_scheduler.priority_for(instance))
+
+
+@receiver(post_save, sender=Solution)
+def index_solution_code(sender, instance, raw=False, **kwargs):
+    if not raw:
+        code_search.update(instance)
+
+
+@receiver(post_delete, sender=Solution)
+def unindex_solution_code(sender, instance, **kwargs):
+    code_search.remove(instance.pk)
+
+
+@receiver(post_delete, sender=Solution)
+def update_stats_on_solution_delete(sender, instance, **kwargs):
+    # Never rebuild here: the challenge itself may be in the middle of a cascade delete
+    ChallengeStats.objects.bump(
+        instance.challenge_id,
+        rebuild_missing=False,
+        total_attempts=-1,
+        accepted_attempts=-int(instance.status == 'accepted')
+    )
+    if instance.status == 'accepted':
+        # The user row may already be gone if the user is being deleted
+        _bump_user_progress(instance, -1, rebuild_missing=False)
+        _bump_dimension_scores(instance, -1)
+
+
+@receiver(post_delete, sender=Solution)
+def revoke_points_on_solution_delete(sender, instance, origin=None, **kwargs):
+    if instance.status == 'accepted' and not _deleting_user(origin):
+        _award_points(instance, -1)
+
+
+def _liked_challenge_id(like):
+    solution = like._state.fields_cache.get('solution')
+    if solution is not None:
+        return solution.challenge_id
+    return Solution.objects.filter(pk=like.solution_id).values_list('challenge_id', flat=True).first()
+
+
+@receiver(post_save, sender=Like)
+def update_stats_on_like_save(sender, instance, created, **kwargs):
+    if created:
+        ChallengeStats.objects.bump(_liked_challenge_id(instance), total_likes=1)
+
+
+@receiver(post_delete, sender=Like)
+def update_stats_on_like_delete(sender, instance, **kwargs):
+    challenge_id = _liked_challenge_id(instance)
+    if challenge_id is not None:
+        ChallengeStats.objects.bump(challenge_id, rebuild_missing=False, total_likes=-1)
+
+
+# Cached reaction counters on Solution, whichever path creates or deletes the row (API, admin, cascades)
+SOLUTION_COUNTERS = {Like: 'likes_count', Dislike: 'dislikes_count', Comment: 'comments_count'}
+
+
+@receiver(post_save, sender=Like)
+@receiver(post_save, sender=Dislike)
+@receiver(post_save, sender=Comment)
+def count_reaction(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        Solution.objects.bump_counters(instance.solution_id, **{SOLUTION_COUNTERS[sender]: 1})
+
+
+@receiver(post_delete, sender=Like)
+@receiver(post_delete, sender=Dislike)
+@receiver(post_delete, sender=Comment)
+def uncount_reaction(sender, instance, **kwargs):
+    Solution.objects.bump_counters(instance.solution_id, **{SOLUTION_COUNTERS[sender]: -1})
+
+
+def _on_private_solution(reaction):
+    """Private work stays out of feeds, reactions to it included"""
+    solution = reaction._state.fields_cache.get('solution')
+    if solution is not None:
+        return solution.is_private
+    return Solution.objects.filter(pk=reaction.solution_id, is_private=True).exists()
+
+
+@receiver(post_save, sender=Like)
+def record_like_activity(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and not _on_private_solution(instance):
+        feed.record(instance.user_id, ActivityEvent.LIKED, instance.solution_id)
+
+
+@receiver(post_save, sender=Comment)
+def record_comment_activity(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and not _on_private_solution(instance):
+        feed.record(instance.user_id, ActivityEvent.COMMENTED, instance.solution_id, instance.pk)
+
+
+@receiver(post_save, sender=Follow)
+def backfill_feed_on_follow(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        feed.backfill(instance.follower_id, instance.following_id)
+
+
+@receiver(post_delete, sender=Follow)
+def clear_feed_on_unfollow(sender, instance, **kwargs):
+    feed.forget(instance.follower_id, instance.following_id)
@@ -1,10 +1,37 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+from unittest import skipUnless
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework.test import APIClient, APITestCase
 from rest_framework import status
 from django.contrib.auth import get_user_model
-from challenges.models import Challenge, Solution, Comment, Like, Dislike
+from challenges.models import (
+    Challenge, ChallengeStats, Solution, Comment, Like, Dislike, UserChallenge, Category, UserProgress,
+    Attachment, JudgeTask, RejudgeRun, ActivityEvent, TimelineEntry, DimensionScore
+)
 from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.core.management import call_command
+from io import StringIO
+from challenges.code_search import TrigramIndex, code_search
+from challenges import feed
+from authentication import follow_graph
+from challenges.judge import (
+    engine as judge_engine, rejudge as judge_rejudge, sandbox as judge_sandbox, scheduler as judge_scheduler,
+    testcases as judge_testcases, warm as judge_warm, worker as judge_worker
+)
+from challenges.judge.cache import VerdictCache, verdict_key
+from challenges.judge.languages import get_language
+from challenges.judge.sandbox import Limits
+from challenges.judge.worker import JudgeWorker
+from django.core.files.base import ContentFile
+from django.test import override_settings
+from django.core.cache import cache
 
 User = get_user_model()
 
@@ -180,3 +207,1049 @@ class SocialInteractionTests(APITestCase):
             'status_code': response.status_code,
             'data': response.data
         }
+
+class ChallengeStatsTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='stats_user',
+            password='testpass123',
+            email='stats@example.com'
+        )
+        self.challenge = Challenge.objects.create(
+            title='Stats Challenge',
+            description='Test description',
+            content='Test content',
+            difficulty='easy',
+            points=20
+        )
+        self.solution = Solution.objects.create(
+            user=self.user,
+            challenge=self.challenge,
+            code='print("stats")',
+            language='python'
+        )
+
+    def test_stats_follow_solution_and_like_changes(self):
+        """Test that the stats row tracks attempts, acceptances and likes"""
+        Like.objects.create(user=self.user, solution=self.solution)
+        self.solution.status = 'accepted'
+        self.solution.save()
+
+        stats = ChallengeStats.objects.get(challenge=self.challenge)
+        self.assertEqual(stats.total_attempts, 1)
+        self.assertEqual(stats.accepted_attempts, 1)
+        self.assertEqual(stats.total_likes, 1)
+        self.assertEqual(stats.completion_rate, 100)
+
+        self.solution.delete()
+        stats.refresh_from_db()
+        self.assertEqual((stats.total_attempts, stats.accepted_attempts, stats.total_likes), (0, 0, 0))
+
+    def test_rebuild_repairs_drift(self):
+        """Test that a bulk rebuild recomputes counters from source rows"""
+        ChallengeStats.objects.filter(challenge=self.challenge).update(total_attempts=42)
+        ChallengeStats.objects.rebuild()
+        self.challenge.refresh_from_db()
+        self.assertEqual(self.challenge.get_stats()['total_attempts'], 1)
+
+    def test_listing_does_not_count_per_row(self):
+        """Test that listing challenges and categories reads stats without per-row aggregates"""
+        categories = [Category.objects.create(name=f'Listed Category {i}', description='d') for i in range(5)]
+        for i in range(5):
+            Challenge.objects.create(
+                title=f'Listed {i}', description='d', content='c', difficulty='easy', points=5,
+                category=categories[i]
+            )
+        for url in (reverse('challenge-list'), reverse('category-list')):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            # One grouped count for the whole page
+            counts = [q for q in queries if 'COUNT(' in q['sql'] and 'challenges_solution' in q['sql']]
+            self.assertEqual(len(counts), 1)
+
+class UserStatusResolutionTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='status_user',
+            password='testpass123',
+            email='status@example.com'
+        )
+        self.categories = [Category.objects.create(name=f'Status Category {i}', description='d') for i in range(3)]
+        self.challenges = [
+            Challenge.objects.create(
+                title=f'Status Challenge {i}', description='d', content='c', difficulty='easy', points=10,
+                category=self.categories[i % 3]
+            )
+            for i in range(6)
+        ]
+        Solution.objects.create(
+            user=self.user,
+            challenge=self.challenges[0],
+            code='print(1)',
+            language='python',
+            status='accepted'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_listing_queries_do_not_grow_with_page_size(self):
+        """Test that per-user status costs a fixed number of queries per page"""
+        url = reverse('challenge-list')
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(url, {'page_size': 2})
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(url, {'page_size': 6})
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(response.data['results'][0]['category']['stats']['total_challenges'], 2)
+
+        statuses = {row['id']: row['user_status'] for row in response.data['results']}
+        self.assertEqual(statuses[self.challenges[0].id]['status'], 'accepted')
+        self.assertIsNone(statuses[self.challenges[1].id])
+
+    def test_detail_reports_subscription(self):
+        """Test that the detail view resolves solution and subscription status"""
+        UserChallenge.objects.create(user=self.user, challenge=self.challenges[0])
+        url = reverse('challenge-detail', kwargs={'slug': self.challenges[0].slug})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['user_status']['is_subscribed'])
+        self.assertEqual(response.data['user_status']['solution_status'], 'accepted')
+
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='cursor_user',
+            password='testpass123',
+            email='cursor@example.com'
+        )
+        self.challenges = [
+            Challenge.objects.create(
+                title=f'Cursor Challenge {i}', description='d', content='c', difficulty='easy', points=10
+            )
+            for i in range(5)
+        ]
+
+    def test_cursor_mode_walks_every_challenge_once(self):
+        """Test that following next links visits each challenge exactly once, newest first"""
+        url = reverse('challenge-list')
+        response = self.client.get(url, {'pagination': 'cursor', 'page_size': 2})
+        self.assertNotIn('count', response.data)
+        seen = [row['id'] for row in response.data['results']]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            seen.extend(row['id'] for row in response.data['results'])
+        expected = [c.id for c in sorted(self.challenges, key=lambda c: (c.created_at, c.id), reverse=True)]
+        self.assertEqual(seen, expected)
+
+        response = self.client.get(response.data['previous'])
+        self.assertEqual([row['id'] for row in response.data['results']], expected[2:4])
+
+    def test_invalid_cursor(self):
+        """Test that a tampered cursor is rejected"""
+        response = self.client.get(reverse('challenge-list'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_solution_cursor_mode(self):
+        """Test that solutions can be listed with cursors"""
+        for challenge in self.challenges:
+            Solution.objects.create(user=self.user, challenge=challenge, code='x', language='python')
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('solution-list'), {'pagination': 'cursor', 'page_size': 3})
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertIsNotNone(response.data['next'])
+
+class ChallengeSearchTests(APITestCase):
+    def setUp(self):
+        self.graphs = Challenge.objects.create(
+            title='Graph Traversal', description='Walk every node with breadth first search',
+            content='c', difficulty='medium', points=30
+        )
+        self.strings = Challenge.objects.create(
+            title='String Reversal', description='Reverse the characters of a string',
+            content='c', difficulty='easy', points=10
+        )
+        self.strings.tags.add('recursion')
+
+    def test_prefix_search_ranks_and_highlights(self):
+        """Test that search matches prefixes and returns highlighted snippets"""
+        response = self.client.get(reverse('challenge-list'), {'search': 'trav'})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.graphs.id])
+
+        response = self.client.get(reverse('challenge-list'), {'search': 'breadth'})
+        self.assertIn('<mark>breadth</mark>', response.data['results'][0]['search_highlight'])
+
+    def test_index_follows_tags_and_edits(self):
+        """Test that tag changes and saves keep the index in sync"""
+        response = self.client.get(reverse('challenge-list'), {'search': 'recursion'})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.strings.id])
+
+        self.graphs.title = 'Graph Coloring'
+        self.graphs.save()
+        response = self.client.get(reverse('challenge-list'), {'search': 'traversal'})
+        self.assertEqual(response.data['results'], [])
+
+class CodeSearchTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='coder',
+            password='testpass123',
+            email='coder@example.com'
+        )
+        self.challenge = Challenge.objects.create(
+            title='Code Search Challenge', description='d', content='c', difficulty='easy', points=10
+        )
+        self.python = Solution.objects.create(
+            user=self.user, challenge=self.challenge, language='Python',
+            code='def fizzbuzz(n):\n    return [fizz(i) for i in range(n)]'
+        )
+        self.javascript = Solution.objects.create(
+            user=self.user, challenge=self.challenge, language='JavaScript',
+            code='const fizzbuzz = n => [...Array(n).keys()]'
+        )
+
+    def test_trigram_index_candidates(self):
+        """Test that the in-process index narrows candidates by trigram and language"""
+        index = TrigramIndex()
+        self.assertEqual(index.candidates('fizzbuzz'), {self.python.id, self.javascript.id})
+        self.assertEqual(index.candidates('FIZZBUZZ', language='python'), {self.python.id})
+        self.assertEqual(index.candidates('quux'), set())
+
+        self.python.code = 'print("renamed")'
+        self.python.save()
+        index.update(self.python)
+        self.assertEqual(index.candidates('fizzbuzz'), {self.javascript.id})
+
+    def test_public_search_returns_match_offsets(self):
+        """Test that public solution search filters by language and reports offsets"""
+        response = self.client.get(reverse('solution-public'), {'search': 'fizz', 'language': 'python'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        solutions = response.data['results'][0]['solutions']
+        self.assertEqual([s['id'] for s in solutions], [self.python.id])
+        self.assertEqual(solutions[0]['matches'][:2], [[4, 8], [29, 33]])
+
+    def test_username_matches_do_not_join_users(self):
+        """Test that author matches come from a subquery rather than a join or a list of ids"""
+        with self.assertNumQueries(1):
+            queryset = code_search.search(Solution.objects.all(), 'CODER')
+            self.assertEqual(set(queryset.values_list('pk', flat=True)), {self.python.id, self.javascript.id})
+        sql = str(queryset.query)
+        self.assertNotIn('JOIN', sql)
+        self.assertIn('SELECT U0."id" FROM "authentication_user"', sql)
+
+class PublicSolutionsTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='publisher',
+            password='testpass123',
+            email='publisher@example.com'
+        )
+        self.challenges = [
+            Challenge.objects.create(
+                title=f'Public Challenge {i}', description='d', content='c', difficulty='easy', points=10
+            )
+            for i in range(3)
+        ]
+        for challenge in self.challenges:
+            for language in ('python', 'rust'):
+                solution = Solution.objects.create(
+                    user=self.user, challenge=challenge, code=f'// {language}', language=language
+                )
+                Like.objects.create(user=self.user, solution=solution)
+        Solution.objects.create(
+            user=self.user, challenge=self.challenges[0], code='secret', language='go', is_private=True
+        )
+
+    def test_paginates_by_challenge_with_counts(self):
+        """Test that groups are paginated by challenge and counts come from the counter columns"""
+        url = reverse('solution-public')
+        response = self.client.get(url, {'page_size': 2})
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(len(response.data['results']), 2)
+        group = response.data['results'][0]
+        self.assertEqual(group['challenge']['title'], 'Public Challenge 0')
+        self.assertEqual(len(group['solutions']), 2)
+        self.assertEqual(group['solutions'][0]['likes_count'], 1)
+        self.assertIn('code', group['solutions'][0])
+
+        response = self.client.get(url, {'include_code': 'false'})
+        self.assertNotIn('code', response.data['results'][0]['solutions'][0])
+
+    def test_stream_mode_emits_one_line_per_group(self):
+        """Test that stream mode returns newline-delimited JSON groups"""
+        response = self.client.get(reverse('solution-public'), {'stream': 'true'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        groups = [json.loads(line) for line in lines]
+        self.assertEqual([g['challenge']['id'] for g in groups], [c.id for c in self.challenges])
+        self.assertTrue(all(len(g['solutions']) == 2 for g in groups))
+
+class SolutionCounterTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='counter_user',
+            password='testpass123',
+            email='counter@example.com'
+        )
+        self.challenge = Challenge.objects.create(
+            title='Counter Challenge', description='d', content='c', difficulty='easy', points=10
+        )
+        self.solution = Solution.objects.create(
+            user=self.user, challenge=self.challenge, code='x', language='python'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_viewsets_maintain_counters(self):
+        """Test that like, dislike and comment create/destroy update the cached counters"""
+        base = f'/challenges/listings/{self.challenge.slug}/solutions/{self.solution.id}'
+        like = self.client.post(f'{base}/likes/')
+        self.client.post(f'{base}/dislikes/')
+        self.client.post(f'{base}/comments/', {'content': 'Nice'})
+        self.solution.refresh_from_db()
+        self.assertEqual(
+            (self.solution.likes_count, self.solution.dislikes_count, self.solution.comments_count),
+            (1, 1, 1)
+        )
+
+        self.client.delete(f"{base}/likes/{like.data['id']}/")
+        self.solution.refresh_from_db()
+        self.assertEqual(self.solution.likes_count, 0)
+
+    def test_counters_follow_rows_outside_the_api(self):
+        """Test that a stale full save keeps the counters and direct deletes decrement them"""
+        stale = Solution.objects.get(pk=self.solution.pk)
+        like = Like.objects.create(user=self.user, solution=self.solution)
+        Comment.objects.create(user=self.user, solution=self.solution, content='Nice')
+        stale.documentation = 'Edited'
+        stale.save()
+        self.solution.refresh_from_db()
+        self.assertEqual((self.solution.likes_count, self.solution.comments_count), (1, 1))
+        self.assertEqual(self.solution.documentation, 'Edited')
+
+        like.delete()
+        self.solution.refresh_from_db()
+        self.assertEqual(self.solution.likes_count, 0)
+
+    def test_reconcile_command_repairs_drift(self):
+        """Test that reconciliation reports and fixes drifted counters"""
+        Like.objects.create(user=self.user, solution=self.solution)
+        Solution.objects.filter(pk=self.solution.pk).update(likes_count=3)
+        out = StringIO()
+        call_command('reconcile_solution_counters', stdout=out)
+        self.assertIn('Repaired drift on 1 solutions', out.getvalue())
+        self.solution.refresh_from_db()
+        self.assertEqual(self.solution.likes_count, 1)
+
+class UserProgressTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='progress_user',
+            password='testpass123',
+            email='progress@example.com'
+        )
+        self.categories = [
+            Category.objects.create(name=f'Progress Category {i}', description='d') for i in range(2)
+        ]
+        self.challenges = [
+            Challenge.objects.create(
+                title=f'Progress Challenge {i}', description='d', content='c', difficulty='easy',
+                points=10 * (i + 1), category=self.categories[i % 2]
+            )
+            for i in range(4)
+        ]
+        self.client.force_authenticate(user=self.user)
+
+    def progress(self):
+        return UserProgress.objects.for_user(self.user)
+
+    def test_accept_transitions_update_progress(self):
+        """Test that accepting, rejecting and deleting solutions keep progress current"""
+        solution = Solution.objects.create(
+            user=self.user, challenge=self.challenges[1], code='x', language='python'
+        )
+        self.assertEqual(self.progress().completed_challenges, 0)
+
+        solution.status = 'accepted'
+        solution.save()
+        progress = self.progress()
+        self.assertEqual((progress.completed_challenges, progress.total_points), (1, 20))
+        self.assertEqual(
+            self.user.category_progress.get(category=self.categories[1]).completed, 1
+        )
+
+        solution.status = 'rejected'
+        solution.save()
+        self.assertEqual(self.progress().total_points, 0)
+
+        solution.status = 'accepted'
+        solution.save()
+        solution.delete()
+        self.assertEqual(self.progress().completed_challenges, 0)
+
+    def test_points_change_recounts_progress(self):
+        """Test that editing a challenge's points recounts users who solved it"""
+        Solution.objects.create(
+            user=self.user, challenge=self.challenges[0], code='x', language='python', status='accepted'
+        )
+        self.challenges[0].points = 50
+        self.challenges[0].save()
+        self.assertEqual(self.progress().total_points, 50)
+
+    def test_points_follow_accepted_solutions(self):
+        """Test that un-accepting or deleting the accepted solution takes its points back"""
+        solution = Solution.objects.create(
+            user=self.user, challenge=self.challenges[1], code='x', language='python', status='accepted'
+        )
+        duplicate = Solution.objects.create(
+            user=self.user, challenge=self.challenges[1], code='y', language='python', status='accepted'
+        )
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.score, 20)
+
+        duplicate.delete()
+        solution.status = 'rejected'
+        solution.save()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.score, 0)
+
+        solution.status = 'accepted'
+        solution.save()
+        solution.delete()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.score, 0)
+        self.assertEqual(
+            list(self.user.score_events.order_by('pk').values_list('points', flat=True)), [20, -20, 20, -20]
+        )
+
+    def test_deleting_the_user_skips_point_reversal(self):
+        """Test that a user's cascade delete does not write ledger rows for the user being removed"""
+        Solution.objects.create(
+            user=self.user, challenge=self.challenges[0], code='x', language='python', status='accepted'
+        )
+        self.user.delete()
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+
+    def test_my_progress_queries_are_bounded(self):
+        """Test that my_progress costs the same number of queries regardless of subscriptions"""
+        url = reverse('challenge-my-progress')
+        Solution.objects.create(
+            user=self.user, challenge=self.challenges[0], code='x', language='python', status='accepted'
+        )
+        UserChallenge.objects.create(user=self.user, challenge=self.challenges[0])
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(url)
+
+        for challenge in self.challenges[1:]:
+            UserChallenge.objects.create(user=self.user, challenge=challenge)
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(url)
+        self.assertEqual(len(few), len(many))
+
+        self.assertEqual(response.data['completed_challenges'], 1)
+        self.assertEqual(response.data['total_points'], 10)
+        self.assertEqual(response.data['completion_by_category']['Progress Category 0'], {
+            'total': 2, 'completed': 1, 'percentage': 50.0
+        })
+        subscriptions = {s['challenge']['id']: s for s in response.data['subscribed_challenges']}
+        self.assertEqual(subscriptions[self.challenges[0].id]['successful_attempts'], 1)
+        self.assertEqual(subscriptions[self.challenges[0].id]['solution_status']['language'], 'python')
+        self.assertEqual(subscriptions[self.challenges[1].id]['attempts'], 0)
+
+IN_MEMORY_STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+# Judged programs run as the test runner's own account, or as nobody when the tests run as root
+JUDGE_ACCOUNT = {'uid': os.getuid(), 'gid': os.getgid()} if os.getuid() else {'uid': 65534, 'gid': 65534}
+JUDGE_ACCOUNT_SETTINGS = {'JUDGE_RUN_AS_UID': JUDGE_ACCOUNT['uid'], 'JUDGE_RUN_AS_GID': JUDGE_ACCOUNT['gid']}
+
+
+def _account_can_execute(path, uid, gid):
+    """Whether uid/gid can reach and run path (every parent directory searchable, the file executable)"""
+    path = os.path.realpath(path)
+    parents = [os.path.dirname(path)]
+    while parents[-1] != os.path.dirname(parents[-1]):
+        parents.append(os.path.dirname(parents[-1]))
+    for target in parents + [path]:
+        info = os.stat(target)
+        if info.st_uid == uid:
+            mode = info.st_mode >> 6
+        elif info.st_gid == gid:
+            mode = info.st_mode >> 3
+        else:
+            mode = info.st_mode
+        if not mode & 1:
+            return False
+    return True
+
+
+# A venv or pyenv interpreter under a private home can't be run by the judge account
+needs_judge_python = skipUnless(
+    _account_can_execute(sys.executable, JUDGE_ACCOUNT['uid'], JUDGE_ACCOUNT['gid']),
+    'the judge account cannot execute this interpreter'
+)
+
+class JudgeEngineTests(TestCase):
+    limits = Limits(cpu_seconds=1, wall_seconds=3, memory_mb=256, output_kb=64, processes=64, **JUDGE_ACCOUNT)
+    cases = [
+        judge_testcases.TestCase(name='one', input='2 3\n', expected='5\n'),
+        judge_testcases.TestCase(name='two', input='10 -4\n', expected='6'),
+    ]
+
+    def judge(self, code):
+        return judge_engine.judge_submission(
+            get_language('python'), code, self.cases, self.limits, self.limits
+        )
+
+    @needs_judge_python
+    def test_verdicts(self):
+        """Test that the engine distinguishes accepted, wrong, crashing and looping programs"""
+        adder = 'a, b = map(int, input().split())\nprint(a + b)'
+        self.assertEqual(self.judge(adder)['verdict'], 'accepted')
+        self.assertEqual(self.judge('print(5)')['verdict'], 'wrong_answer')
+        self.assertEqual(self.judge('raise SystemExit(3)')['verdict'], 'runtime_error')
+        self.assertEqual(self.judge('while True: pass')['verdict'], 'time_limit_exceeded')
+        self.assertEqual(self.judge('print("x" * 200000)')['verdict'], 'output_limit_exceeded')
+
+    @needs_judge_python
+    def test_programs_run_as_the_judge_account(self):
+        """Test that programs run as the configured account and nothing runs without one"""
+        outcome = judge_engine.judge_submission(
+            get_language('python'), 'import os\nprint(os.getuid(), os.getgid())',
+            [judge_testcases.TestCase('ids', '', '{uid} {gid}'.format(**JUDGE_ACCOUNT))], self.limits, self.limits
+        )
+        self.assertEqual(outcome['verdict'], 'accepted')
+        for unsafe in (self.limits._replace(uid=None, gid=None), self.limits._replace(uid=0, gid=0)):
+            with self.assertRaises(judge_sandbox.SandboxError):
+                judge_engine.judge_submission(get_language('python'), 'print(1)', self.cases, unsafe, unsafe)
+        with override_settings(JUDGE_RUN_AS_UID=None, JUDGE_RUN_AS_GID=None):
+            with self.assertRaises(judge_sandbox.SandboxError):
+                JudgeWorker()
+
+    @needs_judge_python
+    def test_programs_cannot_point_the_judge_at_other_files(self):
+        """Test that symlinks a program plants are neither read back as its output nor written through"""
+        secrets = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, secrets)
+        secret = os.path.join(secrets, 'secret')
+        with open(secret, 'w') as handle:
+            handle.write('TOP-SECRET')
+        os.chmod(secret, 0o600)
+        names = ['.stdout', '.stderr', '.stdin', 'main.py.out']
+        code = (
+            'import os, sys\n'
+            f'for name in {names!r}:\n'
+            '    try: os.remove(name)\n'
+            '    except OSError: pass\n'
+            f'    os.symlink({secret!r}, name)\n'
+            'sys.exit(1)'
+        )
+        for language in (get_language('python'), {**get_language('python'), 'warm': None}):
+            outcome = judge_engine.judge_submission(language, code, self.cases, self.limits, self.limits)
+            self.assertEqual([test['verdict'] for test in outcome['tests']], ['runtime_error'] * 2)
+            self.assertFalse(any('TOP-SECRET' in test['stderr'] for test in outcome['tests']))
+            with open(secret) as handle:
+                self.assertEqual(handle.read(), 'TOP-SECRET')
+
+    def test_parse_test_cases(self):
+        """Test the accepted test_case attachment formats"""
+        cases = judge_testcases.parse_test_cases('{"cases": [{"input": "1", "expected_output": "1"}]}', 'io')
+        self.assertEqual(cases, [judge_testcases.TestCase('io#1', '1', '1')])
+        with self.assertRaises(judge_testcases.TestCaseError):
+            judge_testcases.parse_test_cases('[{"input": "1"}]')
+
+class JudgeWarmPoolTests(TestCase):
+    limits = JudgeEngineTests.limits
+    cases = JudgeEngineTests.cases
+
+    @needs_judge_python
+    def test_warm_and_cold_verdicts_match(self):
+        """Test that warm runners reach the same verdicts as cold starts"""
+        warm_python = get_language('python')
+        cold_python = {key: value for key, value in warm_python.items() if key != 'warm'}
+        programs = [
+            'a, b = map(int, input().split())\nprint(a + b)',
+            'print(5)',
+            'raise SystemExit(3)',
+            'while True: pass',
+            'print("x" * 200000)',
+            'x = [0] * 10 ** 9',
+        ]
+        for code in programs:
+            cold = judge_engine.judge_submission(cold_python, code, self.cases, self.limits, self.limits)
+            warm = judge_engine.judge_submission(warm_python, code, self.cases, self.limits, self.limits)
+            self.assertEqual(
+                [(t['verdict'], t['exit_code']) for t in warm['tests']],
+                [(t['verdict'], t['exit_code']) for t in cold['tests']],
+                code
+            )
+
+    @needs_judge_python
+    def test_runners_recycled_after_max_uses(self):
+        """Test that a runner is replaced once it reaches max_uses and runs stay isolated"""
+        pool = judge_warm.RunnerPool(get_language('python')['run'][0], size=1, max_uses=2, preload=['math'])
+        self.addCleanup(pool.close)
+        workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, workdir)
+        with open(os.path.join(workdir, 'main.py'), 'w') as source:
+            source.write('import math\nprint(getattr(math, "leak", 0))\nmath.leak = 1')
+        judge_sandbox.hand_over(workdir, self.limits)
+        pids = []
+        for _ in range(3):
+            with pool.runner() as runner:
+                pids.append(runner.process.pid)
+                result = runner.run(workdir, 'main.py', self.limits)
+            self.assertEqual((result.exit_code, result.stdout), (0, '0\n'))
+        self.assertEqual(pool.recycled, 1)
+        self.assertEqual(pids[0], pids[1])
+        self.assertNotEqual(pids[1], pids[2])
+
+
+@override_settings(STORAGES=IN_MEMORY_STORAGES, **JUDGE_ACCOUNT_SETTINGS)
+@needs_judge_python
+class JudgeWorkerTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='judged_user',
+            password='testpass123',
+            email='judged@example.com'
+        )
+        self.challenge = Challenge.objects.create(
+            title='Judged Challenge', description='d', content='c', difficulty='easy', points=25
+        )
+        attachment = Attachment.objects.create(title='judged-cases', file_type='test_case')
+        attachment.file.save('judged-cases.json', ContentFile(json.dumps([
+            {'input': '3\n', 'output': '9'},
+            {'input': '4\n', 'output': '16'},
+        ]).encode()))
+        self.challenge.attachments.add(attachment)
+        self.client.force_authenticate(user=self.user)
+        cache.clear()
+
+    def submit(self, code, language='python'):
+        return Solution.objects.create(user=self.user, challenge=self.challenge, code=code, language=language)
+
+    def test_worker_judges_queued_solutions(self):
+        """Test that the worker judges the queue, writes results back and awards points once"""
+        good = self.submit('n = int(input())\nprint(n * n)')
+        bad = self.submit('print(9)', language='py')
+        unknown = self.submit('fn main() {}', language='rust')
+        self.assertEqual(JudgeTask.objects.filter(status=JudgeTask.QUEUED).count(), 3)
+
+        JudgeWorker(processes=2, poll_interval=0.05).run(once=True)
+
+        good.refresh_from_db()
+        bad.refresh_from_db()
+        unknown.refresh_from_db()
+        self.assertEqual((good.status, bad.status, unknown.status), ('accepted', 'rejected', 'pending'))
+        self.assertEqual(unknown.judge_tasks.get().status, JudgeTask.SKIPPED)
+
+        response = self.client.get(reverse('solution-judge', kwargs={'pk': bad.pk}))
+        self.assertEqual(response.data['verdict'], 'wrong_answer')
+        self.assertEqual([test['verdict'] for test in response.data['results']], ['passed', 'wrong_answer'])
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.score, 25)
+
+    def test_claims_are_exclusive(self):
+        """Test that two workers never claim the same task"""
+        for i in range(3):
+            self.submit(f'print({i})', language=f'lang{i}')
+        first = judge_worker.claim('a', 2)
+        second = judge_worker.claim('b', 5)
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(second), 1)
+        self.assertFalse({t.pk for t in first} & {t.pk for t in second})
+
+    def test_cases_stream_results_and_stop_on_first_failure(self):
+        """Test that per-test rows are written and later cases are skipped after a failure when configured"""
+        self.challenge.stop_on_first_failure = True
+        self.challenge.save()
+        solution = self.submit('print(16)')
+
+        JudgeWorker(processes=1, poll_interval=0.05).run(once=True)
+
+        solution.refresh_from_db()
+        task = solution.judge_tasks.get()
+        self.assertEqual(solution.status, 'rejected')
+        self.assertEqual(task.tests_total, 2)
+        self.assertEqual(
+            list(task.test_results.values_list('index', 'verdict')), [(0, 'wrong_answer'), (1, 'skipped')]
+        )
+        response = self.client.get(reverse('solution-judge', kwargs={'pk': solution.pk}))
+        self.assertEqual([test['verdict'] for test in response.data['tests']], ['wrong_answer', 'skipped'])
+
+class JudgeSchedulerTests(APITestCase):
+    def setUp(self):
+        self.spammer = User.objects.create_user(username='spammer', password='testpass123', email='spam@example.com')
+        self.other = User.objects.create_user(username='patient', password='testpass123', email='patient@example.com')
+        self.easy = Challenge.objects.create(
+            title='Scheduled Easy', description='d', content='c', difficulty='easy', points=5
+        )
+        self.hard = Challenge.objects.create(
+            title='Scheduled Hard', description='d', content='c', difficulty='hard', points=50
+        )
+
+    def submit(self, user, challenge, language):
+        return Solution.objects.create(user=user, challenge=challenge, code='print(1)', language=language)
+
+    def queue_order(self):
+        tasks = JudgeTask.objects.in_bulk(judge_scheduler.candidates(10))
+        return [tasks[pk].solution.user.username for pk in judge_scheduler.candidates(10)]
+
+    def test_fair_share_and_first_attempts(self):
+        """Test that one user's resubmissions don't hold back another user's first attempt"""
+        for language in ['python', 'py', 'python3']:
+            self.submit(self.spammer, self.hard, language)
+        self.submit(self.other, self.hard, 'python')
+        self.assertEqual(
+            list(JudgeTask.objects.order_by('id').values_list('priority', flat=True)),
+            [JudgeTask.FIRST_ATTEMPT, JudgeTask.RESUBMISSION, JudgeTask.RESUBMISSION, JudgeTask.FIRST_ATTEMPT]
+        )
+        self.assertEqual(self.queue_order(), ['spammer', 'patient', 'spammer', 'spammer'])
+
+    def test_easy_first_during_peaks(self):
+        """Test that difficulty only reorders the queue above the peak depth"""
+        self.submit(self.spammer, self.hard, 'python')
+        self.submit(self.other, self.easy, 'python')
+        with override_settings(JUDGE_PEAK_QUEUE_DEPTH=100):
+            self.assertEqual(self.queue_order(), ['spammer', 'patient'])
+        with override_settings(JUDGE_PEAK_QUEUE_DEPTH=1):
+            self.assertEqual(self.queue_order(), ['patient', 'spammer'])
+
+    @override_settings(JUDGE_MAX_PENDING_PER_USER=2)
+    def test_backpressure(self):
+        """Test that submitting past the pending limit returns 429 with Retry-After"""
+        self.client.force_authenticate(user=self.spammer)
+        url = reverse('challenge-submit-solution', kwargs={'slug': self.easy.slug})
+        for language in ['python', 'javascript']:
+            response = self.client.post(url, {'challenge': self.easy.pk, 'code': 'print(1)', 'language': language})
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.post(url, {'challenge': self.easy.pk, 'code': 'print(1)', 'language': 'c'})
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertTrue(int(response['Retry-After']) >= 1)
+
+        stats = judge_scheduler.queue_stats()
+        self.assertEqual(stats['depth'][JudgeTask.QUEUED]['total'], 2)
+        self.assertEqual(stats['users_waiting'], 1)
+        judge_worker.claim('metrics', 1)
+        self.assertGreaterEqual(judge_scheduler.queue_stats()['recent_wait_seconds'], 0)
+
+
+@override_settings(STORAGES=IN_MEMORY_STORAGES, **JUDGE_ACCOUNT_SETTINGS)
+@needs_judge_python
+class RejudgeTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='rejudged', password='testpass123', email='rejudged@example.com')
+        self.challenge = Challenge.objects.create(
+            title='Rejudged Challenge', description='d', content='c', difficulty='easy', points=25
+        )
+        self.attachment = Attachment.objects.create(title='rejudged-cases', file_type='test_case')
+        self.attachment.file.save('rejudged-cases.json', ContentFile(b'[{"input": "3", "output": "9"}]'))
+        self.challenge.attachments.add(self.attachment)
+        cache.clear()
+
+    def judge_all(self):
+        JudgeWorker(processes=1, poll_interval=0.05).run(once=True)
+
+    def test_changed_test_data_rejudges_and_revokes_points(self):
+        """Test that solutions judged on old test data are requeued at low priority and points are reversed"""
+        solution = Solution.objects.create(user=self.user, challenge=self.challenge, code='print(9)', language='python')
+        self.judge_all()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.score, 25)
+
+        self.attachment.file.save('rejudged-cases.json', ContentFile(b'[{"input": "3", "output": "10"}]'))
+        self.challenge.refresh_from_db()
+        out = StringIO()
+        call_command('rejudge_solutions', stdout=out)
+        self.assertIn('Queued 1 solutions', out.getvalue())
+        task = solution.judge_tasks.order_by('-id').first()
+        self.assertEqual((task.status, task.priority), (JudgeTask.QUEUED, JudgeTask.REJUDGE))
+
+        self.judge_all()
+        solution.refresh_from_db()
+        self.user.refresh_from_db()
+        self.assertEqual(solution.status, 'rejected')
+        self.assertEqual(self.user.score, 0)
+        self.assertEqual(self.user.score_events.latest('id').reason, f'challenge {self.challenge.pk} revoked on rejudge')
+        self.assertEqual(ChallengeStats.objects.get(challenge=self.challenge).accepted_attempts, 0)
+
+        self.assertEqual(judge_rejudge.step(self.challenge), 0)
+        self.assertEqual(self.challenge.rejudge_runs.get().status, RejudgeRun.DONE)
+
+    def test_test_data_changed_mid_judging_is_rejudged(self):
+        """Test that a verdict recorded after the test set moved on queues a rejudge even if the run is done"""
+        solution = Solution.objects.create(user=self.user, challenge=self.challenge, code='print(9)', language='python')
+        self.judge_all()
+        Solution.objects.create(user=self.user, challenge=self.challenge, code='print(8)', language='python')
+        task = judge_worker.claim('slow', 1)[0]
+        version = task.solution.challenge.test_set_version
+
+        self.attachment.file.save('rejudged-cases.json', ContentFile(b'[{"input": "3", "output": "8"}]'))
+        self.challenge.refresh_from_db()
+        self.assertEqual(judge_rejudge.step(self.challenge), 1)
+        self.judge_all()
+        self.assertEqual(judge_rejudge.step(self.challenge), 0)
+        self.assertEqual(self.challenge.rejudge_runs.get().status, RejudgeRun.DONE)
+
+        judge_worker.finish(task, {
+            'verdict': judge_engine.WRONG_ANSWER, 'tests': [], 'compile_output': '', 'time_ms': 1
+        })
+        task.refresh_from_db()
+        self.assertEqual(task.test_set_version, version)
+        self.assertEqual(JudgeTask.objects.filter(solution=task.solution, status=JudgeTask.QUEUED).count(), 1)
+        self.judge_all()
+        self.assertFalse(judge_rejudge.stale_solutions(self.challenge).exists())
+        self.assertEqual(Solution.objects.get(pk=task.solution_id).status, 'accepted')
+        solution.refresh_from_db()
+        self.assertEqual(solution.status, 'rejected')
+
+    def test_accepted_on_rejudge_reaches_the_feed(self):
+        """Test that bulk status changes record the accepted event a single save would, except for private work"""
+        public, private = [
+            Solution.objects.create(
+                user=self.user, challenge=self.challenge, code='x', language='python', status='rejected',
+                is_private=is_private
+            )
+            for is_private in (False, True)
+        ]
+        self.assertEqual(judge_rejudge.apply_statuses({public.pk: 'accepted', private.pk: 'accepted'}), 2)
+        accepted = ActivityEvent.objects.filter(verb=ActivityEvent.ACCEPTED)
+        self.assertEqual(list(accepted.values_list('actor_id', 'solution_id')), [(self.user.pk, public.pk)])
+        judge_rejudge.apply_statuses({public.pk: 'rejected'})
+        judge_rejudge.apply_statuses({public.pk: 'accepted'})
+        self.assertEqual(accepted.count(), 2)
+
+    def test_runs_resume_from_their_cursor(self):
+        """Test that each step queues the next batch after the saved cursor"""
+        solutions = [
+            Solution.objects.create(user=self.user, challenge=self.challenge, code=f'print({i})', language=language)
+            for i, language in enumerate(['python', 'py'])
+        ]
+        self.judge_all()
+        self.attachment.file.save('rejudged-cases.json', ContentFile(b'[{"input": "3", "output": "10"}]'))
+        self.challenge.refresh_from_db()
+
+        self.assertEqual(judge_rejudge.step(self.challenge, batch_size=1), 1)
+        self.assertEqual(judge_rejudge.step(self.challenge, batch_size=1, budget=0), 0)
+        self.assertEqual(judge_rejudge.step(self.challenge, batch_size=1), 1)
+        run = self.challenge.rejudge_runs.get()
+        self.assertEqual((run.last_solution_id, run.enqueued), (solutions[1].pk, 2))
+        self.assertEqual(JudgeTask.objects.filter(priority=JudgeTask.REJUDGE).count(), 2)
+
+
+@override_settings(STORAGES=IN_MEMORY_STORAGES, **JUDGE_ACCOUNT_SETTINGS)
+@needs_judge_python
+class JudgeCacheTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='cache_user',
+            password='testpass123',
+            email='cache@example.com'
+        )
+        self.challenge = Challenge.objects.create(
+            title='Cached Challenge', description='d', content='c', difficulty='easy', points=5
+        )
+        self.attachment = Attachment.objects.create(title='cached-cases', file_type='test_case')
+        self.attachment.file.save('cached-cases.json', ContentFile(b'[{"output": "Hello, World!"}]'))
+        self.challenge.attachments.add(self.attachment)
+        cache.clear()
+
+    def submit(self, code):
+        return Solution.objects.create(user=self.user, challenge=self.challenge, code=code, language='python')
+
+    def test_whitespace_equivalent_submissions_reuse_the_verdict(self):
+        """Test that identical code modulo whitespace is judged once"""
+        worker = JudgeWorker(processes=1, poll_interval=0.05, cache=VerdictCache())
+        self.submit('print("Hello, World!")\n')
+        worker.run(once=True)
+        self.submit('print("Hello, World!")   \r\n\r\n')
+        worker.run(once=True)
+        tasks = JudgeTask.objects.order_by('created_at', 'id')
+        self.assertEqual([task.cache_hit for task in tasks], [False, True])
+        self.assertEqual({task.verdict for task in tasks}, {'accepted'})
+
+    def test_test_case_changes_bump_the_version(self):
+        """Test that editing or detaching test data changes the cache key"""
+        version = Challenge.objects.get(pk=self.challenge.pk).test_set_version
+        self.attachment.file.save('cached-cases.json', ContentFile(b'[{"output": "Bye"}]'))
+        self.challenge.attachments.remove(self.attachment)
+        self.challenge.refresh_from_db()
+        self.assertEqual(self.challenge.test_set_version, version + 2)
+        self.assertNotEqual(
+            verdict_key(self.challenge.pk, version, 'python', 'x'),
+            verdict_key(self.challenge.pk, version + 2, 'python', 'x')
+        )
+
+
+class ActivityFeedTests(APITestCase):
+    def setUp(self):
+        self.reader = User.objects.create_user(username='reader', password='testpass123', email='reader@example.com')
+        self.author = User.objects.create_user(username='author', password='testpass123', email='author@example.com')
+        self.star = User.objects.create_user(username='star', password='testpass123', email='star@example.com')
+        self.challenge = Challenge.objects.create(
+            title='Feed Challenge', description='d', content='c', difficulty='easy', points=10
+        )
+        follow_graph.follow(self.reader, self.author)
+        self.client.force_authenticate(user=self.reader)
+
+    def submit(self, user):
+        return Solution.objects.create(user=user, challenge=self.challenge, code='print(1)', language='python')
+
+    def read_feed(self, **params):
+        response = self.client.get(reverse('activity-feed'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_events_fan_out_to_followers(self):
+        """Test that submissions, acceptances and comments reach followers once fanned out"""
+        solution = self.submit(self.author)
+        solution.status = 'accepted'
+        solution.save()
+        Comment.objects.create(user=self.author, solution=solution, content='Explained my approach')
+        self.assertEqual(self.read_feed()['results'], [])
+
+        out = StringIO()
+        call_command('feed_worker', '--once', stdout=out)
+        self.assertIn('Fanned out 3 events', out.getvalue())
+        results = self.read_feed()['results']
+        self.assertEqual([item['verb'] for item in results], ['commented', 'accepted', 'submitted'])
+        self.assertEqual(results[0]['comment'], 'Explained my approach')
+        self.assertEqual(results[0]['solution']['challenge'], self.challenge.slug)
+
+        self.client.force_authenticate(user=self.star)
+        self.assertEqual(self.read_feed()['results'], [])
+
+    @override_settings(FEED_FANOUT_MAX_FOLLOWERS=1)
+    def test_crowded_actors_are_pulled_and_merged(self):
+        """Test that events of users over the fan-out limit are read at request time, in order"""
+        follow_graph.follow(self.reader, self.star)
+        follow_graph.follow(self.author, self.star)
+        for user in (self.author, self.star, self.author, self.star, self.star):
+            self.submit(user)
+        feed.fan_out()
+        self.assertFalse(TimelineEntry.objects.filter(actor=self.star).exists())
+        self.assertEqual(ActivityEvent.objects.filter(actor=self.star, pulled=True).count(), 3)
+
+        pages, data = [], self.read_feed(page_size=2)
+        while True:
+            pages.append([item['id'] for item in data['results']])
+            if not data['next']:
+                break
+            data = self.client.get(data['next']).data
+        expected = list(ActivityEvent.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual([event_id for page in pages for event_id in page], expected)
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+
+    def test_unfollow_backfill_and_trim(self):
+        """Test that unfollowing clears the timeline, following backfills it and trim caps it"""
+        for _ in range(3):
+            self.submit(self.author)
+        feed.fan_out()
+        self.assertEqual(TimelineEntry.objects.filter(owner=self.reader).count(), 3)
+
+        follow_graph.unfollow(self.reader, self.author)
+        self.assertFalse(TimelineEntry.objects.filter(owner=self.reader).exists())
+        follow_graph.follow(self.reader, self.author)
+        self.assertEqual(TimelineEntry.objects.filter(owner=self.reader).count(), 3)
+
+        self.assertEqual(feed.trim(max_entries=2), 1)
+        newest = ActivityEvent.objects.order_by('-created_at', '-id').values_list('id', flat=True)[:2]
+        self.assertEqual(
+            set(TimelineEntry.objects.filter(owner=self.reader).values_list('event_id', flat=True)), set(newest)
+        )
+
+    def test_private_solutions_stay_out_of_feeds(self):
+        """Test that private work records no events and work made private later disappears from feeds"""
+        hidden = Solution.objects.create(
+            user=self.author, challenge=self.challenge, code='print(1)', language='python', is_private=True
+        )
+        Like.objects.create(user=self.author, solution=hidden)
+        Comment.objects.create(user=self.author, solution=hidden, content='Note to self')
+        self.assertFalse(ActivityEvent.objects.exists())
+
+        shown = self.submit(self.author)
+        feed.fan_out()
+        self.assertEqual([item['solution']['id'] for item in self.read_feed()['results']], [shown.pk])
+        shown.is_private = True
+        shown.save()
+        self.assertEqual(self.read_feed()['results'], [])
+
+
+class DimensionLeaderboardTests(APITestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(username=name, password='testpass123', email=f'{name}@example.com')
+            for name in ('ann', 'ben', 'cat')
+        ]
+        self.category = Category.objects.create(name='Graphs', description='d')
+        self.challenges = [
+            Challenge.objects.create(
+                title=f'Graph Challenge {i}', description='d', content='c', difficulty='easy',
+                points=10 * (i + 1), category=self.category
+            )
+            for i in range(2)
+        ]
+
+    def accept(self, user, challenge, language='python'):
+        solution = Solution.objects.create(user=user, challenge=challenge, code='x', language=language)
+        solution.status = 'accepted'
+        solution.save()
+        return solution
+
+    def scores(self):
+        return set(DimensionScore.objects.values_list('dimension', 'user__username', 'points', 'solved'))
+
+    def test_scores_follow_accepted_solutions(self):
+        """Test that a challenge counts once per category and per language, and leaves with its last solution"""
+        ann, ben, _ = self.users
+        first = self.accept(ann, self.challenges[0])
+        self.accept(ann, self.challenges[0], language='py')
+        second = self.accept(ann, self.challenges[1], language='JavaScript')
+        self.accept(ben, self.challenges[1])
+        category = DimensionScore.category_key(self.category.pk)
+        expected = {
+            (category, 'ann', 30, 2), ('language:python', 'ann', 10, 1), ('language:javascript', 'ann', 20, 1),
+            (category, 'ben', 20, 1), ('language:python', 'ben', 20, 1),
+        }
+        self.assertEqual(self.scores(), expected)
+
+        first.status = 'rejected'
+        first.save()
+        self.assertEqual(self.scores(), expected)
+        second.delete()
+        self.assertNotIn(('language:javascript', 'ann', 20, 1), self.scores())
+        self.assertIn((category, 'ann', 10, 1), self.scores())
+
+        DimensionScore.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_dimension_scores', stdout=out)
+        self.assertIn('Rebuilt 4 category and language scores', out.getvalue())
+        self.assertEqual(self.scores(), {
+            (category, 'ann', 10, 1), ('language:python', 'ann', 10, 1),
+            (category, 'ben', 20, 1), ('language:python', 'ben', 20, 1),
+        })
+
+    def test_endpoints_return_top_users_and_rank(self):
+        """Test the category and language leaderboards with a user's rank"""
+        ann, ben, cat = self.users
+        self.accept(ann, self.challenges[0])
+        self.accept(ben, self.challenges[1])
+        self.accept(cat, self.challenges[0], language='c++')
+        self.accept(cat, self.challenges[1], language='python3')
+
+        url = reverse('users-leaderboard-category', kwargs={'slug': self.category.slug})
+        response = self.client.get(url, {'limit': 2, 'username': 'ann'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([(row['username'], row['points'], row['position']) for row in response.data['results']],
+                         [('cat', 30, 1), ('ben', 20, 2)])
+        self.assertEqual((response.data['user']['position'], response.data['user']['points']), (3, 10))
+
+        url = reverse('users-leaderboard-language', kwargs={'language': 'Python'})
+        response = self.client.get(url, {'username': 'cat'})
+        self.assertEqual(response.data['language'], 'python')
+        self.assertEqual([row['username'] for row in response.data['results']], ['ben', 'cat', 'ann'])
+        self.assertEqual(response.data['user']['position'], 2)
+        self.assertEqual(self.client.get(url, {'limit': 'all'}).status_code, status.HTTP_400_BAD_REQUEST)
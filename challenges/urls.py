@@ -9,7 +9,8 @@ from .views import (
     LikeViewSet,
     DislikeViewSet,
     CategoryViewSet,
-    UserChallengeViewSet
+    UserChallengeViewSet,
+    FeedView
 )
 
 router = DefaultRouter()
@@ -40,6 +41,7 @@ urlpatterns = [
     path('', include(comments_router.urls)),
     path('', include(likes_router.urls)),
     path('', include(dislikes_router.urls)),
+    path('feed/', FeedView.as_view(), name='activity-feed'),
     path('listings/<slug:slug>/subscribe/', ChallengeViewSet.as_view({'post': 'subscribe'}), name='challenge-subscribe'),
     path('listings/<slug:slug>/unsubscribe/', ChallengeViewSet.as_view({'post': 'unsubscribe'}), name='challenge-unsubscribe'),
     path('listings/<slug:slug>/check-subscription/', ChallengeViewSet.as_view({'get': 'check_subscription'}), name='challenge-check-subscription'),
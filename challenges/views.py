@@ -1,15 +1,26 @@
 from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
-from rest_framework import permissions, status, filters
+from rest_framework import permissions, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import Throttled
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
+from django.db.models import Q, Prefetch
+from django.core.files.storage import default_storage
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+import json
 from rest_framework.pagination import PageNumberPagination
 import logging
 import traceback
 from django.utils import timezone
 from drf_spectacular.utils import extend_schema
 
+from .pagination import MergedKeysetPagination, OptionalKeysetPaginationMixin
+from . import feed
+from .search import ChallengeSearchFilter
+from .code_search import code_search, match_offsets
+from .judge import scheduler as judge_scheduler
 from .models import Challenge, Solution, Comment, Like, Dislike, Category, UserChallenge
 from .serializers import (
     ChallengeSerializer,
@@ -22,7 +33,9 @@ from .serializers import (
     CategorySerializer,
     UserProgressSerializer,
     UserChallengeSerializer,
-    PublicSolutionSerializer
+    PublicSolutionSerializer,
+    JudgeTaskSerializer,
+    ActivityEventSerializer
 )
 
 logger = logging.getLogger(__name__)
@@ -35,19 +48,40 @@ class CategoryViewSet(ReadOnlyModelViewSet):
     serializer_class = CategorySerializer
     lookup_field = 'slug'
 
+    def list(self, request, *args, **kwargs):
+        categories = list(self.filter_queryset(self.get_queryset()))
+        context = self.get_serializer_context()
+        context['category_stats'] = CategorySerializer.resolve_stats(category.pk for category in categories)
+        return Response(self.get_serializer(categories, many=True, context=context).data)
+
 class ChallengePagination(PageNumberPagination):
     page_size = 12
     page_size_query_param = 'page_size'
     max_page_size = 100
 
-class ChallengeViewSet(ModelViewSet):
+class PublicSolutionPagination(PageNumberPagination):
+    """Pages of challenge groups for SolutionViewSet.public"""
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 50
+
+PUBLIC_SOLUTIONS_CHUNK_SIZE = 500
+
+def check_judge_backlog(user):
+    """Backpressure: 429 with Retry-After once the user has too many solutions waiting for the judge"""
+    if judge_scheduler.over_limit(user):
+        raise Throttled(
+            wait=judge_scheduler.retry_after(user),
+            detail="Too many of your solutions are waiting to be judged."
+        )
+
+class ChallengeViewSet(OptionalKeysetPaginationMixin, ModelViewSet):
     """Main challenge endpoints"""
     queryset = Challenge.objects.all()
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     lookup_field = 'slug'
     pagination_class = ChallengePagination
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['title', 'description', 'tags__name']
+    filter_backends = [ChallengeSearchFilter]
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -57,9 +91,17 @@ class ChallengeViewSet(ModelViewSet):
         return ChallengeSerializer
 
     def get_queryset(self):
-        queryset = Challenge.objects.all()
+        queryset = Challenge.objects.select_related('category', 'stats').prefetch_related('tags')
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related(
+                'attachments',
+                Prefetch(
+                    'prerequisites',
+                    queryset=Challenge.objects.select_related('category', 'stats').prefetch_related('tags')
+                )
+            )
         
-        # Search is handled automatically by SearchFilter
+        # Search is handled by ChallengeSearchFilter
         
         # Filter by category
         category = self.request.query_params.get('category')
@@ -78,6 +120,28 @@ class ChallengeViewSet(ModelViewSet):
             
         return queryset
 
+    def get_user_status_context(self, challenges):
+        """Serializer context carrying the requesting user's status and category stats for every challenge"""
+        context = self.get_serializer_context()
+        context['user_statuses'] = ChallengeListSerializer.resolve_user_statuses(
+            self.request.user, challenges
+        )
+        context['category_stats'] = CategorySerializer.resolve_stats(
+            challenge.category_id for challenge in challenges
+        )
+        return context
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        challenges = list(page if page is not None else queryset)
+        serializer = self.get_serializer(
+            challenges, many=True, context=self.get_user_status_context(challenges)
+        )
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
+
     @extend_schema(
         description="Get the authenticated user's challenge progress, including completed challenges and statistics",
         responses={
@@ -91,7 +155,7 @@ class ChallengeViewSet(ModelViewSet):
         if not request.user.is_authenticated:
             return Response({"error": "Authentication required"}, status=status.HTTP_401_UNAUTHORIZED)
         
-        serializer = UserProgressSerializer(request.user)
+        serializer = UserProgressSerializer(request.user, context=self.get_serializer_context())
         return Response(serializer.data)
 
     @extend_schema(
@@ -100,12 +164,14 @@ class ChallengeViewSet(ModelViewSet):
         responses={
             201: SolutionSerializer,
             400: {"description": "Bad request, including cases where the user has already submitted a solution in the specified language"},
-            404: {"description": "Challenge not found"}
+            404: {"description": "Challenge not found"},
+            429: {"description": "Too many solutions waiting for the judge; retry after the Retry-After header"}
         }
     )
     @action(detail=True, methods=['post'])
     def submit_solution(self, request, slug=None):
         challenge = self.get_object()
+        check_judge_backlog(request.user)
         serializer = SolutionSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
             serializer.save(user=request.user, challenge=challenge)
@@ -293,18 +359,26 @@ class ChallengeViewSet(ModelViewSet):
         if not request.user.is_authenticated:
             return Response({"error": "Authentication required"}, status=status.HTTP_401_UNAUTHORIZED)
         
-        subscribed_challenges = UserChallenge.objects.filter(
+        subscribed_challenges = list(UserChallenge.objects.filter(
             user=request.user,
             is_subscribed=True
-        ).select_related('challenge').order_by('-subscribed_at')
+        ).select_related('challenge__category', 'challenge__stats').prefetch_related(
+            'challenge__tags'
+        ).order_by('-subscribed_at'))
         
-        serializer = UserChallengeSerializer(subscribed_challenges, many=True, context={'request': request})
+        context = UserChallengeSerializer.get_batch_context(
+            request.user, subscribed_challenges, {'request': request}
+        )
+        serializer = UserChallengeSerializer(subscribed_challenges, many=True, context=context)
         return Response(serializer.data)
 
     def retrieve(self, request, *args, **kwargs):
         try:
             instance = self.get_object()
-            serializer = self.get_serializer(instance)
+            challenges = [instance, *instance.prerequisites.all()]
+            serializer = self.get_serializer(
+                instance, context=self.get_user_status_context(challenges)
+            )
             return Response(serializer.data)
         except Exception as e:
             logger.error(
@@ -318,7 +392,7 @@ class ChallengeViewSet(ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-class SolutionViewSet(ModelViewSet):
+class SolutionViewSet(OptionalKeysetPaginationMixin, ModelViewSet):
     """Solution management endpoints"""
     serializer_class = SolutionSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -335,70 +409,118 @@ class SolutionViewSet(ModelViewSet):
         # Get challenge from URL parameters or request data
         challenge_id = self.request.data.get('challenge')
         challenge = get_object_or_404(Challenge, id=challenge_id)
+        check_judge_backlog(self.request.user)
         serializer.save(user=self.request.user, challenge=challenge)
 
     @extend_schema(
-        description="List all public solutions grouped by challenges"
+        description="Latest judge run for one of your solutions: verdict, per-test results and timings",
+        responses={200: JudgeTaskSerializer, 404: {"description": "Not your solution, or not queued yet"}}
+    )
+    @action(detail=True, methods=['get'])
+    def judge(self, request, pk=None):
+        solution = get_object_or_404(Solution, pk=pk, user=request.user)
+        task = solution.judge_tasks.order_by('-created_at', '-id').first()
+        if task is None:
+            return Response({"error": "This solution has not been queued for judging"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(JudgeTaskSerializer(task).data)
+
+    def _public_rows(self, queryset, include_code, search):
+        """Yield plain solution dicts in chunks, reading the cached like/comment counters"""
+        fields = [
+            'id', 'challenge_id', 'challenge__title', 'challenge__slug', 'challenge__difficulty',
+            'user_id', 'user__username', 'user__email', 'user__profile',
+            'language', 'status', 'created_at', 'likes_count', 'comments_count'
+        ]
+        if include_code:
+            fields += ['code', 'documentation']
+        elif search:
+            fields += ['code']
+        queryset = queryset.values(*fields)
+
+        for row in queryset.iterator(chunk_size=PUBLIC_SOLUTIONS_CHUNK_SIZE):
+            solution = {
+                'id': row['id'],
+                'user': {
+                    'id': row['user_id'],
+                    'username': row['user__username'],
+                    'email': row['user__email'],
+                    'profile': default_storage.url(row['user__profile']) if row['user__profile'] else None
+                },
+                'language': row['language'],
+                'status': row['status'],
+                'created_at': row['created_at'],
+                'likes_count': row['likes_count'],
+                'comments_count': row['comments_count'],
+                'matches': match_offsets(row['code'], search) if search else []
+            }
+            if include_code:
+                solution['code'] = row['code']
+                solution['documentation'] = row['documentation']
+            yield row, solution
+
+    def _group_public_rows(self, rows):
+        """Fold rows ordered by challenge into one group per challenge, yielding each as it completes"""
+        group = None
+        for row, solution in rows:
+            if group is None or group['challenge']['id'] != row['challenge_id']:
+                if group is not None:
+                    yield group
+                group = {
+                    'challenge': {
+                        'id': row['challenge_id'],
+                        'title': row['challenge__title'],
+                        'slug': row['challenge__slug'],
+                        'difficulty': row['challenge__difficulty']
+                    },
+                    'solutions': []
+                }
+            group['solutions'].append(solution)
+        if group is not None:
+            yield group
+
+    @extend_schema(
+        description=(
+            "List public solutions grouped by challenge, paginated by challenge "
+            "(page, page_size). Pass include_code=false to omit code and documentation, "
+            "and stream=true to receive every group as newline-delimited JSON."
+        )
     )
     @action(detail=False, methods=['get'], permission_classes=[permissions.AllowAny])
     def public(self, request):
-        """List all public solutions with creator information, grouped by challenges"""
-        queryset = Solution.objects.filter(is_private=False).select_related('user', 'challenge')
+        """List public solutions with creator information, grouped by challenges"""
+        queryset = Solution.objects.filter(is_private=False)
         
-        # Apply filters
+        # Apply filters; search goes through the trigram-indexed code search
         language = request.query_params.get('language')
-        if language:
-            queryset = queryset.filter(language__iexact=language)
-        
-        # Apply search filter if provided
-        search = request.query_params.get('search')
+        search = request.query_params.get('search', '').strip()
         if search:
-            queryset = queryset.filter(
-                Q(code__icontains=search) | 
-                Q(user__username__icontains=search)
+            queryset = code_search.search(queryset, search, language=language)
+        elif language:
+            queryset = queryset.filter(language__iexact=language)
+
+        include_code = request.query_params.get('include_code', 'true').lower() not in ('false', '0', 'no')
+        ordering = ('challenge__title', 'challenge_id', '-created_at', '-id')
+
+        if request.query_params.get('stream', '').lower() in ('true', '1', 'yes'):
+            # Groups are flushed as soon as the next challenge starts, so memory
+            # stays bounded by one group plus one iterator chunk.
+            rows = self._public_rows(queryset.order_by(*ordering), include_code, search)
+            lines = (
+                json.dumps(group, cls=JSONEncoder) + '\n'
+                for group in self._group_public_rows(rows)
             )
-        
-        # Order by challenge and then by creation date
-        queryset = queryset.order_by('challenge__title', '-created_at')
-        
-        # Group solutions by challenge
-        solutions_by_challenge = {}
-        for solution in queryset:
-            challenge_id = solution.challenge.id
-            challenge_title = solution.challenge.title
-            
-            if challenge_id not in solutions_by_challenge:
-                solutions_by_challenge[challenge_id] = {
-                    'challenge': {
-                        'id': challenge_id,
-                        'title': challenge_title,
-                        'slug': solution.challenge.slug,
-                        'difficulty': solution.challenge.difficulty
-                    },
-                    'solutions': []
-                }
-            
-            solutions_by_challenge[challenge_id]['solutions'].append({
-                'id': solution.id,
-                'user': {
-                    'id': solution.user.id,
-                    'username': solution.user.username,
-                    'email': solution.user.email,
-                    'profile': solution.user.profile.url if solution.user.profile else None
-                },
-                'code': solution.code,
-                'documentation': solution.documentation,
-                'language': solution.language,
-                'status': solution.status,
-                'created_at': solution.created_at,
-                'likes_count': solution.likes.count(),
-                'comments_count': solution.comments.count()
-            })
-        
-        # Convert to list for response
-        result = list(solutions_by_challenge.values())
-        
-        return Response(result)
+            return StreamingHttpResponse(lines, content_type='application/x-ndjson')
+
+        # Paginate over challenges, then load only that page's solutions
+        challenges = Challenge.objects.filter(
+            pk__in=queryset.values('challenge_id')
+        ).order_by('title', 'id').values_list('pk', flat=True)
+        paginator = PublicSolutionPagination()
+        page = paginator.paginate_queryset(challenges, request, view=self)
+        rows = self._public_rows(
+            queryset.filter(challenge_id__in=list(page)).order_by(*ordering), include_code, search
+        )
+        return paginator.get_paginated_response(list(self._group_public_rows(rows)))
 
 class CommentViewSet(ModelViewSet):
     serializer_class = CommentSerializer
@@ -435,6 +557,10 @@ class DislikeViewSet(ModelViewSet):
             return Dislike.objects.none()
         return Dislike.objects.filter(solution_id=self.kwargs['solution_pk'])
 
+    def perform_create(self, serializer):
+        solution = get_object_or_404(Solution, pk=self.kwargs['solution_pk'])
+        serializer.save(user=self.request.user, solution=solution)
+
 class UserChallengeViewSet(ReadOnlyModelViewSet):
     serializer_class = UserChallengeSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -444,7 +570,7 @@ class UserChallengeViewSet(ReadOnlyModelViewSet):
         return UserChallenge.objects.filter(
             user=self.request.user,
             is_subscribed=True
-        ).select_related('challenge').order_by('-subscribed_at')
+        ).select_related('challenge__category', 'challenge__stats').order_by('-subscribed_at')
 
 def your_view(request):
     try:
@@ -452,4 +578,17 @@ def your_view(request):
         pass
     except Exception as e:
         logger.error(f"Error in your_view: {str(e)}", exc_info=True)
-        return HttpResponse("Internal Server Error", status=500)
\ No newline at end of file
+        return HttpResponse("Internal Server Error", status=500)
+
+
+class FeedView(APIView):
+    """Activity of the users the current user follows, newest first, cursor-paginated"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(responses=ActivityEventSerializer(many=True))
+    def get(self, request):
+        paginator = MergedKeysetPagination()
+        page = paginator.paginate_sources(feed.sources(request.user), feed.load, request, view=self)
+        serializer = ActivityEventSerializer(page, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
+
@@ -102,6 +102,17 @@ DATABASES = {
     }
 }
 
+# CACHE CONFIGURATION
+# Set REDIS_URL so every web and judge process shares one cache; without it each
+# process falls back to Django's default, a private in-memory (LocMem) cache
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+
 # AUTHENTICATION CONFIGURATION
 AUTH_USER_MODEL = "authentication.User"
 
@@ -231,12 +242,16 @@ os.makedirs(LOGS_DIR, exist_ok=True)
 # REST FRAMEWORK CONFIGURATION
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-        'dj_rest_auth.jwt_auth.JWTCookieAuthentication',
+        'authentication.auth.CachedJWTAuthentication',
+        'authentication.auth.CachedJWTCookieAuthentication',
     ),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 
+# Users resolved from JWTs are cached (authentication.auth) when REDIS_URL gives a
+# shared cache; entries are dropped on save. Without it the user row is read per request
+AUTH_USER_CACHE_TTL = int(os.getenv('AUTH_USER_CACHE_TTL', 300))
+
 # JWT CONFIGURATION
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=14),
@@ -245,8 +260,15 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': True,
     'ALGORITHM': 'HS512',
     'SIGNING_KEY': SECRET_KEY,
+    'TOKEN_REFRESH_SERIALIZER': 'authentication.serializer.TokenRefreshSerializer',
 }
 
+# Revoked JWT ids are checked against a per-process Bloom filter (authentication.revocation);
+# only filter hits query the table. Other processes' revocations are picked up every SYNC_INTERVAL seconds
+TOKEN_REVOCATION_CAPACITY = int(os.getenv('TOKEN_REVOCATION_CAPACITY', 100000))
+TOKEN_REVOCATION_ERROR_RATE = float(os.getenv('TOKEN_REVOCATION_ERROR_RATE', 0.001))
+TOKEN_REVOCATION_SYNC_INTERVAL = int(os.getenv('TOKEN_REVOCATION_SYNC_INTERVAL', 30))
+
 # CORS CONFIGURATION
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOWED_ORIGINS = [
@@ -268,9 +290,63 @@ THUMBNAIL_PROCESSORS = (
 
 # CRON JOBS
 CRONJOBS = [
-    ("*/1 * * * *", "authentication.jobs.increase_score")
+    ("*/1 * * * *", "authentication.jobs.increase_score"),
+    ("*/1 * * * *", "authentication.jobs.flush_outbox"),
+    ("0 3 * * *", "authentication.jobs.purge_revoked_tokens"),
+    ("*/1 * * * *", "authentication.jobs.roll_leaderboards"),
+    ("*/5 * * * *", "challenges.jobs.rejudge_stale"),
+    ("*/1 * * * *", "challenges.jobs.fan_out_feed"),
+    ("30 * * * *", "challenges.jobs.trim_feeds")
 ]
 
+# Daily/weekly/monthly leaderboards (authentication.score_windows): ledger rows are
+# rolled into hourly and daily buckets once they are LAG seconds old. Points from a
+# transaction open longer than LAG miss the windows until roll_leaderboards --rebuild
+LEADERBOARD_ROLLUP_BATCH = int(os.getenv('LEADERBOARD_ROLLUP_BATCH', 5000))
+LEADERBOARD_ROLLUP_LAG = int(os.getenv('LEADERBOARD_ROLLUP_LAG', 60))
+LEADERBOARD_STANDINGS_TTL = int(os.getenv('LEADERBOARD_STANDINGS_TTL', 3600))
+
+# Friends leaderboard (authentication.leaderboard.friends_standings): cached per user;
+# followers of users above MAX_FANOUT followers see score changes after the TTL
+LEADERBOARD_FRIENDS_TTL = int(os.getenv('LEADERBOARD_FRIENDS_TTL', 60))
+LEADERBOARD_FRIENDS_MAX_FANOUT = int(os.getenv('LEADERBOARD_FRIENDS_MAX_FANOUT', 1000))
+
+# Activity feeds (challenges.feed): events of users with more followers than
+# FEED_FANOUT_MAX_FOLLOWERS are read at request time instead of copied to every timeline
+FEED_FANOUT_BATCH = int(os.getenv('FEED_FANOUT_BATCH', 100))
+FEED_FANOUT_MAX_FOLLOWERS = int(os.getenv('FEED_FANOUT_MAX_FOLLOWERS', 1000))
+FEED_TIMELINE_MAX_ENTRIES = int(os.getenv('FEED_TIMELINE_MAX_ENTRIES', 1000))
+FEED_RETENTION_DAYS = int(os.getenv('FEED_RETENTION_DAYS', 30))
+FEED_BACKFILL = int(os.getenv('FEED_BACKFILL', 20))  # recent events copied to a new follower
+
+# JUDGE CONFIGURATION (per test case; see challenges.judge)
+JUDGE_TIME_LIMIT = int(os.getenv('JUDGE_TIME_LIMIT', 2))  # CPU seconds
+JUDGE_WALL_TIME_LIMIT = int(os.getenv('JUDGE_WALL_TIME_LIMIT', 5))
+JUDGE_MEMORY_LIMIT_MB = int(os.getenv('JUDGE_MEMORY_LIMIT_MB', 256))
+JUDGE_OUTPUT_LIMIT_KB = int(os.getenv('JUDGE_OUTPUT_LIMIT_KB', 1024))
+JUDGE_COMPILE_TIME_LIMIT = int(os.getenv('JUDGE_COMPILE_TIME_LIMIT', 20))
+JUDGE_MAX_PROCESSES = int(os.getenv('JUDGE_MAX_PROCESSES', 64))
+# Unprivileged account submissions run as: it should own nothing outside the judge's
+# scratch directories. Required: the judge refuses to run programs without it
+JUDGE_RUN_AS_UID = os.getenv('JUDGE_RUN_AS_UID')
+JUDGE_RUN_AS_GID = os.getenv('JUDGE_RUN_AS_GID')
+# Verdict cache for byte/whitespace-identical submissions (challenges.judge.cache);
+# shared between judge processes only when REDIS_URL is set
+JUDGE_CACHE_SIZE = int(os.getenv('JUDGE_CACHE_SIZE', 10000))
+JUDGE_CACHE_TTL = int(os.getenv('JUDGE_CACHE_TTL', 24 * 3600))
+# Pre-started runners per judge process and language (challenges.judge.warm); 0 runs cold
+JUDGE_WARM_POOLS = {
+    'python': {'size': int(os.getenv('JUDGE_PYTHON_WARM_POOL', 2))},
+}
+# Fair-share scheduling and backpressure (challenges.judge.scheduler)
+JUDGE_MAX_PENDING_PER_USER = int(os.getenv('JUDGE_MAX_PENDING_PER_USER', 5))
+JUDGE_PEAK_QUEUE_DEPTH = int(os.getenv('JUDGE_PEAK_QUEUE_DEPTH', 100))
+JUDGE_PRIORITY_AGING = int(os.getenv('JUDGE_PRIORITY_AGING', 300))  # seconds before a resubmission is promoted
+# Rejudging after test data changes (challenges.judge.rejudge)
+JUDGE_REJUDGE_BATCH = int(os.getenv('JUDGE_REJUDGE_BATCH', 200))
+JUDGE_REJUDGE_MAX_QUEUED = int(os.getenv('JUDGE_REJUDGE_MAX_QUEUED', 1000))
+JUDGE_REJUDGE_FLUSH_SIZE = int(os.getenv('JUDGE_REJUDGE_FLUSH_SIZE', 50))
+
 # EMAIL CONFIGURATION
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = os.getenv('EMAIL_HOST')
@@ -602,6 +678,12 @@ EMAIL_TEMPLATE_DIR = os.path.join(BASE_DIR, 'authentication/templates/emails')
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 DEFAULT_FROM_EMAIL = 'Devsplug <noreply@devsplug.com>'
 
+# Queued email delivery (authentication.outbox, run by send_outbox or the cron job)
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', 50))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', 5))
+EMAIL_OUTBOX_BACKOFF = int(os.getenv('EMAIL_OUTBOX_BACKOFF', 30))  # seconds, doubled per attempt
+EMAIL_OUTBOX_MAX_BACKOFF = int(os.getenv('EMAIL_OUTBOX_MAX_BACKOFF', 3600))
+
 # Django Extensions Settings
 SHELL_PLUS = "ipython"
 